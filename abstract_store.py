@@ -0,0 +1,176 @@
+"""
+Abstracts, stored apart from the programme shards.
+
+Abstracts are most of the programme's bytes but are only read when a card
+is expanded. build.py leaves them out of the day shards (marking the
+session or presentation with "has_abstract": true) and writes them to
+
+    static/abstracts.bin    UTF-8 texts, back to back, grouped by session
+    static/abstracts.json   {"version", "programme", "hash", "size",
+                             "items": {item id: [offset, length]},
+                             "sessions": {bookmark id: [offset, length, [item id, ...]]}}
+
+Item ids are the bookmark ids: a session's id for its own abstract, the
+presentation's id (programme.presentation_item_id) for talks and posters.
+
+server.py memory-maps the .bin file and keeps decoded abstracts in an LRU
+cache. Since a session's abstracts are contiguous, a whole session is
+fetched with a single slice.
+"""
+
+import copy
+import hashlib
+import json
+import mmap
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from programme import generate_id, presentation_item_id
+
+STORE_VERSION = 1
+DATA_NAME = 'abstracts.bin'
+INDEX_NAME = 'abstracts.json'
+
+# Decoded abstracts kept in memory
+CACHE_SIZE = 512
+
+
+def split_abstracts(data: dict):
+    """Return (programme without abstracts, [(bookmark id, [(item id, text), ...]), ...]).
+    `data` itself is left unchanged."""
+    stripped = copy.deepcopy(data)
+    sessions = []
+    for day in stripped.get('days', []):
+        for session in day['sessions']:
+            bookmark_id = generate_id(session, day['date'])
+            items = []
+            if session.get('abstract'):
+                items.append((bookmark_id, session.pop('abstract')))
+                session['has_abstract'] = True
+            session.pop('abstract', None)
+            for index, pres in enumerate(session.get('presentations') or []):
+                if pres.get('abstract'):
+                    items.append((presentation_item_id(session, day['date'], index), pres.pop('abstract')))
+                    pres['has_abstract'] = True
+                pres.pop('abstract', None)
+            if items:
+                sessions.append((bookmark_id, items))
+    return stripped, sessions
+
+
+def build_store(sessions, programme_etag: str = ''):
+    """Return (.bin bytes, index dict) for the output of split_abstracts()."""
+    chunks = []
+    items = {}
+    session_ranges = {}
+    offset = 0
+    for bookmark_id, session_items in sessions:
+        start = offset
+        for abstract_id, text in session_items:
+            encoded = text.encode('utf-8')
+            items[abstract_id] = [offset, len(encoded)]
+            chunks.append(encoded)
+            offset += len(encoded)
+        session_ranges[bookmark_id] = [start, offset - start, [abstract_id for abstract_id, _ in session_items]]
+    blob = b''.join(chunks)
+    index = {
+        'version': STORE_VERSION,
+        'programme': programme_etag,
+        'hash': hashlib.sha256(blob).hexdigest()[:16],
+        'size': len(blob),
+        'items': items,
+        'sessions': session_ranges,
+    }
+    return blob, index
+
+
+class AbstractStore:
+    """Abstract lookup by item id or session over a bytes-like buffer
+    (normally a read-only mmap of abstracts.bin)."""
+
+    def __init__(self, buffer, index: dict, cache_size: int = CACHE_SIZE):
+        if index.get('version') != STORE_VERSION:
+            raise ValueError('Unsupported abstract store version')
+        if len(buffer) != index['size']:
+            raise ValueError('Abstract store does not match its index')
+        self.buffer = buffer
+        self.programme_etag = index.get('programme', '')
+        self.hash = index['hash']
+        self.items = index['items']
+        self.sessions = index['sessions']
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, directory: Path, cache_size: int = CACHE_SIZE):
+        directory = Path(directory)
+        with open(directory / INDEX_NAME, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        with open(directory / DATA_NAME, 'rb') as f:
+            # mmap cannot map an empty file; the mapping outlives the file object
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if index.get('size') else b''
+        return cls(buffer, index, cache_size)
+
+    def _cached(self, abstract_id):
+        with self._lock:
+            text = self._cache.get(abstract_id)
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._cache.move_to_end(abstract_id)
+            return text
+
+    def _remember(self, abstract_id, text):
+        with self._lock:
+            self._cache[abstract_id] = text
+            self._cache.move_to_end(abstract_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get(self, abstract_id: str):
+        """The abstract with this item id, or None."""
+        text = self._cached(abstract_id)
+        if text is not None:
+            return text
+        span = self.items.get(abstract_id)
+        if span is None:
+            return None
+        offset, length = span
+        text = bytes(self.buffer[offset:offset + length]).decode('utf-8')
+        self._remember(abstract_id, text)
+        return text
+
+    def session(self, bookmark_id: str):
+        """{item id: abstract} for every abstract of a session, or None."""
+        entry = self.sessions.get(bookmark_id)
+        if entry is None:
+            return None
+        start, length, abstract_ids = entry
+        block = None
+        result = {}
+        for abstract_id in abstract_ids:
+            text = self._cached(abstract_id)
+            if text is None:
+                if block is None:
+                    block = bytes(self.buffer[start:start + length])
+                offset, size = self.items[abstract_id]
+                text = block[offset - start:offset - start + size].decode('utf-8')
+                self._remember(abstract_id, text)
+            result[abstract_id] = text
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'items': len(self.items),
+                'bytes': len(self.buffer),
+                'cached': len(self._cache),
+                'cache_size': self.cache_size,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
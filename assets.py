@@ -0,0 +1,139 @@
+"""
+Serving side of the static asset pipeline (see build_assets.py).
+
+Hashed files from static/dist are served with a one-year immutable cache
+lifetime; everything else gets a short TTL. Precompressed .br/.gz variants
+are picked according to the request's Accept-Encoding, and large dynamic
+JSON responses are compressed on the fly.
+"""
+
+import gzip
+import json
+import mimetypes
+import os
+import threading
+import time
+
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+SHORT_TTL = 'public, max-age=300'
+
+# Dynamic responses smaller than this are not worth compressing
+COMPRESS_MIN_SIZE = 1024
+
+# Precompressed variants in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class AssetManifest:
+    """The dist/ manifest, re-read when the build replaces it."""
+
+    CHECK_INTERVAL = 2.0
+
+    def __init__(self, dist_dir):
+        self.dist_dir = dist_dir
+        self.path = os.path.join(dist_dir, 'manifest.json')
+        self.logical = {}
+        self.hashed = set()
+        self._mtime = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        now = time.monotonic()
+        if now - self._checked < self.CHECK_INTERVAL:
+            return
+        with self._lock:
+            self._checked = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                self.logical, self.hashed, self._mtime = {}, set(), None
+                return
+            if mtime == self._mtime:
+                return
+            with open(self.path, encoding='utf-8') as f:
+                logical = json.load(f)
+            self.logical, self.hashed, self._mtime = logical, set(logical.values()), mtime
+
+    def resolve(self, name):
+        """Return (dist filename, cache-control) for `name`, or None."""
+        self.refresh()
+        if name in self.hashed:
+            return name, IMMUTABLE
+        if name in self.logical:
+            return self.logical[name], SHORT_TTL
+        if name == 'index.html' and os.path.exists(os.path.join(self.dist_dir, 'index.html')):
+            return 'index.html', SHORT_TTL
+        return None
+
+
+def accepted_encoding(available=('br', 'gzip')):
+    """Best content-coding from `available` that the client accepts."""
+    accept = request.accept_encodings
+    for encoding in available:
+        if accept[encoding] > 0:
+            return encoding
+    return None
+
+
+def send_precompressed(directory, filename, cache_control, download_name=None):
+    """send_from_directory() that prefers a precompressed variant."""
+    mimetype = mimetypes.guess_type(download_name or filename)[0] or 'application/octet-stream'
+    available = [enc for enc, ext in ENCODINGS if os.path.exists(os.path.join(directory, filename + ext))]
+    encoding = accepted_encoding(available)
+    if encoding:
+        ext = dict(ENCODINGS)[encoding]
+        resp = send_from_directory(directory, filename + ext, mimetype=mimetype)
+        resp.headers['Content-Encoding'] = encoding
+    else:
+        resp = send_from_directory(directory, filename, mimetype=mimetype)
+    resp.headers['Cache-Control'] = cache_control
+    resp.vary.add('Accept-Encoding')
+    return resp
+
+
+def send_asset(manifest, fallback_dir, name):
+    """Serve `name` from the built dist/ if possible, else from fallback_dir."""
+    resolved = manifest.resolve(name)
+    if resolved:
+        filename, cache_control = resolved
+        return send_precompressed(manifest.dist_dir, filename, cache_control, download_name=name)
+    resp = send_from_directory(fallback_dir, name)
+    resp.headers['Cache-Control'] = SHORT_TTL
+    return resp
+
+
+def compress_response(response):
+    """after_request hook: compress large JSON responses on the fly."""
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    encoding = accepted_encoding(('br', 'gzip') if brotli is not None else ('gzip',))
+    if encoding == 'br':
+        data = brotli.compress(data, quality=5)
+    elif encoding == 'gzip':
+        data = gzip.compress(data, compresslevel=6)
+    else:
+        return response
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    # A compressed body is a different representation; keep the ETag usable
+    # for If-None-Match (weak comparison) but no longer claim byte equality.
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
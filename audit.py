@@ -0,0 +1,162 @@
+"""
+Write-behind buffer for login audit writes.
+
+A successful login used to commit `UPDATE users SET last_login_at` and an
+`INSERT INTO login_history` in its own transaction, putting a disk sync on
+the login path. Instead, logins are queued here and a background thread
+writes them in batches: one transaction every MYDHD_AUDIT_FLUSH_MS
+milliseconds or MYDHD_AUDIT_BATCH rows, whichever comes first.
+
+The queue is bounded (MYDHD_AUDIT_QUEUE); when it is full, entries are
+dropped and counted rather than slowing logins down. Pending entries are
+flushed on interpreter shutdown.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+import db
+
+FLUSH_INTERVAL = int(os.environ.get('MYDHD_AUDIT_FLUSH_MS', '500')) / 1000
+FLUSH_ROWS = int(os.environ.get('MYDHD_AUDIT_BATCH', '200'))
+MAX_PENDING = int(os.environ.get('MYDHD_AUDIT_QUEUE', '10000'))
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class _FlushRequest:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class AuditWriter:
+    """Batches login audit rows into few, larger transactions."""
+
+    def __init__(self, interval=FLUSH_INTERVAL, batch_rows=FLUSH_ROWS, max_pending=MAX_PENDING):
+        self.interval = interval
+        self.batch_rows = batch_rows
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._in_batch = 0
+        self._stats = {
+            'queued': 0,
+            'written': 0,
+            'dropped': 0,
+            'flushes': 0,
+            'errors': 0,
+        }
+
+    def _ensure_started(self):
+        # The writer thread does not survive fork(); start one per process
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+                self._thread.start()
+
+    def record_login(self, username, at):
+        """Queue a successful login; never blocks."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((username, at))
+        except queue.Full:
+            with self._lock:
+                self._stats['dropped'] += 1
+            return
+        with self._lock:
+            self._stats['queued'] += 1
+
+    def flush(self, timeout=5.0):
+        """Write everything queued so far; returns False on timeout."""
+        if self._thread is None or self._pid != os.getpid():
+            return True
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout)
+
+    def stop(self, timeout=5.0):
+        """Flush pending rows and stop the writer thread."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, tuple):
+                batch.append(item)
+                self._in_batch = len(batch)
+                if deadline is None:
+                    deadline = time.monotonic() + self.interval
+                if len(batch) < self.batch_rows:
+                    continue
+
+            self._write(batch)
+            batch, deadline = [], None
+            self._in_batch = 0
+            if isinstance(item, _FlushRequest):
+                item.done.set()
+            elif item is _STOP:
+                return
+
+    def _write(self, batch):
+        if not batch:
+            return
+        # Only the latest login per user matters for last_login_at
+        latest = {}
+        for username, at in batch:
+            if at > latest.get(username, ''):
+                latest[username] = at
+        try:
+            with db.transaction() as conn:
+                conn.executemany('INSERT INTO login_history (username, login_at) VALUES (?, ?)', batch)
+                conn.executemany(
+                    'UPDATE users SET last_login_at = ? WHERE username = ?',
+                    [(at, username) for username, at in latest.items()]
+                )
+        except Exception:
+            logger.exception('Failed to write %d login audit rows', len(batch))
+            with self._lock:
+                self._stats['errors'] += 1
+                self._stats['dropped'] += len(batch)
+            return
+        with self._lock:
+            self._stats['written'] += len(batch)
+            self._stats['flushes'] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, pending=self._queue.qsize() + self._in_batch)
+
+
+writer = AuditWriter()
+atexit.register(writer.stop)
+
+
+def record_login(username, at):
+    writer.record_login(username, at)
+
+
+def stats() -> dict:
+    return writer.stats()
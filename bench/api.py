@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Load tests for the Flask API and the static programme.
+
+    python -m bench.api                              # all scenarios, both transports
+    python -m bench.api --transport http --threads 16 --scenarios me_polling,mixed
+    python -m bench.api --compare bench/results/a.json bench/results/b.json
+
+Scenarios (each worker thread is one user agent with its own cookies):
+
+    auth_burst        register + login of new accounts (password hashing)
+    me_polling        logged-in clients polling /api/me with If-None-Match
+    save_program      full bookmark sets saved over and over (writes)
+    programme_fetch   dhd2026_programm.json and the day shards, gzip accepted
+    mixed             conference-day mix of the above
+
+Results go to bench/results/api-<commit>-<time>.json (or --out); see
+harness.py for what is measured. Password hashing uses MYDHD_HASH_METHOD
+like the server, so auth_burst shows the production cost unless it is
+overridden.
+"""
+
+import argparse
+import itertools
+import random
+import secrets
+import sys
+from pathlib import Path
+
+from bench import harness
+
+PASSWORD = 'bench-password'
+
+# Weights of the steps in the mixed scenario
+MIX = (
+    ('me', 60),
+    ('programme', 10),
+    ('shard', 15),
+    ('save', 10),
+    ('login', 5),
+)
+
+
+def bookmark_sets(programme):
+    """Every session, talk and poster id of the programme: the largest
+    bookmark sets a real user can have."""
+    sessions, talks, posters = [], [], []
+    for _day, session in programme.sessions:
+        if session.get('type') == 'Poster Session':
+            target = posters
+        elif session.get('type') in ('Vortragssession', 'Doctoral Consortium'):
+            target = talks
+        else:
+            target = None
+        sessions.append(str(session['id']))
+        for pres in session.get('presentations') or []:
+            if target is not None:
+                target.append(str(pres['id']))
+    return {'sessions': sessions, 'talks': talks, 'posters': posters}
+
+
+class Scenarios:
+    """Prepare/step functions; `run_id` keeps usernames unique per run."""
+
+    def __init__(self, server, iterations):
+        self.server = server
+        self.iterations = iterations
+        self.run_id = secrets.token_hex(3)
+        conference = server.conferences.default()
+        self.sets = bookmark_sets(conference.programme)
+        self.shards = [entry['file'] for entry in conference.shard_store.manifest['days']]
+        self._users = itertools.count(1)
+
+    def username(self, worker, suffix=''):
+        return f'b{self.run_id}w{worker}n{next(self._users)}{suffix}'[:30]
+
+    def login(self, client, worker):
+        username = self.username(worker)
+        client.post('/api/register', {'username': username, 'password': PASSWORD}, label='POST /api/register')
+        resp = client.post('/api/login', {'username': username, 'password': PASSWORD}, label='POST /api/login')
+        if resp.status != 200:
+            raise RuntimeError(f'login failed with {resp.status}')
+        return {'username': username, 'etag': None, 'rng': random.Random(worker)}
+
+    def sample(self, rng):
+        """A large bookmark set with ~10% left out, so each save writes a diff."""
+        return {kind: [i for i in ids if rng.random() > 0.1] for kind, ids in self.sets.items()}
+
+    # auth_burst
+
+    def auth_prepare(self, client, worker):
+        return {'worker': worker}
+
+    def auth_step(self, client, state, i):
+        username = self.username(state['worker'], 'a')
+        client.post('/api/register', {'username': username, 'password': PASSWORD}, label='POST /api/register')
+        client.post('/api/login', {'username': username, 'password': PASSWORD}, label='POST /api/login')
+
+    # me_polling
+
+    def polling_prepare(self, client, worker):
+        state = self.login(client, worker)
+        client.post('/api/save_program', self.sample(state['rng']))
+        return state
+
+    def me(self, client, state):
+        headers = {'If-None-Match': state['etag']} if state['etag'] else None
+        resp = client.get('/api/me', headers=headers, label='GET /api/me')
+        if resp.status == 200:
+            state['etag'] = resp.headers.get('ETag')
+
+    def polling_step(self, client, state, i):
+        self.me(client, state)
+
+    # save_program
+
+    def save_step(self, client, state, i):
+        client.post('/api/save_program', self.sample(state['rng']), label='POST /api/save_program')
+
+    # programme_fetch
+
+    def fetch_prepare(self, client, worker):
+        return {'rng': random.Random(worker)}
+
+    def programme(self, client):
+        client.get('/dhd2026_programm.json', headers={'Accept-Encoding': 'gzip'}, label='GET /dhd2026_programm.json')
+
+    def shard(self, client, state):
+        name = state['rng'].choice(self.shards)
+        client.get(f'/days/{name}', headers={'Accept-Encoding': 'gzip'}, label='GET /days/<date>.json')
+
+    def fetch_step(self, client, state, i):
+        if i % 2:
+            self.shard(client, state)
+        else:
+            self.programme(client)
+
+    # mixed
+
+    def mixed_step(self, client, state, i):
+        steps = [name for name, _weight in MIX]
+        step = state['rng'].choices(steps, weights=[weight for _name, weight in MIX])[0]
+        if step == 'me':
+            self.me(client, state)
+        elif step == 'programme':
+            self.programme(client)
+        elif step == 'shard':
+            self.shard(client, state)
+        elif step == 'save':
+            self.save_step(client, state, i)
+        else:
+            client.post('/api/login', {'username': state['username'], 'password': PASSWORD},
+                        label='POST /api/login')
+
+    def table(self):
+        """name -> (prepare, step, iterations per thread)"""
+        n = self.iterations
+        return {
+            'auth_burst': (self.auth_prepare, self.auth_step, max(1, n // 50)),
+            'me_polling': (self.polling_prepare, self.polling_step, n),
+            'save_program': (self.login, self.save_step, max(1, n // 10)),
+            'programme_fetch': (self.fetch_prepare, self.fetch_step, max(1, n // 5)),
+            'mixed': (self.login, self.mixed_step, n),
+        }
+
+
+SCENARIO_NAMES = ('auth_burst', 'me_polling', 'save_program', 'programme_fetch', 'mixed')
+
+
+def run(transports, scenario_names, threads, iterations, db_path=None) -> dict:
+    server = harness.load_server(db_path)
+    app = server.create_app(SECRET_KEY=secrets.token_hex(32))
+    scenarios = Scenarios(server, iterations)
+    table = scenarios.table()
+    results = {
+        'meta': harness.metadata(suite='api', threads=threads, iterations=iterations,
+                                 hash_method=server.hashing.HASH_METHOD),
+        'scenarios': {},
+    }
+    for transport_name in transports:
+        transport = harness.TRANSPORTS[transport_name](app)
+        print(f"{transport_name}:")
+        try:
+            for name in scenario_names:
+                prepare, step, count = table[name]
+                result = harness.run_scenario(transport, threads, count, prepare, step, server.db.pool_stats)
+                key = f'{transport_name}/{name}'
+                results['scenarios'][key] = result
+                harness.print_summary(name, result)
+        finally:
+            transport.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the API and static paths.")
+    parser.add_argument('--transport', choices=('both',) + tuple(harness.TRANSPORTS), default='both')
+    parser.add_argument('--scenarios', default=','.join(SCENARIO_NAMES),
+                        help=f"comma-separated subset of: {', '.join(SCENARIO_NAMES)}")
+    parser.add_argument('--threads', type=int, default=8, help="concurrent clients")
+    parser.add_argument('--iterations', type=int, default=500,
+                        help="requests per client for polling scenarios (fewer for the expensive ones)")
+    parser.add_argument('--db', help="database file (default: a fresh temp file)")
+    parser.add_argument('--out', type=Path, help="result file (default: bench/results/api-<commit>-<time>.json)")
+    parser.add_argument('--compare', nargs=2, type=Path, metavar=('OLD', 'NEW'),
+                        help="compare two result files instead of running")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if harness.compare(*args.compare) else 0
+
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(names) - set(SCENARIO_NAMES)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    transports = tuple(harness.TRANSPORTS) if args.transport == 'both' else (args.transport,)
+    results = run(transports, names, args.threads, args.iterations, args.db)
+    path = harness.write_results(results, args.out, prefix='api')
+    print(f"Results written to {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
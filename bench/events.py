@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Load test for the event stream server (events.py): many idle streams.
+
+    python -m bench.events                          # 2000 streams
+    python -m bench.events --streams 5000 --idle 30 --changes 200
+    python -m bench.events --compare bench/results/a.json bench/results/b.json
+
+events.py is started as its own process on a free port against a fresh
+database with one user per stream. The test then goes through four steps:
+
+    connect     open every stream (signed session cookie, GET /api/events)
+                and wait for its hello event; connect latency percentiles
+    idle        hold all streams open for --idle seconds; the server's CPU
+                time and resident memory meanwhile, heartbeats received
+    changes     bump the bookmark version of --changes users in the
+                database, as a gunicorn worker would; time until each of
+                their streams received the bookmarks event
+    limit       open streams for one user until the per-user limit answers
+
+Results go to bench/results/events-<commit>-<time>.json.
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from bench import harness
+
+# Compared by --compare; True where higher is better
+COMPARED = (('rate_per_s', True), ('p50_ms', False), ('p99_ms', False),
+            ('server_cpu_percent', False), ('rss_per_stream_bytes', False))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def process_usage(pid):
+    """(CPU seconds, resident bytes) of a process, from /proc."""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    ticks = os.sysconf('SC_CLK_TCK')
+    cpu = (int(fields[11]) + int(fields[12])) / ticks
+    with open(f'/proc/{pid}/status') as f:
+        rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith('VmRSS:'))
+    return cpu, rss
+
+
+class Client:
+    """One idle EventSource: counts what arrives, records when."""
+
+    def __init__(self, username, cookie):
+        self.username = username
+        self.cookie = cookie
+        self.events = {}
+        self.heartbeats = 0
+        self.hello = asyncio.get_running_loop().create_future()
+        self.changed_at = None
+        self.writer = None
+        self.task = None
+
+    async def open(self, host, port):
+        reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(
+            f'GET /api/events HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n'
+            f'Cookie: session={self.cookie}\r\n\r\n'.encode('latin-1'))
+        await self.writer.drain()
+        status = (await reader.readuntil(b'\r\n\r\n')).split(b' ', 2)[1]
+        if status != b'200':
+            self.writer.close()
+            return int(status)
+        self.task = asyncio.ensure_future(self.read(reader))
+        await self.hello
+        return 200
+
+    async def read(self, reader):
+        try:
+            while True:
+                block = (await reader.readuntil(b'\n\n')).decode('utf-8')
+                if block.startswith(':'):
+                    self.heartbeats += 1
+                    continue
+                for line in block.splitlines():
+                    if line.startswith('event: '):
+                        event = line[7:]
+                        self.events[event] = self.events.get(event, 0) + 1
+                        if event == 'hello' and not self.hello.done():
+                            self.hello.set_result(time.perf_counter())
+                        elif event == 'bookmarks' and self.changed_at is None:
+                            self.changed_at = time.perf_counter()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            if not self.hello.done():
+                self.hello.set_exception(ConnectionError('stream closed before hello'))
+
+    def close(self):
+        if self.task:
+            self.task.cancel()
+        if self.writer:
+            self.writer.close()
+
+
+def create_users(count, prefix):
+    import db
+    now = datetime.now(timezone.utc).isoformat()
+    with db.transaction() as conn:
+        conn.executemany(
+            'INSERT INTO users (username, password_hash, created_at) VALUES (?, ?, ?)',
+            [(f'{prefix}{i}', '!', now) for i in range(count)])
+
+
+def bump_versions(usernames):
+    import bookmarks
+    import db
+    now = datetime.now(timezone.utc).isoformat()
+    with db.transaction() as conn:
+        for username in usernames:
+            bookmarks.apply_ops(conn, username, [('add', 'session', '1')], now)
+
+
+async def run_async(args, port, signer, prefix, server_pid):
+    results = {}
+    semaphore = asyncio.Semaphore(args.connect_concurrency)
+    clients = [Client(f'{prefix}{i}', signer.dumps({'username': f'{prefix}{i}'})) for i in range(args.streams)]
+
+    async def connect(client):
+        async with semaphore:
+            start = time.perf_counter()
+            status = await client.open('127.0.0.1', port)
+            return status, time.perf_counter() - start
+
+    # connect
+    _cpu, rss_before = process_usage(server_pid)
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(connect(c) for c in clients), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    latencies = [o[1] for o in outcomes if not isinstance(o, BaseException) and o[0] == 200]
+    failures = len(outcomes) - len(latencies)
+    results['connect'] = {
+        'streams': len(latencies), 'failed': failures, 'seconds': round(elapsed, 3),
+        'rate_per_s': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        **harness.latency_summary(latencies),
+    }
+    print(f"  connect   {len(latencies)} streams in {elapsed:.1f} s, {failures} failed, "
+          f"p50 {results['connect']['p50_ms']:.1f} ms, p99 {results['connect']['p99_ms']:.1f} ms")
+
+    # idle
+    cpu_before, _rss = process_usage(server_pid)
+    beats_before = sum(c.heartbeats for c in clients)
+    await asyncio.sleep(args.idle)
+    cpu_after, rss = process_usage(server_pid)
+    beats = sum(c.heartbeats for c in clients) - beats_before
+    results['idle'] = {
+        'seconds': args.idle,
+        'server_cpu_percent': round((cpu_after - cpu_before) / args.idle * 100, 2),
+        'server_rss_bytes': rss,
+        # growth over the process without streams
+        'rss_per_stream_bytes': (rss - rss_before) // max(1, len(latencies)),
+        'heartbeats': beats,
+    }
+    print(f"  idle      {args.idle} s: server CPU {results['idle']['server_cpu_percent']:.1f}%, "
+          f"RSS {rss / 2**20:.1f} MiB ({results['idle']['rss_per_stream_bytes'] / 1024:.1f} KiB/stream), "
+          f"{beats} heartbeats")
+
+    # changes
+    changed = [c for c in clients if c.task][:args.changes]
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    await loop.run_in_executor(None, bump_versions, [c.username for c in changed])
+    deadline = time.monotonic() + 10 + args.poll_ms / 1000 * 2
+    while time.monotonic() < deadline and any(c.changed_at is None for c in changed):
+        await asyncio.sleep(0.01)
+    delays = [c.changed_at - start for c in changed if c.changed_at is not None]
+    results['changes'] = {
+        'changed': len(changed), 'delivered': len(delays),
+        'spurious': sum(1 for c in clients if c not in changed and c.changed_at is not None),
+        **harness.latency_summary(delays),
+    }
+    print(f"  changes   {len(delays)}/{len(changed)} delivered, p50 {results['changes']['p50_ms']:.0f} ms, "
+          f"max {results['changes']['max_ms']:.0f} ms (poll every {args.poll_ms} ms)")
+
+    for client in clients:
+        client.close()
+
+    # limit: the per-user cap answers 429 once reached
+    extra = [Client(f'{prefix}0', signer.dumps({'username': f'{prefix}0'})) for _ in range(args.per_user + 1)]
+    statuses = []
+    for client in extra:
+        try:
+            statuses.append(await asyncio.wait_for(client.open('127.0.0.1', port), 5))
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            statuses.append(repr(e))
+    for client in extra:
+        client.close()
+    results['limit'] = {'per_user': args.per_user, 'statuses': statuses}
+    print(f"  limit     {args.per_user} per user: {statuses}")
+    return results
+
+
+def run(args) -> dict:
+    secret = secrets.token_hex(32)
+    db_path = os.path.join(tempfile.mkdtemp(prefix='mydhd-bench-'), 'events.db')
+    harness.load_server(db_path)   # creates the schema; must come before importing db
+    import events
+    from flask import Flask
+    events.raise_fd_limit()
+    prefix = 'e'
+    create_users(args.streams, prefix)
+
+    port = free_port()
+    env = dict(
+        os.environ,
+        MYDHD_DB=db_path,
+        FLASK_SECRET_KEY=secret,
+        MYDHD_LOG_LEVEL='WARNING',
+        MYDHD_EVENTS_HEARTBEAT=str(args.heartbeat),
+        MYDHD_EVENTS_POLL_MS=str(args.poll_ms),
+        MYDHD_EVENTS_PER_USER=str(args.per_user),
+        MYDHD_EVENTS_MAX=str(args.streams + 100),
+    )
+    process = subprocess.Popen([sys.executable, 'events.py', '--bind', f'127.0.0.1:{port}'], cwd=harness.ROOT, env=env)
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError('events.py did not start')
+                time.sleep(0.1)
+        # Sign cookies the way server.py does, with the shared secret
+        app = Flask(__name__)
+        app.secret_key = secret
+        signer = app.session_interface.get_signing_serializer(app)
+        print(f"{args.streams} streams, heartbeat {args.heartbeat} s:")
+        scenarios = asyncio.run(run_async(args, port, signer, prefix, process.pid))
+    finally:
+        process.terminate()
+        process.wait()
+    return {
+        'meta': harness.metadata(suite='events', streams=args.streams, idle=args.idle, heartbeat=args.heartbeat,
+                                 poll_ms=args.poll_ms, changes=args.changes),
+        'scenarios': scenarios,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hold many idle event streams open and measure the server.")
+    parser.add_argument('--streams', type=int, default=2000)
+    parser.add_argument('--idle', type=float, default=10.0, help="seconds to hold the streams idle")
+    parser.add_argument('--heartbeat', type=float, default=5.0, help="server heartbeat interval (s)")
+    parser.add_argument('--poll-ms', type=int, default=1000, help="server database poll interval")
+    parser.add_argument('--changes', type=int, default=100, help="users whose bookmarks change")
+    parser.add_argument('--per-user', type=int, default=4, help="server limit of streams per user")
+    parser.add_argument('--connect-concurrency', type=int, default=200, help="connections opened at once")
+    parser.add_argument('--out', type=Path, help="result file (default: bench/results/events-<commit>-<time>.json)")
+    parser.add_argument('--compare', nargs=2, type=Path, metavar=('OLD', 'NEW'),
+                        help="compare two result files instead of running")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if harness.compare(*args.compare, metrics=COMPARED) else 0
+    if args.streams < 1:
+        parser.error('--streams must be at least 1')
+
+    results = run(args)
+    path = harness.write_results(results, args.out, prefix='events')
+    print(f"Results written to {path}")
+    connect, changes = results['scenarios']['connect'], results['scenarios']['changes']
+    return 1 if connect['failed'] or changes['delivered'] < changes['changed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
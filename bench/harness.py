@@ -0,0 +1,332 @@
+"""
+Shared pieces of the benchmark suite.
+
+Two ways of driving the app, both in this process:
+
+    TestClientTransport   Flask's test client, no sockets; measures the app
+    HTTPTransport         a threaded werkzeug server on a free local port,
+                          driven over real HTTP; adds parsing, sockets and
+                          the server's thread-per-request model
+
+RemoteTransport drives a server in another process (gunicorn, see
+workers.py) over HTTP.
+
+Scenarios run as a closed loop: every worker thread sends its next request
+as soon as the previous one is answered. Each request is timed; a run
+reports throughput, latency percentiles and status counts per scenario, and
+the SQLite busy retries/failures seen by the connection pool meanwhile.
+
+Results are written as JSON (with the git commit they were measured on),
+and two result files can be compared.
+"""
+
+import gzip
+import http.cookiejar
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+PERCENTILES = (0.50, 0.95, 0.99)
+
+
+def load_server(db_path: str = None):
+    """Import server.py against a fresh database (a temp file by default).
+    The database location is read at import time, so this must run before
+    anything else imports server or db."""
+    if 'server' in sys.modules:
+        return sys.modules['server']
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix='mydhd-bench-'), 'bench.db')
+    os.environ['MYDHD_DB'] = db_path
+    os.environ.setdefault('MYDHD_LOG_LEVEL', 'WARNING')
+    sys.path.insert(0, str(ROOT))
+    import server
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    return server
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True, check=True)
+        return out.stdout.strip() + ('-dirty' if dirty.stdout.strip() else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class Response:
+    __slots__ = ('status', 'headers', 'body')
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        data = self.body
+        if self.headers.get('Content-Encoding') == 'gzip':
+            data = gzip.decompress(data)
+        return json.loads(data)
+
+
+class TestClientTransport:
+    name = 'testclient'
+
+    def __init__(self, app):
+        self.app = app
+
+    def client(self):
+        return _TestClient(self.app.test_client())
+
+    def close(self):
+        pass
+
+
+class _TestClient:
+
+    def __init__(self, client):
+        self._client = client
+
+    def request(self, method, path, body=None, headers=None):
+        resp = self._client.open(path, method=method, json=body, headers=headers or {})
+        return Response(resp.status_code, resp.headers, resp.get_data())
+
+
+class HTTPTransport:
+    """The app behind werkzeug's threaded development server."""
+    name = 'http'
+
+    def __init__(self, app):
+        from werkzeug.serving import make_server
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.base = f'http://127.0.0.1:{self.server.server_port}'
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def client(self):
+        return _HTTPClient(self.base)
+
+    def close(self):
+        self.server.shutdown()
+
+
+class _HTTPClient:
+    """One user agent: its own cookie jar (Flask session)."""
+
+    def __init__(self, base):
+        self.base = base
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        req = urllib.request.Request(self.base + path, data=data, headers=headers, method=method)
+        try:
+            with self.opener.open(req) as resp:
+                return Response(resp.status, resp.headers, resp.read())
+        except urllib.error.HTTPError as e:
+            # 304 and every error status end up here
+            return Response(e.code, e.headers, e.read())
+
+
+class RemoteTransport:
+    """A server running elsewhere (e.g. gunicorn started by bench.workers)."""
+    name = 'remote'
+
+    def __init__(self, base):
+        self.base = base.rstrip('/')
+
+    def client(self):
+        return _HTTPClient(self.base)
+
+    def close(self):
+        pass
+
+
+TRANSPORTS = {
+    'testclient': TestClientTransport,
+    'http': HTTPTransport,
+}
+
+
+class Recorder:
+    """Latencies and statuses of the timed requests of one scenario."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = []
+        self.statuses = {}
+        self.endpoints = {}
+
+    def add(self, label, status, seconds):
+        with self._lock:
+            self.latencies.append(seconds)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.endpoints.setdefault(label, []).append(seconds)
+
+
+class TimedClient:
+    """Wraps a transport client; requests are recorded once `recording` is set."""
+
+    def __init__(self, client, recorder):
+        self.client = client
+        self.recorder = recorder
+        self.recording = False
+
+    def request(self, method, path, body=None, headers=None, label=None):
+        start = time.perf_counter()
+        resp = self.client.request(method, path, body, headers)
+        if self.recording:
+            self.recorder.add(label or f'{method} {path}', resp.status, time.perf_counter() - start)
+        return resp
+
+    def get(self, path, headers=None, label=None):
+        return self.request('GET', path, headers=headers, label=label)
+
+    def post(self, path, body=None, label=None):
+        return self.request('POST', path, body, label=label)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(math.ceil(p * len(sorted_values))) - 1)]
+
+
+def latency_summary(values) -> dict:
+    values = sorted(values)
+    summary = {f'p{round(p * 100)}_ms': round(percentile(values, p) * 1000, 3) for p in PERCENTILES}
+    summary['max_ms'] = round(values[-1] * 1000, 3) if values else 0.0
+    return summary
+
+
+def run_scenario(transport, threads, iterations, prepare, step, db_stats=None) -> dict:
+    """Run `step(client, state, iteration)` `iterations` times on each of
+    `threads` workers after an untimed `prepare(client, worker) -> state`.
+    `db_stats` returns the connection pool counters (for busy errors)."""
+    recorder = Recorder()
+    ready = threading.Barrier(threads + 1)
+    errors = []
+
+    def worker(number):
+        client = TimedClient(transport.client(), recorder)
+        try:
+            state = prepare(client, number)
+        except Exception as e:
+            errors.append(e)
+            state = None
+        ready.wait()
+        if state is None:
+            return
+        client.recording = True
+        for i in range(iterations):
+            try:
+                step(client, state, i)
+            except Exception as e:
+                errors.append(e)
+                return
+
+    workers = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(threads)]
+    for w in workers:
+        w.start()
+    ready.wait()
+    before = db_stats() if db_stats else {}
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    after = db_stats() if db_stats else {}
+    if errors:
+        raise RuntimeError(f'{len(errors)} worker(s) failed: {errors[0]!r}') from errors[0]
+
+    requests = len(recorder.latencies)
+    failed = sum(count for status, count in recorder.statuses.items() if status >= 500)
+    result = {
+        'threads': threads,
+        'requests': requests,
+        'seconds': round(elapsed, 3),
+        'throughput_rps': round(requests / elapsed, 1) if elapsed else 0.0,
+        **latency_summary(recorder.latencies),
+        'statuses': {str(status): count for status, count in sorted(recorder.statuses.items())},
+        'server_errors': failed,
+        'sqlite_busy_retries': after.get('busy_retries', 0) - before.get('busy_retries', 0),
+        'sqlite_busy_failures': after.get('busy_failures', 0) - before.get('busy_failures', 0),
+        'endpoints': {label: {'requests': len(values), **latency_summary(values)}
+                      for label, values in sorted(recorder.endpoints.items())},
+    }
+    return result
+
+
+def metadata(**extra) -> dict:
+    return {
+        'commit': git_commit(),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        **extra,
+    }
+
+
+def write_results(results: dict, out: Path = None, prefix: str = 'bench') -> Path:
+    """Write results to `out`, or to bench/results/<prefix>-<commit>-<time>.json."""
+    if out is None:
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        out = RESULTS_DIR / f"{prefix}-{results['meta']['commit']}-{stamp}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2) + '\n', encoding='utf-8')
+    return out
+
+
+# Metrics compared between two result files; True where higher is better
+COMPARED = (('throughput_rps', True), ('p50_ms', False), ('p99_ms', False))
+
+
+def compare(old_path: Path, new_path: Path, threshold: float = 0.10, metrics=COMPARED) -> int:
+    """Print scenario `metrics` ((name, higher is better) pairs) of two
+    result files side by side, flagging changes for the worse beyond
+    `threshold`. Returns the number flagged."""
+    old = json.loads(Path(old_path).read_text(encoding='utf-8'))
+    new = json.loads(Path(new_path).read_text(encoding='utf-8'))
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']}")
+    regressions = 0
+    for name, after in new['scenarios'].items():
+        before = old['scenarios'].get(name)
+        if before is None:
+            continue
+        cells = []
+        for metric, higher_is_better in metrics:
+            a, b = before.get(metric), after.get(metric)
+            if a is None or b is None:
+                continue
+            change = (b - a) / a if a else 0.0
+            worse = change < -threshold if higher_is_better else change > threshold
+            regressions += worse
+            cells.append(f"{metric} {a:g} -> {b:g} ({change:+.0%}){' !' if worse else ''}")
+        print(f"  {name:24} " + ', '.join(cells))
+    return regressions
+
+
+def print_summary(name, result):
+    print(f"  {name:24} {result['requests']:>7} req {result['throughput_rps']:>9.1f} req/s  "
+          f"p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  "
+          f"5xx {result['server_errors']}  busy {result['sqlite_busy_retries']}/{result['sqlite_busy_failures']}")
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+How the build and indexing paths scale with the size of the conference.
+
+    python -m bench.scaling                        # scales 1, 10, 100
+    python -m bench.scaling --scales 1,10 --noise 0.2
+    python -m bench.scaling --compare bench/results/a.json bench/results/b.json
+
+For every scale a synthetic conference is generated (bench/synth.py) and
+these steps run over it in pipeline order, each timed on its own:
+
+    parse          conftool.iter_records over programm.html
+    abstracts      extract_abstracts.match_and_update
+    authors_html   extract_authors.extract_authors_from_html (parses again)
+    authors        extract_authors.add_authors with a TitleMatcher index
+    ids            id_registry.assign_ids into an empty registry
+    persons        persons.build_index + PersonIndex (prefix trie)
+    search         search.SearchIndex over the enriched programme
+
+The report shows milliseconds per scale and the growth exponent between
+neighbouring scales (1.0 is linear; 2.0 quadratic). Exponents above
+SUPERLINEAR are flagged. Results go to bench/results/scaling-<commit>-<time>.json.
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import math
+import sys
+import time
+from pathlib import Path
+
+import conftool
+import extract_abstracts
+import extract_authors
+import id_registry
+import persons
+import search
+from bench import harness, synth
+from programme import Programme
+from title_matcher import TitleMatcher
+
+SUPERLINEAR = 1.3
+
+
+def steps(page, data):
+    """Return (ctx, [(name, callable), ...]) in pipeline order; the steps
+    share state through `ctx`."""
+    ctx = {'data': data}
+
+    def parse():
+        ctx['records'] = list(conftool.iter_records(page))
+
+    def abstracts():
+        extract_abstracts.match_and_update(ctx['data'], extract_abstracts.sessions_from_records(ctx['records']))
+
+    def authors_html():
+        ctx['authors'] = extract_authors.extract_authors_from_html(page)
+
+    def authors():
+        extract_authors.add_authors(ctx['data'], TitleMatcher(ctx['authors'].items()))
+
+    def ids():
+        registry = id_registry.empty_registry()
+        id_registry.assign_ids(ctx['data'], registry, id_registry.paper_ids_by_title(ctx['records']))
+
+    def person_index():
+        persons.PersonIndex(persons.build_index(ctx['data']))
+
+    def search_index():
+        ctx['search'] = search.SearchIndex(Programme(ctx['data'], ''))
+
+    return ctx, [
+        ('parse', parse),
+        ('abstracts', abstracts),
+        ('authors_html', authors_html),
+        ('authors', authors),
+        ('ids', ids),
+        ('persons', person_index),
+        ('search', search_index),
+    ]
+
+
+def run_scale(scale, noise, seed, repeat):
+    """{step: best ms over `repeat` runs} plus the programme's size."""
+    page, data = synth.generate(scale, noise, seed)
+    items = sum(1 + len(s.get('presentations') or []) for day in data['days'] for s in day['sessions'])
+    best = {}
+    for _ in range(repeat):
+        ctx, pipeline = steps(page, copy.deepcopy(data))
+        for name, fn in pipeline:
+            # The extraction helpers report every fuzzy match on stdout
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                fn()
+                elapsed = (time.perf_counter() - start) * 1000
+            best[name] = min(best.get(name, elapsed), elapsed)
+    return {'items': items, 'html_bytes': len(page.encode('utf-8')), 'search_bytes': ctx['search'].memory_bytes,
+            'ms': best}
+
+
+def exponent(scale_a, ms_a, scale_b, ms_b):
+    if ms_a <= 0 or ms_b <= 0:
+        return 0.0
+    return math.log(ms_b / ms_a) / math.log(scale_b / scale_a)
+
+
+def run(scales, noise, seed, repeat) -> dict:
+    results = {
+        'meta': harness.metadata(suite='scaling', scales=scales, noise=noise, seed=seed, repeat=repeat),
+        'scales': {},
+        'scenarios': {},
+    }
+    for scale in scales:
+        print(f"scale {scale}...", flush=True)
+        measured = run_scale(scale, noise, seed, repeat)
+        results['scales'][str(scale)] = {key: value for key, value in measured.items() if key != 'ms'}
+        for name, ms in measured['ms'].items():
+            results['scenarios'][f'{name}@{scale}x'] = {'ms': round(ms, 3), 'items': measured['items']}
+    report(results, scales)
+    return results
+
+
+def report(results, scales):
+    names = [key.split('@')[0] for key in results['scenarios'] if key.endswith(f'@{scales[0]}x')]
+    sizes = ', '.join(f"{scale}x: {results['scales'][str(scale)]['items']:,} items, "
+                      f"{results['scales'][str(scale)]['html_bytes'] / 2**20:.1f} MiB HTML" for scale in scales)
+    print(f"\n{sizes}")
+    header = ''.join(f"{f'{scale}x ms':>12}" for scale in scales)
+    growth = ''.join(f"{f'{a}->{b}':>10}" for a, b in zip(scales, scales[1:]))
+    print(f"  {'step':14}{header}{growth}")
+    for name in names:
+        ms = [results['scenarios'][f'{name}@{scale}x']['ms'] for scale in scales]
+        cells = ''.join(f'{value:>12.1f}' for value in ms)
+        slopes = ''
+        for (a, ms_a), (b, ms_b) in zip(zip(scales, ms), zip(scales[1:], ms[1:])):
+            k = exponent(a, ms_a, b, ms_b)
+            slopes += f"{k:>9.2f}{'!' if k > SUPERLINEAR else ' '}"
+        print(f"  {name:14}{cells}{slopes}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark extraction and indexing over synthetic conferences.")
+    parser.add_argument('--scales', default='1,10,100', help="comma-separated scale factors")
+    parser.add_argument('--noise', type=float, default=0.1, help="share of JSON titles that differ from the export")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help="runs per scale; the fastest counts")
+    parser.add_argument('--out', type=Path, help="result file (default: bench/results/scaling-<commit>-<time>.json)")
+    parser.add_argument('--compare', nargs=2, type=Path, metavar=('OLD', 'NEW'),
+                        help="compare two result files instead of running")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if harness.compare(*args.compare, metrics=(('ms', False),)) else 0
+
+    try:
+        scales = sorted({int(s) for s in args.scales.split(',') if s.strip()})
+    except ValueError:
+        parser.error('--scales must be comma-separated integers')
+    if not scales or scales[0] < 1:
+        parser.error('scales must be at least 1')
+    results = run(scales, args.noise, args.seed, args.repeat)
+    path = harness.write_results(results, args.out, prefix='scaling')
+    print(f"Results written to {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
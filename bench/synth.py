@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Synthetic conferences shaped like the DHd programme.
+
+generate() returns a ConfTool programm.html export and the matching
+programme JSON before enrichment (titles, times, rooms, session ids; no
+abstracts, authors or affiliations), like the inputs of build.py:
+
+    workshops        one paper each, label "Workshop N"
+    panels           "Mittwoch, 1:1: Panel – <title>", one paper
+    talk sessions    "Mittwoch, 1:3: Mittwoch, 1:3 – <topic>", three talks
+    doctoral cons.   like talk sessions
+    poster sessions  "Donnerstag 3: Donnerstag 3 – Poster Session 1"
+    meetings etc.    no session id, matched by title
+
+At scale 1 the programme has about as many sessions and presentations as
+DHd 2026; scale N has N times as many parallel tracks, posters, workshops
+and meetings over the same five days. `noise` is the share of JSON
+presentation titles that differ from the export (typos, punctuation,
+dashes), so fuzzy title matching has work to do.
+
+    python -m bench.synth --scale 10 --noise 0.1 --out /tmp/synth10
+"""
+
+import argparse
+import html
+import json
+import random
+import sys
+from pathlib import Path
+
+WORDS = '''
+    Annotation Archiv Autorschaft Bibliothek Bildanalyse Briefe Daten Datenbank
+    Digitalisierung Diskurs Edition Einbettungen Entitäten Epistemologie Erschließung
+    Evaluation Forschungsdaten Frühe Neuzeit Gedächtnis Geschichte Graphen Handschriften
+    Infrastruktur Interpretation Karten Klassifikation Korpus Kunstgeschichte
+    Lyrik Literatur Metadaten Methoden Modellierung Museum Musik Netzwerke Normdaten
+    Ontologien Operationalisierung Provenienz Quellen Rezeption Roman Sammlungen
+    Semantik Sprachmodelle Stilometrie Texterkennung Theater Topic Modeling Transkription
+    Urkunden Visualisierung Wissenschaftsgeschichte Zeitungen Zeitschriften
+    archives corpus data editions heritage knowledge graphs language models
+    linked open data manuscripts networks newspapers reading sources text reuse
+'''.split()
+
+CONNECTORS = ('und', 'im Kontext von', 'zwischen', 'für', 'als', 'and', 'in', 'of', 'beyond')
+
+FIRST_NAMES = '''
+    Anna Benedikt Clara Daniel Elena Fabian Greta Hannah Ida Jakob Julia Katharina
+    Lena Lukas Maria Martin Nora Paul Petra Philipp Sabine Sebastian Sophie Stefan
+    Thomas Ute Valentin Wiebke Yasmin Zoé Øyvind Çağla Agnieszka Jörg Dörte Timo
+'''.split()
+
+SURNAMES = '''
+    Bauer Becker Brandt Cremer Diem Eide Fischer Friedl Hahn Hartmann Helling
+    Horstmann Huber Jannidis Keller Klein Koch König Krause Lang Lehmann Maier
+    Mandl Meyer Müller Neumann Öhman Peters Richter Schäfer Schmidt Schneider
+    Schulz Seltmann Söring Steyer Strötgen Thomas Vogel Wagner Weber Wolf Zimmermann
+'''.split()
+
+INSTITUTIONS = (
+    'Universität Wien, Österreich', 'Universität Graz, Österreich', 'Universität Salzburg, Österreich',
+    'Universität zu Köln, Deutschland', 'Universität Hamburg, Deutschland', 'Universität Paderborn, Deutschland',
+    'Humboldt-Universität zu Berlin, Deutschland', 'Freie Universität Berlin, Deutschland',
+    'Universität Trier, Deutschland', 'Universität Würzburg, Deutschland', 'Universität Stuttgart, Deutschland',
+    'Technische Universität Darmstadt, Deutschland', 'Universität Leipzig, Deutschland',
+    'Herzog August Bibliothek Wolfenbüttel, Deutschland', 'Deutsche Nationalbibliothek, Deutschland',
+    'Akademie der Wissenschaften und der Literatur Mainz, Deutschland', 'ETH Zürich, Schweiz',
+    'Universität Basel, Schweiz', 'Universität Bern, Schweiz', 'University College Dublin, Ireland',
+    'University of Oxford, United Kingdom', 'Universiteit van Amsterdam, Netherlands',
+    'Österreichische Akademie der Wissenschaften, Österreich', 'Leibniz-Institut für Europäische Geschichte, Deutschland',
+)
+
+TOPICS = (
+    'Digitale Editionen', 'Named Entities', 'Forschungsdatenstandards', 'Digital Art History',
+    'Graphen Netzwerke', 'Texterkennung', 'Multimodalität', 'Datenmodellierung', 'Operationalisierung',
+    'Research Software Engineering', 'KI in Interaktionsszenarien', 'Forschungsplattformen',
+)
+
+MEETINGS = ('AG-Treffen', 'Treffen', 'Arbeitskreis')
+
+DAYS = (
+    ('2026-02-23', 'Montag', '23. Februar 2026'),
+    ('2026-02-24', 'Dienstag', '24. Februar 2026'),
+    ('2026-02-25', 'Mittwoch', '25. Februar 2026'),
+    ('2026-02-26', 'Donnerstag', '26. Februar 2026'),
+    ('2026-02-27', 'Freitag', '27. Februar 2026'),
+)
+
+BASE_URL = 'https://www.conftool.net/dhd2026/index.php?page=browseSessions&amp;print=embed'
+
+HTML_HEAD = '''<!DOCTYPE HTML PUBLIC "-//W3C//DTD HTML 4.01 Transitional//EN" "http://www.w3.org/TR/html4/loose.dtd">
+<html>
+<head>
+<title>Synthetic conference - ConfTool Pro Printout</title>
+<meta http-equiv='Content-Type' content="text/html; charset=UTF-8">
+</head>
+<body>
+<main>
+'''
+
+HTML_TAIL = '''</table>
+<br />
+</main>
+</body>
+</html>
+'''
+
+
+class _Generator:
+
+    def __init__(self, scale, noise, seed):
+        self.scale = scale
+        self.noise = noise
+        self.rng = random.Random(seed)
+        self.html = [HTML_HEAD]
+        self.days = []
+        self.session_number = 400
+        self.paper_number = 100
+        self.titles = set()
+        self.next_workshop = 1
+
+    # -- content -------------------------------------------------------------
+
+    def title(self):
+        rng = self.rng
+        while True:
+            words = rng.sample(WORDS, rng.randint(2, 4))
+            title = f"{' '.join(words[:2])} {rng.choice(CONNECTORS)} {' '.join(words[2:]) or rng.choice(WORDS)}"
+            if rng.random() < 0.5:
+                title += f": {rng.choice(WORDS)} {rng.choice(CONNECTORS)} {rng.choice(WORDS)}"
+            if rng.random() < 0.1:
+                title += '?'
+            title = title[0].upper() + title[1:]
+            if title not in self.titles:
+                self.titles.add(title)
+                return title
+
+    def person(self):
+        rng = self.rng
+        first = rng.choice(FIRST_NAMES)
+        if rng.random() < 0.2:
+            first += f" {rng.choice('ABCDEFGHJKLMNPRSTW')}."
+        return f"{first} {rng.choice(SURNAMES)}"
+
+    def abstract(self):
+        rng = self.rng
+        sentences = []
+        for _ in range(rng.randint(4, 10)):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+            sentences.append(' '.join(words).capitalize() + '.')
+        return ' '.join(sentences)
+
+    def noisy(self, title):
+        """The title as the hand-maintained JSON might spell it."""
+        rng = self.rng
+        if rng.random() >= self.noise:
+            return title
+        kind = rng.randrange(4)
+        if kind == 0 and len(title) > 12:
+            pos = rng.randrange(1, len(title) - 1)
+            return title[:pos] + title[pos + 1:]                      # dropped letter
+        if kind == 1 and len(title) > 12:
+            pos = rng.randrange(1, len(title) - 2)
+            return title[:pos] + title[pos + 1] + title[pos] + title[pos + 2:]   # swapped letters
+        if kind == 2:
+            return title.replace(':', ' –', 1) if ':' in title else title + '.'
+        return title.rstrip('?') + ' (Kurzfassung)'
+
+    # -- HTML ----------------------------------------------------------------
+
+    def day_header(self, date, weekday):
+        dd, mm, yyyy = date[8:], date[5:7], date[:4]
+        self.html.append(
+            f'<table width="100%" align="center" id="session_list_{date}" cellspacing=1 cellpadding=2 '
+            f'class="mediumbg" role="presentation"><tr><td colspan=2 valign=top class="listheader left">\n'
+            f'<a class="font12" href="{BASE_URL}&amp;form_date={date}&amp;mode=list&amp;presentations=show">'
+            f'<b>Datum: {weekday}, {dd}.{mm}.{yyyy}</b></a>\n</td></tr>\n')
+
+    def paper_html(self, title):
+        rng = self.rng
+        self.paper_number += 1
+        authors = [self.person() for _ in range(rng.randint(1, 4))]
+        institutions = rng.sample(INSTITUTIONS, min(len(authors), rng.randint(1, 3)))
+        if len(institutions) == 1:
+            author_html = ', '.join(html.escape(a) for a in authors)
+            org_html = html.escape(institutions[0])
+        else:
+            author_html = ', '.join(
+                f"{'<u>' + html.escape(a) + '</u>' if i == 0 else html.escape(a)}"
+                f"<sup>{rng.randint(1, len(institutions))}</sup>"
+                for i, a in enumerate(authors))
+            org_html = '; '.join(f'<sup>{i}</sup>{html.escape(name)}' for i, name in enumerate(institutions, 1))
+        return (
+            f"<div id='paperID{self.paper_number}'>\n"
+            f'<div class="paper"><p class="paper_title">{html.escape(title)}</p>\n'
+            f'<p class="paper_author"> {author_html}</p>\n\n'
+            f'<p class="paper_organisation">{org_html}</p>\n\n'
+            f'<div ><div class="paper">\n\n'
+            f'<p class="paper_abstract">{html.escape(self.abstract())}</p>\n\n'
+            f'</div>\n</div>\n</div>\n</div>\n\n'
+        )
+
+    def session_html(self, label, time, room, chair=None, paper_titles=()):
+        self.session_number += 1
+        n = self.session_number
+        start, _, end = time.partition('–')
+        shown_time = f"{start.lstrip('0')} - {end.lstrip('0')}" if end else start.lstrip('0')
+        chair_html = ''
+        if chair:
+            name, affiliation = chair
+            chair_html = (f"<span class='font8'>Chair der Sitzung: </span><span class='font8 '>"
+                          f"<b>{html.escape(name)}</b>, {html.escape(affiliation)}</span><br />")
+        parts = [
+            f"<tbody id='session_{n}' >\n"
+            f'<tr class="whitebg"><td class="brightbg topline_printonly" align=center valign="middle" width="20%">'
+            f'<span class="fontbold"><span id="{n % 200}"></span>{shown_time}</span></td>'
+            f'<td class="whitebg topline_printonly leftline_printonly left" valign=top>'
+            f"<a class='font10' href='{BASE_URL}&amp;form_session={n}&amp;mode=list&amp;presentations=show'>"
+            f'<b>{html.escape(label)}</b></a><br /><span class=\'font8\'>Ort: </span>'
+            f'<a class="fontbold font8" href="{BASE_URL}&amp;mode=list&amp;presentations=show">{html.escape(room)}</a>'
+            f'<br />{chair_html}</td></tr>\n'
+        ]
+        if paper_titles:
+            parts.append('<tr class="whitebg"><td align=center valign="top" width="20%">\n'
+                         '<div style="font-size:4pt; clear:both;">&nbsp;</div>\n</td>\n'
+                         '<td class="whitebg leftline_printonly left" valign="top" width="80%">')
+            parts.extend(self.paper_html(title) for title in paper_titles)
+            parts.append('<div style="font-size:6pt; clear:both;">&nbsp;</div>\n')
+        parts.append('</tbody>\n')
+        self.html.append(''.join(parts))
+
+    # -- programme -----------------------------------------------------------
+
+    def add(self, sessions, time, title, session_type, room, session_id=None, label=None,
+            papers=(), with_presentations=False, chair=True):
+        """Add a session to the JSON day and the export."""
+        chair_entry = (self.person(), self.rng.choice(INSTITUTIONS).split(',')[0]) if chair else None
+        session = {'time': time, 'session_id': session_id, 'title': title, 'type': session_type, 'location': room}
+        if session_id is None:
+            del session['session_id']
+        if chair_entry and self.rng.random() < 0.3:
+            # Some chairs are already in the JSON, the build adds the others
+            session['chair'] = f'{chair_entry[0]}, {chair_entry[1]}'
+        if with_presentations:
+            session['presentations'] = [{'title': self.noisy(t)} for t in papers]
+        sessions.append(session)
+        self.session_html(label or title, time, room, chair_entry, papers)
+
+    def numbered_slot(self, sessions, weekday, slot, time, panels, talk_tracks, doctoral):
+        track = 0
+        for _ in range(panels):
+            track += 1
+            title = self.title()
+            self.add(sessions, time, f'Panel: {title}', 'Panel', 'BIG Hörsaal' if track == 1 else f'Hörsaal {track}',
+                     f'{weekday} {slot}:{track}', f'{weekday}, {slot}:{track}: Panel – {title}', [title])
+        for _ in range(doctoral):
+            track += 1
+            sid = f'{weekday} {slot}:{track}'
+            self.add(sessions, time, 'Doctoral Consortium', 'Doctoral Consortium', f'Hörsaal {track}', sid,
+                     f'{weekday}, {slot}:{track}: {weekday}, {slot}:{track} – Doctoral Consortium',
+                     [self.title() for _ in range(self.rng.randint(2, 3))], with_presentations=True)
+        for _ in range(talk_tracks):
+            track += 1
+            sid = f'{weekday} {slot}:{track}'
+            topic = self.rng.choice(TOPICS)
+            self.add(sessions, time, topic, 'Vortragssession', f'Hörsaal {track}', sid,
+                     f'{weekday}, {slot}:{track}: {weekday}, {slot}:{track} – {topic}',
+                     [self.title() for _ in range(3)], with_presentations=True)
+
+    def meetings(self, sessions, time, count):
+        for _ in range(count):
+            title = f'{self.rng.choice(MEETINGS)}: {self.title()}'
+            self.add(sessions, time, title, 'Treffen', f'Hörsaal {self.rng.randint(1, 6)}', chair=False)
+
+    def workshops(self, sessions, first, count, time):
+        for number in range(first, first + count):
+            title = f'Workshop {number}: {self.title()}'
+            self.add(sessions, time, title, 'Workshop', f'Seminarraum {(number - 1) % 8 + 1}',
+                     f'Workshop {number}', f'Workshop {number}', [title], chair=False)
+        return first + count
+
+    def build(self):
+        k = self.scale
+        for date, weekday, label in DAYS:
+            sessions = []
+            self.day_header(date, weekday)
+            if weekday == 'Montag':
+                self.next_workshop = self.workshops(sessions, 1, 8 * k, '14:00–18:00')
+            elif weekday == 'Dienstag':
+                self.workshops(sessions, self.next_workshop, 10 * k, '09:00–17:30')
+                self.add(sessions, '18:00–19:30', f'Eröffnungskeynote: {self.title()}', 'Keynote', 'Audimax',
+                         chair=False)
+                self.add(sessions, '19:30–21:00', 'Eröffnungsfeier', 'Social Event', 'Grosser Festsaal', chair=False)
+            elif weekday == 'Mittwoch':
+                for slot, time in ((1, '09:00–10:30'), (2, '11:00–12:30'), (3, '14:00–15:30')):
+                    self.numbered_slot(sessions, weekday, slot, time, k, 3 * k, k)
+                self.meetings(sessions, '12:30–14:00', 4 * k)
+            elif weekday == 'Donnerstag':
+                self.numbered_slot(sessions, weekday, 1, '09:00–10:30', k, 3 * k, k)
+                self.add(sessions, '11:00–12:30', 'Poster Slam', 'Poster Slam', 'Audimax', 'Donnerstag 2',
+                         'Donnerstag 2: Donnerstag 2 – Poster Slam', chair=False)
+                for number, (slot, time) in enumerate(((3, '14:00–15:30'), (4, '16:00–17:30')), 1):
+                    self.add(sessions, time, f'Poster Session {number}', 'Poster Session', 'Grosser Festsaal',
+                             f'Donnerstag {slot}', f'Donnerstag {slot}: Donnerstag {slot} – Poster Session {number}',
+                             [self.title() for _ in range(49 * k)], with_presentations=True, chair=False)
+                self.meetings(sessions, '12:30–14:00', 2 * k)
+            else:
+                for slot, time in ((1, '09:00–10:30'), (2, '11:00–12:30')):
+                    self.numbered_slot(sessions, weekday, slot, time, k, 4 * k, 0)
+                self.add(sessions, '14:00–15:30', 'Abschluss-Keynote', 'Keynote', 'Audimax', chair=False)
+            self.days.append({'date': date, 'day_label': f'{weekday}, {label}', 'sessions': sessions})
+        self.html.append(HTML_TAIL)
+        data = {
+            'conference': {'name': f'Synthetic conference ×{k}', 'dates': '23.–27. Februar 2026'},
+            'days': self.days,
+        }
+        return ''.join(self.html), data
+
+
+def generate(scale: int = 1, noise: float = 0.1, seed: int = 0):
+    """Return (programm.html text, programme JSON data) for a conference
+    `scale` times the size of DHd 2026."""
+    if scale < 1:
+        raise ValueError('scale must be at least 1')
+    return _Generator(scale, noise, seed).build()
+
+
+def write(out_dir: Path, scale: int = 1, noise: float = 0.1, seed: int = 0):
+    """Write programm.html and dhd2026_programm.json to `out_dir`."""
+    page, data = generate(scale, noise, seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / 'programm.html').write_text(page, encoding='utf-8')
+    with open(out_dir / 'dhd2026_programm.json', 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    return out_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic ConfTool export and programme JSON.")
+    parser.add_argument('--scale', type=int, default=1)
+    parser.add_argument('--noise', type=float, default=0.1, help="share of JSON titles that differ from the export")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', type=Path, required=True, help="output directory")
+    args = parser.parse_args(argv)
+    out = write(args.out, args.scale, args.noise, args.seed)
+    print(f"Wrote {out / 'programm.html'} and {out / 'dhd2026_programm.json'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
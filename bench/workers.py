@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Throughput of the production setup (gunicorn, wsgi.py) by worker count.
+
+    python -m bench.workers                            # 1, 2 and 4 workers
+    python -m bench.workers --workers 1,2,4,8 --threads 32
+    python -m bench.workers --compare bench/results/a.json bench/results/b.json
+
+For every worker count, gunicorn is started with gunicorn.conf.py on a free
+local port and a fresh database, and the read-heavy API scenarios of
+bench.api are run against it over HTTP. Logins and the requests after them
+land on different workers, so any 401 in me_polling means the workers do
+not share the session secret; that fails the run.
+
+Throughput can only grow with workers up to the number of CPUs of the
+machine, and the load generator runs on the same machine, so it competes
+for them. Results go to bench/results/workers-<commit>-<time>.json.
+"""
+
+import argparse
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from bench import api, harness
+
+SCENARIOS = ('me_polling', 'programme_fetch', 'mixed')
+
+# Seconds to wait for gunicorn to load the programme and start its workers
+STARTUP_TIMEOUT = 60
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(base, process):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'gunicorn exited with {process.returncode}')
+        try:
+            with urllib.request.urlopen(base + '/metrics', timeout=1):
+                return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn did not answer within {STARTUP_TIMEOUT} s')
+
+
+def start_gunicorn(workers, server_threads, db_dir):
+    port = free_port()
+    env = dict(
+        os.environ,
+        MYDHD_BIND=f'127.0.0.1:{port}',
+        MYDHD_WORKERS=str(workers),
+        MYDHD_THREADS=str(server_threads),
+        MYDHD_DB=os.path.join(db_dir, f'workers-{workers}.db'),
+        MYDHD_LOG_LEVEL='WARNING',
+        MYDHD_COOKIE_SECURE='0',
+        FLASK_SECRET_KEY=secrets.token_hex(32),
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--log-level', 'warning', 'wsgi:app'],
+        cwd=harness.ROOT, env=env,
+    )
+    base = f'http://127.0.0.1:{port}'
+    try:
+        wait_until_up(base, process)
+    except BaseException:
+        process.terminate()
+        process.wait()
+        raise
+    return process, base
+
+
+def run(worker_counts, scenario_names, threads, iterations, server_threads) -> dict:
+    # The scenarios take their bookmark sets and shard names from the programme
+    server = harness.load_server()
+    scenarios = api.Scenarios(server, iterations)
+    table = scenarios.table()
+    results = {
+        'meta': harness.metadata(suite='workers', workers=worker_counts, threads=threads,
+                                 iterations=iterations, server_threads=server_threads),
+        'scenarios': {},
+    }
+    db_dir = tempfile.mkdtemp(prefix='mydhd-bench-')
+    for workers in worker_counts:
+        print(f"{workers} worker(s):", flush=True)
+        process, base = start_gunicorn(workers, server_threads, db_dir)
+        transport = harness.RemoteTransport(base)
+        try:
+            for name in scenario_names:
+                prepare, step, count = table[name]
+                result = harness.run_scenario(transport, threads, count, prepare, step)
+                results['scenarios'][f'{workers}w/{name}'] = result
+                harness.print_summary(name, result)
+        finally:
+            process.terminate()
+            process.wait()
+    report(results, worker_counts, scenario_names)
+    return results
+
+
+def report(results, worker_counts, scenario_names):
+    print(f"\n  {'throughput':18}" + ''.join(f"{f'{n}w req/s':>14}" for n in worker_counts))
+    for name in scenario_names:
+        rps = [results['scenarios'][f'{n}w/{name}']['throughput_rps'] for n in worker_counts]
+        cells = ''.join(f"{value:>9.1f} {value / rps[0] if rps[0] else 0:>3.1f}x" for value in rps)
+        print(f"  {name:18}{cells}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure throughput by gunicorn worker count.")
+    parser.add_argument('--workers', default='1,2,4', help="comma-separated worker counts")
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f"comma-separated subset of: {', '.join(api.SCENARIO_NAMES)}")
+    parser.add_argument('--threads', type=int, default=16, help="concurrent clients")
+    parser.add_argument('--iterations', type=int, default=300, help="requests per client for polling scenarios")
+    parser.add_argument('--server-threads', type=int, default=4, help="threads per gunicorn worker")
+    parser.add_argument('--out', type=Path, help="result file (default: bench/results/workers-<commit>-<time>.json)")
+    parser.add_argument('--compare', nargs=2, type=Path, metavar=('OLD', 'NEW'),
+                        help="compare two result files instead of running")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if harness.compare(*args.compare) else 0
+
+    try:
+        worker_counts = sorted({int(n) for n in args.workers.split(',') if n.strip()})
+    except ValueError:
+        parser.error('--workers must be comma-separated integers')
+    if not worker_counts or worker_counts[0] < 1:
+        parser.error('worker counts must be at least 1')
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(names) - set(api.SCENARIO_NAMES)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    results = run(worker_counts, names, args.threads, args.iterations, args.server_threads)
+    path = harness.write_results(results, args.out, prefix='workers')
+    print(f"Results written to {path}")
+    unauthorized = sum(result['statuses'].get('401', 0) for key, result in results['scenarios'].items()
+                       if key.endswith('/me_polling'))
+    if unauthorized:
+        print(f"{unauthorized} requests in me_polling were answered 401: sessions are not shared between workers")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,336 @@
+"""
+Normalized bookmark storage with per-user versions for delta sync.
+
+Every bookmark is one row in `bookmarks`. Removals are kept as tombstones
+(`deleted = 1`) so other devices can learn about them. Each change is
+stamped with the user's `bookmark_version` at the time of the change, so
+"what changed since version N" is a single indexed range query.
+
+All functions expect an open connection; callers that write must run
+inside db.transaction().
+
+`bookmark_counts` holds how many users have each item bookmarked. It is
+kept up to date by apply_ops() in the same transaction as the bookmark
+rows, so popularity never needs a scan over all users; recount() rebuilds
+it from scratch.
+
+The current version per user is also cached in-process, so conditional
+/api/me requests can be answered without touching SQLite. Writes made by
+this process update the cache right after commit; writes made by other
+worker processes are picked up once an entry is older than
+VERSION_CACHE_TTL seconds.
+"""
+
+import json
+import os
+import threading
+import time
+
+# Bookmark kind -> legacy JSON column on `users`
+KINDS = {
+    'session': 'saved_sessions',
+    'poster': 'saved_posters',
+    'talk': 'saved_talks',
+}
+
+MAX_ID_LENGTH = 500
+
+VERSION_CACHE_TTL = float(os.environ.get('MYDHD_VERSION_CACHE_TTL', '5'))
+
+_version_cache = {}  # username -> (version, cached_at)
+_version_cache_lock = threading.Lock()
+
+
+def cached_version(username):
+    """The user's bookmark version if cached and fresh, else None."""
+    entry = _version_cache.get(username)
+    if entry is None or time.monotonic() - entry[1] > VERSION_CACHE_TTL:
+        return None
+    return entry[0]
+
+
+def remember_version(username, version):
+    """Cache a committed version. Never moves an entry backwards."""
+    if version is None:
+        return
+    with _version_cache_lock:
+        entry = _version_cache.get(username)
+        if entry is None or entry[0] <= version:
+            _version_cache[username] = (version, time.monotonic())
+
+
+def forget_version(username):
+    with _version_cache_lock:
+        _version_cache.pop(username, None)
+
+
+def init_schema(conn):
+    """Create the bookmarks table; on first creation migrate the JSON columns."""
+    existing = [row[1] for row in conn.execute('PRAGMA table_info(users)').fetchall()]
+    if 'bookmark_version' not in existing:
+        conn.execute('ALTER TABLE users ADD COLUMN bookmark_version INTEGER NOT NULL DEFAULT 0')
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bookmarks'"
+    ).fetchone()
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS bookmarks (
+            username TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (username, kind, item_id),
+            FOREIGN KEY (username) REFERENCES users(username)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_bookmarks_version ON bookmarks (username, version)')
+    if not exists:
+        migrate_legacy(conn)
+
+    counts_exist = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bookmark_counts'"
+    ).fetchone()
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS bookmark_counts (
+            kind TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (kind, item_id)
+        ) WITHOUT ROWID
+    ''')
+    if not counts_exist:
+        recount(conn)
+
+
+def migrate_legacy(conn):
+    """Copy bookmarks from the saved_* JSON columns into the bookmarks table."""
+    rows = conn.execute(
+        'SELECT username, saved_sessions, saved_posters, saved_talks, last_login_at, created_at FROM users'
+    ).fetchall()
+    for row in rows:
+        stamp = row['last_login_at'] or row['created_at'] or ''
+        items = []
+        for kind, column in KINDS.items():
+            try:
+                ids = json.loads(row[column] or '[]')
+            except ValueError:
+                continue
+            items.extend((kind, str(item_id)) for item_id in ids if item_id)
+        if not items:
+            continue
+        conn.executemany(
+            'INSERT OR IGNORE INTO bookmarks (username, kind, item_id, updated_at, version) VALUES (?, ?, ?, ?, 1)',
+            [(row['username'], kind, item_id, stamp) for kind, item_id in items]
+        )
+        conn.execute('UPDATE users SET bookmark_version = 1 WHERE username = ?', (row['username'],))
+
+
+def translate_ids(conn, mapping):
+    """Rewrite stored item ids that `mapping` (old id -> new id) knows, e.g.
+    legacy bookmark ids after the build assigned compact ids. If a user
+    already has a row for the new id, the more recent of the two is kept.
+    Versions are left alone. Returns the number of rows rewritten."""
+    # Compact ids are all digits; only other ids can be legacy ones
+    rows = conn.execute(
+        "SELECT username, kind, item_id, updated_at, version, deleted FROM bookmarks WHERE item_id GLOB '*[^0-9]*'"
+    ).fetchall()
+    rewritten = 0
+    for row in rows:
+        new_id = mapping.get(row['item_id'])
+        if new_id is None or new_id == row['item_id']:
+            continue
+        existing = conn.execute(
+            'SELECT version FROM bookmarks WHERE username = ? AND kind = ? AND item_id = ?',
+            (row['username'], row['kind'], new_id)
+        ).fetchone()
+        if existing is None:
+            conn.execute(
+                'UPDATE bookmarks SET item_id = ? WHERE username = ? AND kind = ? AND item_id = ?',
+                (new_id, row['username'], row['kind'], row['item_id'])
+            )
+        else:
+            if row['version'] > existing['version']:
+                conn.execute(
+                    'UPDATE bookmarks SET updated_at = ?, version = ?, deleted = ? '
+                    'WHERE username = ? AND kind = ? AND item_id = ?',
+                    (row['updated_at'], row['version'], row['deleted'], row['username'], row['kind'], new_id)
+                )
+            conn.execute(
+                'DELETE FROM bookmarks WHERE username = ? AND kind = ? AND item_id = ?',
+                (row['username'], row['kind'], row['item_id'])
+            )
+        rewritten += 1
+    if rewritten:
+        recount(conn)
+    return rewritten
+
+
+def recount(conn):
+    """Rebuild bookmark_counts from the bookmark rows. Returns the number
+    of items with at least one bookmark."""
+    conn.execute('DELETE FROM bookmark_counts')
+    conn.execute(
+        'INSERT INTO bookmark_counts (kind, item_id, count) '
+        'SELECT kind, item_id, COUNT(*) FROM bookmarks WHERE deleted = 0 GROUP BY kind, item_id'
+    )
+    return conn.execute('SELECT COUNT(*) FROM bookmark_counts').fetchone()[0]
+
+
+def iter_counts(conn, batch=500):
+    """(kind, item_id, count) of every bookmarked item, most bookmarked
+    first, read from the cursor in batches."""
+    cursor = conn.execute(
+        'SELECT kind, item_id, count FROM bookmark_counts WHERE count > 0 ORDER BY count DESC, kind, item_id'
+    )
+    while True:
+        rows = cursor.fetchmany(batch)
+        if not rows:
+            return
+        for row in rows:
+            yield row['kind'], row['item_id'], row['count']
+
+
+def get_version(conn, username):
+    row = conn.execute('SELECT bookmark_version FROM users WHERE username = ?', (username,)).fetchone()
+    return row['bookmark_version'] if row else None
+
+
+def load(conn, username):
+    """Return the user's current bookmarks as {kind: [item_id, ...]}."""
+    result = {kind: [] for kind in KINDS}
+    for row in conn.execute(
+        'SELECT kind, item_id FROM bookmarks WHERE username = ? AND deleted = 0 ORDER BY updated_at, item_id',
+        (username,)
+    ):
+        if row['kind'] in result:
+            result[row['kind']].append(row['item_id'])
+    return result
+
+
+def changes_since(conn, username, version):
+    """Return the changes after `version` as [{op, kind, id}, ...]."""
+    return [
+        {'op': 'remove' if row['deleted'] else 'add', 'kind': row['kind'], 'id': row['item_id']}
+        for row in conn.execute(
+            'SELECT kind, item_id, deleted FROM bookmarks WHERE username = ? AND version > ? ORDER BY version',
+            (username, version)
+        )
+    ]
+
+
+def validate_ops(ops):
+    """Return the ops as (op, kind, id) tuples, or None if malformed."""
+    if not isinstance(ops, list):
+        return None
+    result = []
+    for op in ops:
+        if not isinstance(op, dict):
+            return None
+        action, kind, item_id = op.get('op'), op.get('kind'), op.get('id')
+        if action not in ('add', 'remove') or kind not in KINDS:
+            return None
+        if not isinstance(item_id, str) or not item_id or len(item_id) > MAX_ID_LENGTH:
+            return None
+        result.append((action, kind, item_id))
+    return result
+
+
+def validate_ids(ids):
+    """Return `ids` if it is a list of item id strings, else None."""
+    if not isinstance(ids, list):
+        return None
+    for item_id in ids:
+        if not isinstance(item_id, str) or not item_id or len(item_id) > MAX_ID_LENGTH:
+            return None
+    return ids
+
+
+def apply_ops(conn, username, ops, now, skip=()):
+    """Apply (op, kind, id) tuples that actually change state.
+
+    All effective changes share one new version number. Items in `skip`
+    ((kind, id) pairs) are left untouched. Returns (version, applied ops).
+    """
+    version = get_version(conn, username)
+    if version is None:
+        return None, []
+
+    # Collapse repeated ops on the same item: the last one wins
+    wanted = {}
+    for action, kind, item_id in ops:
+        if (kind, item_id) not in skip:
+            wanted[(kind, item_id)] = action
+
+    new_version = version + 1
+    applied = []
+    for (kind, item_id), action in wanted.items():
+        row = conn.execute(
+            'SELECT deleted FROM bookmarks WHERE username = ? AND kind = ? AND item_id = ?',
+            (username, kind, item_id)
+        ).fetchone()
+        present = row is not None and not row['deleted']
+        if (action == 'add') == present:
+            continue
+        conn.execute(
+            'INSERT INTO bookmarks (username, kind, item_id, updated_at, version, deleted) VALUES (?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (username, kind, item_id) DO UPDATE SET '
+            'updated_at = excluded.updated_at, version = excluded.version, deleted = excluded.deleted',
+            (username, kind, item_id, now, new_version, 1 if action == 'remove' else 0)
+        )
+        applied.append({'op': action, 'kind': kind, 'id': item_id})
+
+    if not applied:
+        return version, []
+    conn.executemany(
+        'INSERT INTO bookmark_counts (kind, item_id, count) VALUES (?, ?, ?) '
+        'ON CONFLICT (kind, item_id) DO UPDATE SET count = count + excluded.count',
+        [(op['kind'], op['id'], 1 if op['op'] == 'add' else -1) for op in applied]
+    )
+    # Not committed yet: drop the cached value, the caller remembers the
+    # new version once the transaction went through
+    forget_version(username)
+    conn.execute('UPDATE users SET bookmark_version = ? WHERE username = ?', (new_version, username))
+    return new_version, applied
+
+
+def replace_all(conn, username, lists, now):
+    """Make the stored bookmarks equal `lists` ({kind: [ids]}) by writing
+    only the difference. Returns (version, applied ops)."""
+    current = load(conn, username)
+    ops = []
+    for kind in KINDS:
+        old, new = set(current[kind]), set(lists.get(kind) or ())
+        ops.extend(('add', kind, item_id) for item_id in new - old)
+        ops.extend(('remove', kind, item_id) for item_id in old - new)
+    return apply_ops(conn, username, ops, now)
+
+
+def sync_delta(conn, username, base_version, ops, now):
+    """Optimistic-concurrency delta sync.
+
+    Returns (version, changes, conflicts): `changes` are the server-side
+    changes after `base_version` the client has not seen yet; an op on an
+    item that another device changed after `base_version` is not applied
+    and reported in `conflicts` instead, so one device never silently
+    overwrites a newer decision made on another.
+    """
+    version = get_version(conn, username)
+    if version is None:
+        return None, [], []
+    if base_version > version:
+        # The client saw a version this database never had (e.g. a restore);
+        # fall back to a full resync.
+        base_version = 0
+
+    changes = changes_since(conn, username, base_version)
+    changed = {(c['kind'], c['id']): c for c in changes}
+    conflicts = []
+    for action, kind, item_id in ops:
+        server = changed.get((kind, item_id))
+        if server is not None and server['op'] != action:
+            conflicts.append({'op': action, 'kind': kind, 'id': item_id})
+
+    version, _applied = apply_ops(conn, username, ops, now, skip=set(changed))
+    return version, changes, conflicts
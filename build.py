@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+One-shot programme build.
+
+Parses programm.html once, enriches dhd2026_programm.json in memory and
+writes it back atomically, then rebuilds the static assets:
+
+    python build.py                          # every stage
+    python build.py --stages authors,chairs  # a subset, in pipeline order
+    python build.py --no-assets
+
+Stages run in this order over the same in-memory programme:
+
+    abstracts      session and presentation abstracts
+    authors        presentation authors
+    affiliations   presentation affiliations
+    chairs         session chairs (only where missing)
+    ids            stable compact ids for sessions and presentations (static/id_registry.json)
+    persons        static/persons.json person index (after the JSON is written)
+    shards         static/days/: one JSON file per day (plain and compact, see
+                   compact_format.py) plus manifest.json, with the abstracts
+                   in static/abstracts.bin (see abstract_store.py)
+    assets         static/dist/ via build_assets.py
+
+The JSON is written through a temp file + fsync + rename, so the running
+server never reads a half-written programme; an unchanged programme is not
+rewritten at all. A per-stage timing and match-coverage report is printed
+at the end.
+
+Parsed blocks and fuzzy matches are kept in a sidecar cache
+(.build_cache.json, see parse_cache.py), so a re-export with a few changed
+papers only re-parses and re-matches those; the build lists what changed
+since the previous export. `--no-cache` parses everything from scratch.
+"""
+
+import argparse
+import json
+import sys
+import time
+from functools import cached_property
+from pathlib import Path
+
+import abstract_store
+import build_assets
+import compact_format
+import conftool
+import extract_abstracts
+import extract_authors
+import id_registry
+import parse_cache
+import persons
+import shards
+from programme import content_etag
+from title_matcher import TitleMatcher
+
+BASE_DIR = Path(__file__).parent / "static"
+HTML_PATH = BASE_DIR / "programm.html"
+JSON_PATH = BASE_DIR / "dhd2026_programm.json"
+PERSONS_PATH = BASE_DIR / "persons.json"
+SHARDS_DIR = BASE_DIR / "days"
+
+JSON_STAGES = ('abstracts', 'authors', 'affiliations', 'chairs', 'ids')
+STAGES = JSON_STAGES + ('persons', 'shards', 'assets')
+
+
+class BuildContext:
+    """The parsed export and the programme being enriched, shared by all stages."""
+
+    def __init__(self, html_path: Path, json_data: dict, cache: parse_cache.ParseCache = None):
+        self.html_path = html_path
+        self.json_data = json_data
+        self.cache = cache
+        self.parse_stats = None
+        self.changes = []
+
+    @property
+    def memo_store(self):
+        return self.cache.matches if self.cache is not None else None
+
+    @cached_property
+    def records(self):
+        if self.cache is None:
+            return list(conftool.iter_records(self.html_path))
+        records, self.parse_stats, self.changes = self.cache.parse(self.html_path)
+        return records
+
+    @cached_property
+    def html_sessions(self):
+        return extract_abstracts.sessions_from_records(self.records)
+
+    @cached_property
+    def html_authors_and_chairs(self):
+        return extract_authors.collect_from_records(self.records)
+
+    @cached_property
+    def authors_index(self):
+        return TitleMatcher(self.html_authors_and_chairs[0].items(), memo_store=self.memo_store)
+
+    def presentations(self):
+        for day in self.json_data['days']:
+            for session in day['sessions']:
+                yield from session.get('presentations', ())
+
+    def sessions(self):
+        for day in self.json_data['days']:
+            yield from day['sessions']
+
+
+def coverage(done: int, total: int, unit: str) -> str:
+    percent = 100 * done / total if total else 100
+    return f"{done}/{total} {unit} ({percent:.0f}%)"
+
+
+# Each stage returns a one-line coverage summary
+
+def stage_abstracts(ctx: BuildContext) -> str:
+    _added, unmatched = extract_abstracts.match_and_update(ctx.json_data, ctx.html_sessions, ctx.memo_store)
+    for label in unmatched:
+        print(f"  Unmatched HTML session with abstracts: {label}")
+    # Sessions carry their own abstract unless they list presentations
+    items = [s for s in ctx.sessions() if 'presentations' not in s] + list(ctx.presentations())
+    with_abstract = sum(1 for item in items if item.get('abstract'))
+    return coverage(with_abstract, len(items), 'items with abstract')
+
+
+def stage_authors(ctx: BuildContext) -> str:
+    stats = extract_authors.add_authors(ctx.json_data, ctx.authors_index)
+    presentations = list(ctx.presentations())
+    with_authors = sum(1 for p in presentations if p.get('authors'))
+    return (coverage(with_authors, len(presentations), 'presentations')
+            + f", {stats['fuzzy']} fuzzy ({stats['ambiguous']} ambiguous), {stats['unmatched']} unmatched")
+
+
+def stage_affiliations(ctx: BuildContext) -> str:
+    extract_authors.add_affiliations(ctx.json_data, ctx.authors_index)
+    presentations = list(ctx.presentations())
+    with_affiliation = sum(1 for p in presentations if p.get('affiliation'))
+    return coverage(with_affiliation, len(presentations), 'presentations')
+
+
+def stage_chairs(ctx: BuildContext) -> str:
+    added = extract_authors.add_chairs(ctx.json_data, ctx.html_authors_and_chairs[1])
+    sessions = [s for s in ctx.sessions() if s.get('session_id')]
+    with_chair = sum(1 for s in sessions if s.get('chair'))
+    return coverage(with_chair, len(sessions), 'sessions') + f", {added} added"
+
+
+def stage_ids(ctx: BuildContext, registry_path: Path = id_registry.REGISTRY_PATH) -> str:
+    registry = id_registry.load_registry(registry_path)
+    papers = id_registry.paper_ids_by_title(ctx.records)
+    stats = id_registry.assign_ids(ctx.json_data, registry, papers)
+    written = write_json_atomic(registry_path, registry)
+    return (f"{stats['items']} items, {stats['kept']} kept, {stats['new']} new, "
+            f"{registry_path.name} {'written' if written else 'unchanged'}")
+
+
+def stage_persons(ctx: BuildContext, json_path: Path = JSON_PATH, persons_path: Path = PERSONS_PATH) -> str:
+    # Tied to the programme file as written, so the server can spot a stale index
+    index = persons.build_index(ctx.json_data, content_etag(json_path.read_bytes()))
+    output = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if not (persons_path.exists() and persons_path.read_bytes() == output):
+        build_assets.write_atomic(persons_path, output)
+    return f"{len(index['persons'])} persons, {len(index['refs'])} refs, {len(output):,} bytes"
+
+
+def stage_shards(ctx: BuildContext, json_path: Path = JSON_PATH, shards_dir: Path = SHARDS_DIR) -> str:
+    programme_etag = content_etag(json_path.read_bytes())
+    stripped, abstracts = abstract_store.split_abstracts(ctx.json_data)
+
+    # The abstracts go first, so the shards never point at missing ones
+    blob, index = abstract_store.build_store(abstracts, programme_etag)
+    store_dir = shards_dir.parent
+    written = 0
+    for name, output in ((abstract_store.DATA_NAME, blob),
+                         (abstract_store.INDEX_NAME, json.dumps(index, ensure_ascii=False).encode('utf-8'))):
+        path = store_dir / name
+        if not (path.exists() and path.read_bytes() == output):
+            build_assets.write_atomic(path, output)
+            written += 1
+
+    files, manifest = shards.build_shards(stripped, programme_etag)
+    for day, entry in zip(stripped['days'], manifest['days']):
+        if compact_format.loads(files[entry['compact']['file']]) != day:
+            raise ValueError(f"{entry['compact']['file']} does not round-trip")
+    written += shards.write_shards(files, shards_dir, build_assets.write_atomic)
+    sizes = ', '.join(f"{entry['date']} {entry['size']:,}/{entry['compact']['size']:,}"
+                      for entry in manifest['days'])
+    return (f"{len(manifest['days'])} days ({sizes} bytes plain/compact), {len(index['items'])} abstracts "
+            f"({index['size']:,} bytes), {written} files written")
+
+
+def stage_assets(ctx: BuildContext) -> str:
+    manifest = build_assets.build(verbose=False)
+    return f"{len(manifest)} assets"
+
+
+STAGE_FUNCTIONS = {
+    'abstracts': stage_abstracts,
+    'authors': stage_authors,
+    'affiliations': stage_affiliations,
+    'chairs': stage_chairs,
+    'ids': stage_ids,
+    'persons': stage_persons,
+    'shards': stage_shards,
+    'assets': stage_assets,
+}
+
+
+def describe_parse(ctx: BuildContext) -> str:
+    summary = f"{len(ctx.records)} records from {ctx.html_path.name}"
+    if ctx.parse_stats is not None:
+        summary += f", {ctx.parse_stats['parsed']}/{ctx.parse_stats['blocks']} blocks parsed"
+    return summary
+
+
+def write_json_atomic(path: Path, data) -> bool:
+    """Write `data` as the programme JSON. Returns False if the file already
+    had exactly this content and was left alone."""
+    output = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    if path.exists() and path.read_bytes() == output:
+        return False
+    build_assets.write_atomic(path, output)
+    return True
+
+
+def run(stages=STAGES, html_path: Path = HTML_PATH, json_path: Path = JSON_PATH,
+        cache_path: Path = parse_cache.CACHE_PATH):
+    """Run the given stages in pipeline order; returns the report rows.
+    `cache_path=None` disables the parse cache."""
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+    stages = [name for name in STAGES if name in stages]
+    report = []
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        summary = fn()
+        report.append((name, time.perf_counter() - start, summary))
+
+    cache = parse_cache.ParseCache(cache_path) if cache_path is not None else None
+    with open(json_path, 'r', encoding='utf-8') as f:
+        ctx = BuildContext(html_path, json.load(f), cache)
+
+    json_stages = [name for name in stages if name in JSON_STAGES]
+    if json_stages:
+        first_build = cache is not None and cache.empty
+        timed('parse', lambda: describe_parse(ctx))
+        if ctx.changes:
+            print(f"\n=== CHANGES SINCE LAST EXPORT ({len(ctx.changes)}) ===")
+            for change in ctx.changes:
+                print(f"  {change}")
+            print()
+        elif cache is not None and not first_build:
+            print("No changes since the last export.")
+        for name in json_stages:
+            print(f"Running {name}...")
+            if name == 'ids':
+                timed(name, lambda: stage_ids(ctx, json_path.parent / id_registry.REGISTRY_PATH.name))
+            else:
+                timed(name, lambda: STAGE_FUNCTIONS[name](ctx))
+        timed('write', lambda: f"{json_path.name} "
+              + ('written' if write_json_atomic(json_path, ctx.json_data) else 'unchanged'))
+        if cache is not None:
+            cache.save()
+
+    if 'persons' in stages:
+        print("Running persons...")
+        timed('persons', lambda: stage_persons(ctx, json_path, json_path.parent / PERSONS_PATH.name))
+
+    if 'shards' in stages:
+        print("Running shards...")
+        timed('shards', lambda: stage_shards(ctx, json_path, json_path.parent / SHARDS_DIR.name))
+
+    if 'assets' in stages:
+        print("Running assets...")
+        timed('assets', lambda: stage_assets(ctx))
+
+    print("\n=== BUILD REPORT ===")
+    for name, elapsed, summary in report:
+        print(f"  {name:13} {elapsed * 1000:8.1f} ms  {summary}")
+    print(f"  {'total':13} {sum(r[1] for r in report) * 1000:8.1f} ms")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the programme JSON and static assets.")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"comma-separated subset of: {', '.join(STAGES)}")
+    parser.add_argument('--no-assets', action='store_true', help="skip the static asset build")
+    parser.add_argument('--html', type=Path, default=HTML_PATH, help="ConfTool programm.html export")
+    parser.add_argument('--json', type=Path, default=JSON_PATH, help="programme JSON to enrich")
+    parser.add_argument('--no-cache', action='store_true', help="ignore and do not update the parse cache")
+    args = parser.parse_args(argv)
+
+    stages = [name.strip() for name in args.stages.split(',') if name.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    if args.no_assets:
+        stages = [name for name in stages if name != 'assets']
+    run(stages, html_path=args.html, json_path=args.json,
+        cache_path=None if args.no_cache else parse_cache.CACHE_PATH)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Build precompressed, content-hashed copies of the static assets.
+
+Writes into static/dist/:
+  - <name>.<hash>.<ext> for every asset, plus .gz and (if the optional
+    `brotli` package is installed) .br variants
+  - index.html with its references rewritten to the hashed names
+  - manifest.json mapping logical names to hashed names
+
+server.py serves hashed files with `Cache-Control: immutable` and picks
+the best precompressed variant based on Accept-Encoding.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+ROOT_DIR = Path(__file__).parent
+STATIC_DIR = ROOT_DIR / "static"
+DIST_DIR = STATIC_DIR / "dist"
+MANIFEST_PATH = DIST_DIR / "manifest.json"
+
+# Logical name -> source file. Order matters: assets referenced by later
+# entries (the programme JSON inside app.js) must be hashed first.
+ASSETS = {
+    "dhd2026_programm.json": STATIC_DIR / "dhd2026_programm.json",
+    "programm.html": STATIC_DIR / "programm.html",
+    "logo.png": STATIC_DIR / "logo.png",
+    "Lageplan.pdf": ROOT_DIR / "Lageplan.pdf",
+    "style.css": STATIC_DIR / "style.css",
+    "app.js": STATIC_DIR / "app.js",
+}
+
+# Only keep a compressed variant if it saves at least this fraction
+MIN_SAVING = 0.05
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def hashed_name(name: str, data: bytes) -> str:
+    stem, dot, ext = name.rpartition('.')
+    return f"{stem}.{content_hash(data)}.{ext}" if dot else f"{name}.{content_hash(data)}"
+
+
+def rewrite_references(text: str, manifest: dict) -> str:
+    """Replace quoted references to logical asset names with hashed names."""
+    for name, hashed in manifest.items():
+        text = re.sub(r'(["\'])' + re.escape(name) + r'\1', lambda m: m.group(1) + hashed + m.group(1), text)
+    return text
+
+
+def write_atomic(path: Path, data: bytes):
+    """Replace `path` with `data` so readers see either the old or the new
+    file, never a partial one."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_variants(path: Path, data: bytes):
+    """Write .gz/.br next to `path` when they are worth it. Returns sizes."""
+    sizes = {'identity': len(data)}
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) <= len(data) * (1 - MIN_SAVING):
+        write_atomic(path.with_name(path.name + '.gz'), gz)
+        sizes['gzip'] = len(gz)
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        if len(br) <= len(data) * (1 - MIN_SAVING):
+            write_atomic(path.with_name(path.name + '.br'), br)
+            sizes['br'] = len(br)
+    return sizes
+
+
+def prune(keep: set):
+    """Remove dist files that are not referenced by the current or previous
+    manifest, so clients holding a slightly older index.html keep working."""
+    for path in DIST_DIR.iterdir():
+        base = re.sub(r'\.(gz|br)$', '', path.name)
+        if base not in keep:
+            path.unlink()
+
+
+def build(verbose: bool = True):
+    DIST_DIR.mkdir(parents=True, exist_ok=True)
+    previous = {}
+    if MANIFEST_PATH.exists():
+        previous = json.loads(MANIFEST_PATH.read_text(encoding='utf-8'))
+
+    manifest = {}
+    report = []
+    for name, source in ASSETS.items():
+        data = source.read_bytes()
+        if name.endswith(('.js', '.css')):
+            data = rewrite_references(data.decode('utf-8'), manifest).encode('utf-8')
+        target = DIST_DIR / hashed_name(name, data)
+        if not target.exists():
+            write_atomic(target, data)
+        sizes = write_variants(target, data)
+        manifest[name] = target.name
+        report.append((name, target.name, sizes))
+
+    index_html = (STATIC_DIR / "index.html").read_text(encoding='utf-8')
+    index_data = rewrite_references(index_html, manifest).encode('utf-8')
+    write_atomic(DIST_DIR / "index.html", index_data)
+    report.append(("index.html", "index.html", write_variants(DIST_DIR / "index.html", index_data)))
+
+    # The manifest goes last: the server only switches over once every
+    # file it references is in place.
+    write_atomic(MANIFEST_PATH, json.dumps(manifest, indent=2).encode('utf-8'))
+    prune(set(manifest.values()) | set(previous.values()) | {"index.html", "manifest.json"})
+
+    if verbose:
+        for name, target, sizes in report:
+            parts = ', '.join(f"{enc} {size:,}" for enc, size in sizes.items())
+            print(f"  {name:24} -> {target:32} {parts}")
+        if brotli is None:
+            print("  (brotli not installed, skipped .br variants)")
+    return manifest
+
+
+def main():
+    print("Building static assets...")
+    build()
+    print(f"  Manifest written to {MANIFEST_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Compact, string-interned encoding of programme JSON.
+
+The programme repeats the same strings over and over (affiliations, rooms,
+session types, time slots, author names) and every session and
+presentation spells out the same keys. The compact form stores
+
+    {
+      "compact": 1,
+      "strings": [every key and interned value, most frequent first],
+      "data": <the encoded value>
+    }
+
+Lists of objects become column tables, {"#t": [rows, [key, ...], [column, ...]]},
+with each column [flags, values]:
+
+    INTERNED   strings (or lists of strings) used more than once are indices
+               into "strings", the others are inline; only for the fields
+               in INTERNED_FIELDS
+    SPARSE     not every row has the key; values are [row, value, row, value, ...]
+    CONSTANT   every row has the same scalar value, stored once
+
+Keys are interned the same way. Other objects and lists are encoded element
+by element; scalars stay as they are. No whitespace is written.
+
+build.py writes a compact variant of every day shard next to the plain one
+(see shards.py). It is a quarter smaller uncompressed; gzip finds the same
+repetitions, so compressed the two are within a few percent, and app.js
+keeps loading the plain shards. To check the round trip and compare sizes
+and parse times with the plain JSON:
+
+    python compact_format.py static/dhd2026_programm.json static/days/*.json
+    python compact_format.py --check static/days/*.json   # round trip only
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+FORMAT_VERSION = 1
+TABLE_KEY = '#t'
+
+INTERNED = 1
+SPARSE = 2
+CONSTANT = 4
+
+# Fields whose string values repeat across the programme
+INTERNED_FIELDS = frozenset((
+    'affiliation', 'affiliations', 'author', 'authors', 'chair',
+    'day_label', 'location', 'time', 'type',
+))
+
+
+class _Slot:
+    """One distinct string; its index is fixed once all uses are counted.
+    Strings used once are written inline (an index would only add bytes)."""
+    __slots__ = ('text', 'uses', 'index')
+
+    def __init__(self, text):
+        self.text = text
+        self.uses = 0
+        self.index = None
+
+
+class _Encoder:
+
+    def __init__(self):
+        self.slots = {}
+
+    def intern(self, text):
+        slot = self.slots.get(text)
+        if slot is None:
+            slot = self.slots[text] = _Slot(text)
+        slot.uses += 1
+        return slot
+
+    def value(self, value):
+        if isinstance(value, dict):
+            if TABLE_KEY in value:
+                raise ValueError(f"Key {TABLE_KEY!r} is reserved for compact tables")
+            return {key: self.value(item) for key, item in value.items()}
+        if isinstance(value, list):
+            if value and all(isinstance(item, dict) for item in value):
+                return self.table(value)
+            return [self.value(item) for item in value]
+        return value
+
+    def table(self, rows):
+        keys = []
+        seen = set()
+        for row in rows:
+            for key in row:
+                if key not in seen:
+                    seen.add(key)
+                    keys.append(key)
+        columns = []
+        for key in keys:
+            present = [(pos, row[key]) for pos, row in enumerate(rows) if key in row]
+            values = [value for _pos, value in present]
+            flags = 0
+            if key in INTERNED_FIELDS and all(_is_text(value) for value in values):
+                flags |= INTERNED
+                encoded = [self.intern(v) if isinstance(v, str) else [self.intern(s) for s in v] for v in values]
+            else:
+                encoded = [self.value(value) for value in values]
+            if len(present) < len(rows):
+                flags |= SPARSE
+                column = [item for (pos, _value), value in zip(present, encoded) for item in (pos, value)]
+            elif len(values) > 1 and _is_scalar(values[0]) and all(
+                    type(v) is type(values[0]) and v == values[0] for v in values):
+                flags |= CONSTANT
+                column = encoded[0]
+                if flags & INTERNED:
+                    # Counted once per row above, stored once
+                    encoded[0].uses -= len(values) - 1
+            else:
+                column = encoded
+            columns.append([flags, column])
+        return {TABLE_KEY: [len(rows), [self.intern(key) for key in keys], columns]}
+
+    def strings(self):
+        ordered = sorted((slot for slot in self.slots.values() if slot.uses > 1), key=lambda slot: -slot.uses)
+        for index, slot in enumerate(ordered):
+            slot.index = index
+        return [slot.text for slot in ordered]
+
+
+def _is_text(value):
+    return isinstance(value, str) or (isinstance(value, list) and all(isinstance(v, str) for v in value))
+
+
+def _is_scalar(value):
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def encode(data) -> dict:
+    """The compact document for a JSON value."""
+    encoder = _Encoder()
+    encoded = encoder.value(data)
+    return {'compact': FORMAT_VERSION, 'strings': encoder.strings(), 'data': encoded}
+
+
+def dumps(data) -> bytes:
+    """Compact document for `data`, serialized without whitespace."""
+    return json.dumps(encode(data), ensure_ascii=False, separators=(',', ':'),
+                      default=_slot_value).encode('utf-8')
+
+
+def _slot_value(slot):
+    return slot.text if slot.index is None else slot.index
+
+
+def decode(document: dict):
+    """The JSON value a compact document was made from."""
+    if document.get('compact') != FORMAT_VERSION:
+        raise ValueError('Unsupported compact format version')
+    return _decode(document['data'], document['strings'])
+
+
+def loads(data):
+    return decode(json.loads(data))
+
+
+def _decode(value, strings):
+    if isinstance(value, list):
+        return [_decode(item, strings) for item in value]
+    if isinstance(value, dict):
+        if TABLE_KEY in value:
+            return _decode_table(value[TABLE_KEY], strings)
+        return {key: _decode(item, strings) for key, item in value.items()}
+    return value
+
+
+def _decode_table(table, strings):
+    count, keys, columns = table
+    rows = [{} for _ in range(count)]
+
+    def text(value):
+        return strings[value] if isinstance(value, int) else value
+
+    for key, (flags, column) in zip(keys, columns):
+        key = text(key)
+        if flags & CONSTANT:
+            pairs = ((pos, column) for pos in range(count))
+        elif flags & SPARSE:
+            pairs = zip(column[::2], column[1::2])
+        else:
+            pairs = enumerate(column)
+        if flags & INTERNED:
+            for pos, value in pairs:
+                rows[pos][key] = [text(v) for v in value] if isinstance(value, list) else text(value)
+        else:
+            for pos, value in pairs:
+                rows[pos][key] = _decode(value, strings)
+    return rows
+
+
+def _best_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def compare(path: Path, repeat: int = 50):
+    """Print sizes and parse times of the file as it is, minified and compact.
+    Raises ValueError if the compact form does not round-trip."""
+    original = path.read_bytes()
+    data = json.loads(original)
+    minified = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    compact = dumps(data)
+    if loads(compact) != data:
+        raise ValueError("compact form does not round-trip")
+
+    print(f"{path.name}: round trip ok")
+    print(f"  {'format':10} {'bytes':>10} {'gzip':>9} {'parse ms':>9}")
+    for label, output, parse in (
+        ('as is', original, json.loads),
+        ('minified', minified, json.loads),
+        ('compact', compact, loads),
+    ):
+        gz = len(gzip.compress(output, compresslevel=9, mtime=0))
+        print(f"  {label:10} {len(output):>10,} {gz:>9,} {_best_ms(lambda: parse(output), repeat):>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare programme JSON with its compact encoding.")
+    parser.add_argument('paths', nargs='*', type=Path,
+                        default=[Path(__file__).parent / 'static' / 'dhd2026_programm.json'])
+    parser.add_argument('--check', action='store_true', help="only check the round trip, print no timings")
+    parser.add_argument('--repeat', type=int, default=50, help="parses per timing (median is reported)")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for path in args.paths:
+        try:
+            if args.check:
+                data = json.loads(path.read_bytes())
+                if loads(dumps(data)) != data:
+                    raise ValueError("compact form does not round-trip")
+                print(f"{path.name}: round trip ok")
+            else:
+                compare(path, args.repeat)
+        except ValueError as e:
+            print(f"{path.name}: {e}", file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Configuration of the Flask app (see server.create_app).
+
+The session secret must be the same in every worker process, or a login
+made on one worker is rejected by the next. It is taken from, in order:
+
+    FLASK_SECRET_KEY        the key itself
+    MYDHD_SECRET_KEY_FILE   a file holding it (default: .secret_key), created
+                            with a random key on first start unless
+                            MYDHD_REQUIRE_SECRET_KEY=1
+
+With MYDHD_REQUIRE_SECRET_KEY=1 a missing key is a startup error instead.
+"""
+
+import os
+import secrets
+
+
+def _flag(name, default='0') -> bool:
+    return os.environ.get(name, default).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _names(name) -> frozenset:
+    return frozenset(v.strip() for v in os.environ.get(name, '').split(',') if v.strip())
+
+
+class Config:
+    SECRET_KEY = os.environ.get('FLASK_SECRET_KEY')
+    SECRET_KEY_FILE = os.environ.get('MYDHD_SECRET_KEY_FILE', '.secret_key')
+    REQUIRE_SECRET_KEY = _flag('MYDHD_REQUIRE_SECRET_KEY')
+
+    SESSION_COOKIE_HTTPONLY = True
+    SESSION_COOKIE_SAMESITE = 'Lax'
+    SESSION_COOKIE_SECURE = _flag('MYDHD_COOKIE_SECURE')
+
+    # Usernames allowed to read the popularity stats (none by default)
+    ORGANIZERS = _names('MYDHD_ORGANIZERS')
+    # Bearer token for /metrics and /api/stats from other hosts (unset:
+    # local requests only)
+    METRICS_TOKEN = os.environ.get('MYDHD_METRICS_TOKEN')
+
+    DEBUG = False
+
+
+class DevelopmentConfig(Config):
+    """`python server.py`: debugger and reloader on."""
+    DEBUG = True
+
+
+class ProductionConfig(Config):
+    """wsgi.py behind gunicorn (see gunicorn.conf.py)."""
+    SESSION_COOKIE_SECURE = _flag('MYDHD_COOKIE_SECURE', '1')
+
+
+def load_secret_key(path: str, create: bool = True) -> str:
+    """The key stored at `path`; a new random one is written there (mode 0600)
+    if it does not exist yet and `create` is set."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            key = f.read().strip()
+        if key:
+            return key
+        raise RuntimeError(f'Secret key file {path} is empty')
+    except FileNotFoundError:
+        if not create:
+            raise RuntimeError(
+                f'No session secret: set FLASK_SECRET_KEY or create {path} '
+                '(MYDHD_REQUIRE_SECRET_KEY is set)') from None
+
+    key = secrets.token_hex(32)
+    tmp = f'{path}.{os.getpid()}.tmp'
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(key + '\n')
+    try:
+        # link() never replaces: when several processes start at once, the
+        # first key wins and the others read it
+        os.link(tmp, path)
+    except FileExistsError:
+        return load_secret_key(path, create=False)
+    finally:
+        os.unlink(tmp)
+    return key
+
+
+def secret_key(config) -> str:
+    """The session secret for a config class or mapping."""
+    get = config.get if isinstance(config, dict) else lambda name: getattr(config, name, None)
+    if get('SECRET_KEY'):
+        return get('SECRET_KEY')
+    return load_secret_key(get('SECRET_KEY_FILE'), create=not get('REQUIRE_SECRET_KEY'))
@@ -0,0 +1,397 @@
+"""
+Single-pass streaming parser for the ConfTool programme export (programm.html).
+
+The export is fed to an incremental tokenizer (html.parser.HTMLParser) in
+chunks, and typed records are yielded as soon as they are complete:
+
+  Session  one per <tbody id='session_NNN'>: label, time, location, chair
+  Paper    one per <div id='paperIDNNN'>: title, authors, affiliations,
+           abstract; linked to its session by `session_key`
+
+Memory use is bounded by the chunk size plus the record being built, so
+larger multi-track exports parse in linear time and constant memory.
+
+    for record in conftool.iter_records(HTML_PATH):
+        if isinstance(record, conftool.Session): ...
+        elif isinstance(record, conftool.Paper): ...
+"""
+
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import List, Optional
+
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class Chair:
+    name: str
+    affiliation: str
+    text: str  # as printed: "Name, Affiliation"
+
+
+@dataclass
+class Session:
+    key: str  # "session_405"
+    label: str = ''
+    time: str = ''
+    location: str = ''
+    chair: Optional[Chair] = None
+
+
+@dataclass
+class Author:
+    name: str
+    presenting: bool = False
+    affiliation_refs: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Affiliation:
+    number: Optional[str]
+    name: str
+
+
+@dataclass
+class Paper:
+    paper_id: str  # "429" for <div id='paperID429'>
+    session_key: Optional[str] = None
+    title: Optional[str] = None  # None: no paper_title paragraph
+    authors: Optional[List[Author]] = None  # None: no paper_author paragraph
+    affiliations: List[Affiliation] = field(default_factory=list)
+    abstract_paragraphs: List[str] = field(default_factory=list)
+
+    @property
+    def abstract(self) -> str:
+        return '\n'.join(self.abstract_paragraphs)
+
+    @property
+    def author_names(self) -> List[str]:
+        return [a.name for a in self.authors or []]
+
+
+PAPER_FIELDS = ('paper_title', 'paper_author', 'paper_organisation', 'paper_abstract')
+
+
+def derive_session_id(label: str) -> str:
+    """
+    Convert HTML session label to JSON session_id format.
+
+    Examples:
+      "Workshop 1" -> "Workshop 1"
+      "Mittwoch, 1:3: Mittwoch, 1:3 – Forschungsdatenstandards" -> "Mittwoch 1:3"
+      "Donnerstag 1:1: Donnerstag 1:1 – Panel" -> "Donnerstag 1:1"
+      "Eröffnungskeynote: Eröffnungskeynote" -> "Eröffnungskeynote"
+      "Promovierende Digital History" -> "Promovierende Digital History"
+    """
+    if label.startswith('Workshop'):
+        return label
+    m = re.match(r'^(Mittwoch|Dienstag|Donnerstag|Freitag),?\s*(\d+(?::\d+)?)\s*:', label)
+    if m:
+        return f"{m.group(1)} {m.group(2)}"
+    m = re.match(r'^([^:]+):', label)
+    if m:
+        return m.group(1).strip()
+    return label
+
+
+class ConfToolParser(HTMLParser):
+    """Incremental parser; call feed() repeatedly and drain pop_records()."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._records = []
+        self.session = None
+        self._header_open = False   # still inside the session's header row
+        self._paper = None
+        # Header capture: (kind, tag, depth, text parts, bold parts)
+        self._capture = None
+        self._expect = None         # 'location' / 'chair' after their label text
+        self._in_bold = 0           # <b> depth inside the chair capture (the name)
+        self._header_tail = ''      # recent header text; labels may span chunks
+        # Paper field capture
+        self._field = None
+        self._parts = []
+        self._in_sup = False
+        self._in_u = 0
+
+    # -- record management -------------------------------------------------
+
+    def pop_records(self):
+        records, self._records = self._records, []
+        return records
+
+    def _emit_session(self):
+        if self.session is not None and self._header_open:
+            self._header_open = False
+            self._capture = self._expect = None
+            self._header_tail = ''
+            self._records.append(self.session)
+
+    def _end_paper(self):
+        if self._paper is not None:
+            self._end_field()
+            self._records.append(self._paper)
+            self._paper = None
+
+    def _end_session(self):
+        self._end_paper()
+        self._emit_session()
+        self.session = None
+
+    def begin_session(self, key):
+        """Start a session; also used to parse a single session fragment."""
+        self._end_session()
+        self.session = Session(key=key)
+        self._header_open = True
+
+    def close(self):
+        super().close()
+        self._end_session()
+
+    # -- tokenizer callbacks -----------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        element_id = attrs.get('id') or ''
+
+        if tag == 'tbody' and element_id.startswith('session_'):
+            self.begin_session(element_id)
+            return
+        if tag == 'div' and element_id.startswith('paperID'):
+            self._end_paper()
+            self._emit_session()
+            self._paper = Paper(
+                paper_id=element_id[len('paperID'):],
+                session_key=self.session.key if self.session else None,
+            )
+            return
+
+        if self._paper is not None:
+            self._paper_starttag(tag, attrs)
+        elif self._header_open:
+            self._header_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag == 'tbody':
+            self._end_session()
+            return
+        if self._paper is not None:
+            self._paper_endtag(tag)
+        elif self._header_open:
+            self._header_endtag(tag)
+
+    def handle_data(self, data):
+        if self._paper is not None:
+            if self._field:
+                self._parts.append(('sup' if self._in_sup else 'text', data, self._in_u > 0))
+            return
+        if not self._header_open:
+            return
+        if self._capture is not None:
+            kind, tag, depth, parts, bold = self._capture
+            parts.append(data)
+            if kind == 'chair' and self._in_bold:
+                bold.append(data)
+            return
+        tail = (self._header_tail + data)[-64:]
+        if 'Ort:' in tail:
+            self._expect, tail = 'location', ''
+        elif 'Chair der Sitzung:' in tail:
+            self._expect, tail = 'chair', ''
+        self._header_tail = tail
+
+    # -- session header ----------------------------------------------------
+
+    def _header_starttag(self, tag, attrs):
+        if self._capture is not None:
+            kind, ctag, depth, parts, bold = self._capture
+            if tag == ctag:
+                self._capture = (kind, ctag, depth + 1, parts, bold)
+            if kind == 'chair' and tag == 'b':
+                self._in_bold += 1
+            return
+        if tag == 'b' and not self.session.label:
+            self._capture = ('label', 'b', 1, [], [])
+        elif tag == 'span' and 'fontbold' in (attrs.get('class') or '').split() and not self.session.time:
+            self._capture = ('time', 'span', 1, [], [])
+        elif tag == 'a' and self._expect == 'location':
+            self._capture = ('location', 'a', 1, [], [])
+        elif tag == 'span' and self._expect == 'chair':
+            self._capture = ('chair', 'span', 1, [], [])
+
+    def _header_endtag(self, tag):
+        if tag == 'tr':
+            self._emit_session()
+            return
+        if self._capture is None:
+            return
+        kind, ctag, depth, parts, bold = self._capture
+        if kind == 'chair' and tag == 'b':
+            self._in_bold = max(0, self._in_bold - 1)
+        if tag != ctag:
+            return
+        if depth > 1:
+            self._capture = (kind, ctag, depth - 1, parts, bold)
+            return
+        self._capture = self._expect = None
+        text = ''.join(parts).strip()
+        if kind == 'label':
+            self.session.label = text
+        elif kind == 'time':
+            self.session.time = text
+        elif kind == 'location':
+            self.session.location = text
+        elif kind == 'chair':
+            self._in_bold = 0
+            name = ''.join(bold).strip()
+            affiliation = text[len(name):].lstrip(' ,') if name and text.startswith(name) else ''
+            self.session.chair = Chair(name=name or text, affiliation=affiliation, text=text)
+
+    # -- papers ------------------------------------------------------------
+
+    def _paper_starttag(self, tag, attrs):
+        if tag == 'p':
+            cls = attrs.get('class')
+            self._end_field()
+            if cls in PAPER_FIELDS:
+                self._field = cls
+                self._parts = []
+        elif self._field is None:
+            return
+        elif tag == 'sup':
+            self._in_sup = True
+            if self._field == 'paper_organisation':
+                self._parts.append(('sep', '', False))
+        elif tag == 'u':
+            self._in_u += 1
+
+    def _paper_endtag(self, tag):
+        if tag == 'p':
+            self._end_field()
+        elif tag == 'sup':
+            self._in_sup = False
+        elif tag == 'u':
+            self._in_u = max(0, self._in_u - 1)
+
+    def _end_field(self):
+        field_name, parts = self._field, self._parts
+        self._field, self._parts, self._in_sup, self._in_u = None, [], False, 0
+        if field_name is None or self._paper is None:
+            return
+        paper = self._paper
+        if field_name == 'paper_title':
+            if paper.title is None:
+                paper.title = ''.join(text for kind, text, _ in parts if kind == 'text').strip()
+        elif field_name == 'paper_abstract':
+            text = ''.join(text for kind, text, _ in parts if kind == 'text').strip()
+            if text:
+                paper.abstract_paragraphs.append(text)
+        elif field_name == 'paper_author':
+            if paper.authors is None:
+                paper.authors = _parse_authors(parts)
+        elif field_name == 'paper_organisation':
+            if not paper.affiliations:
+                paper.affiliations = _parse_affiliations(parts)
+
+
+def _parse_authors(parts):
+    """Authors are comma-separated names; <sup> holds affiliation numbers
+    (which may themselves contain commas) and <u> marks presenters."""
+    chunks = [['', False, []]]
+    for kind, text, underlined in parts:
+        if kind == 'sup':
+            chunks[-1][2].extend(n.strip() for n in text.split(',') if n.strip())
+            continue
+        pieces = text.split(',')
+        for i, piece in enumerate(pieces):
+            if i > 0:
+                chunks.append(['', False, []])
+            chunks[-1][0] += piece
+            if underlined and piece.strip():
+                chunks[-1][1] = True
+    return [
+        Author(name=name.strip(), presenting=presenting, affiliation_refs=refs)
+        for name, presenting, refs in chunks
+        if name.strip()
+    ]
+
+
+def _parse_affiliations(parts):
+    """Affiliations are "<sup>N</sup>Name; <sup>M</sup>Name" sequences."""
+    chunks = [[None, '']]
+    for kind, text, _ in parts:
+        if kind == 'sep':
+            chunks.append(['', ''])
+        elif kind == 'sup':
+            chunks[-1][0] = (chunks[-1][0] or '') + text.strip()
+        else:
+            chunks[-1][1] += text
+    result = []
+    for number, name in chunks:
+        name = name.strip().rstrip(';').strip()
+        if name:
+            result.append(Affiliation(number=number or None, name=name))
+    return result
+
+
+def _iter_chunks(source, chunk_size):
+    if isinstance(source, str) and not source.lstrip().startswith('<') and len(source) < 4096:
+        source = Path(source)
+    if isinstance(source, Path):
+        with open(source, encoding='utf-8') as f:
+            yield from iter(lambda: f.read(chunk_size), '')
+    elif isinstance(source, str):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+    else:
+        yield from iter(lambda: source.read(chunk_size), '')
+
+
+BLOCK_START = re.compile(r"<tbody\s+id='(session_\d+)'\s*>|<div\s+id='paperID(\d+)'>", re.IGNORECASE)
+
+
+def iter_blocks(html_content: str):
+    """Split the export at session and paper starts without parsing it.
+
+    Yields (key, session_key, text): key is 'session_NNN' or 'paperIDNNN'
+    (repeated papers get '#2', '#3', ...), session_key the enclosing session
+    and text the raw block up to the next start. parse_block() turns a block
+    into the records iter_records() would have produced for it.
+    """
+    matches = list(BLOCK_START.finditer(html_content))
+    seen = {}
+    session_key = None
+    for i, m in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(html_content)
+        if m.group(1):
+            session_key = key = m.group(1)
+        else:
+            key = 'paperID' + m.group(2)
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] > 1:
+            key = f"{key}#{seen[key]}"
+        yield key, session_key, html_content[m.start():end]
+
+
+def parse_block(text: str, session_key: Optional[str] = None):
+    """Parse one block from iter_blocks(); returns its records."""
+    parser = ConfToolParser()
+    if session_key is not None and not text.lstrip().lower().startswith('<tbody'):
+        parser.session = Session(key=session_key)
+    parser.feed(text)
+    parser.close()
+    return parser.pop_records()
+
+
+def iter_records(source, chunk_size=CHUNK_SIZE):
+    """Yield Session and Paper records from a path, an open text file or an
+    HTML string, in document order."""
+    parser = ConfToolParser()
+    for chunk in _iter_chunks(source, chunk_size):
+        parser.feed(chunk)
+        yield from parser.pop_records()
+    parser.close()
+    yield from parser.pop_records()
@@ -0,0 +1,249 @@
+"""
+SQLite access layer for server.py.
+
+Connections are pooled and reused across requests instead of being opened
+per call. Every connection runs in WAL mode with tuned pragmas and a large
+prepared-statement cache; write transactions start with BEGIN IMMEDIATE and
+are retried with backoff when the database is busy.
+
+Usage:
+    with db.connection() as conn:       # reads, autocommit
+        conn.execute(...)
+    with db.transaction() as conn:      # writes, one atomic transaction
+        conn.execute(...)
+
+Nested blocks on the same thread share one connection, so a transaction
+can call helpers that use db.connection() themselves.
+
+Every statement is timed (mydhd_db_query_seconds, by statement verb), as is
+the wait for the write lock and the whole of each write transaction.
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import metrics
+
+DB_NAME = os.environ.get('MYDHD_DB', 'conference.db')
+
+# ms SQLite itself waits for a lock before reporting SQLITE_BUSY
+BUSY_TIMEOUT_MS = 5000
+
+PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),   # safe with WAL, avoids an fsync per commit
+    ('busy_timeout', BUSY_TIMEOUT_MS),
+    ('foreign_keys', 'ON'),
+    ('temp_store', 'MEMORY'),
+    ('cache_size', -8000),       # KiB
+)
+
+# Prepared statements kept per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Idle connections kept for reuse; extra ones are closed on release
+MAX_IDLE = 16
+
+# Extra attempts on top of busy_timeout when a write cannot get the lock
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.01
+
+
+QUERY_SECONDS = metrics.histogram(
+    'mydhd_db_query_seconds', 'Time to execute an SQLite statement (until the first row)', ('statement',))
+LOCK_WAIT_SECONDS = metrics.histogram(
+    'mydhd_db_lock_wait_seconds', 'Time BEGIN IMMEDIATE waited for the write lock, retries included')
+TRANSACTION_SECONDS = metrics.histogram(
+    'mydhd_db_transaction_seconds', 'Duration of write transactions from BEGIN to COMMIT')
+
+
+def statement_verb(sql: str) -> str:
+    """First keyword of a statement (SELECT, INSERT, ...), the metrics label."""
+    return sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 connection that times execute()/executemany() calls."""
+
+    def _timed(self, method, sql, args):
+        start = time.perf_counter()
+        try:
+            return method(self, sql, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            QUERY_SECONDS.observe(elapsed, statement_verb(sql))
+            metrics.add_db_time(elapsed)
+
+    def execute(self, sql, *args):
+        return self._timed(sqlite3.Connection.execute, sql, args)
+
+    def executemany(self, sql, *args):
+        return self._timed(sqlite3.Connection.executemany, sql, args)
+
+
+def is_busy_error(exc: Exception) -> bool:
+    msg = str(exc).lower()
+    return isinstance(exc, sqlite3.OperationalError) and ('locked' in msg or 'busy' in msg)
+
+
+class ConnectionPool:
+    """A small pool of SQLite connections, safe to use across fork()."""
+
+    def __init__(self, path: str, max_idle: int = MAX_IDLE):
+        self.path = path
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = []
+        self._local = threading.local()
+        self._pid = os.getpid()
+        self._stats = {
+            'opened': 0,
+            'reused': 0,
+            'closed': 0,
+            'in_use': 0,
+            'transactions': 0,
+            'busy_retries': 0,
+            'busy_failures': 0,
+        }
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,          # transactions are managed explicitly
+            check_same_thread=False,       # a connection moves between threads via the pool
+            cached_statements=STATEMENT_CACHE_SIZE,
+            factory=TimedConnection,
+        )
+        conn.row_factory = sqlite3.Row
+        for name, value in PRAGMAS:
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _check_fork(self):
+        # Connections must never be shared with a forked child; drop
+        # (without closing) whatever the parent process left behind.
+        if os.getpid() != self._pid:
+            with self._lock:
+                if os.getpid() != self._pid:
+                    self._idle = []
+                    self._local = threading.local()
+                    self._pid = os.getpid()
+                    self._stats['in_use'] = 0
+
+    def acquire(self):
+        self._check_fork()
+        with self._lock:
+            self._stats['in_use'] += 1
+            if self._idle:
+                self._stats['reused'] += 1
+                return self._idle.pop()
+            self._stats['opened'] += 1
+        return self._connect()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._stats['in_use'] -= 1
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+            self._stats['closed'] += 1
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Yield this thread's current connection, checking one out if needed."""
+        self._check_fork()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self.acquire()
+        self._local.conn, self._local.depth = conn, 1
+        try:
+            yield conn
+        finally:
+            self._local.conn, self._local.depth = None, 0
+            self.release(conn)
+
+    def _execute_with_retry(self, conn, sql):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                conn.execute(sql)
+                return
+            except sqlite3.OperationalError as exc:
+                if not is_busy_error(exc) or attempt == MAX_RETRIES:
+                    if is_busy_error(exc):
+                        with self._lock:
+                            self._stats['busy_failures'] += 1
+                    raise
+                with self._lock:
+                    self._stats['busy_retries'] += 1
+                time.sleep(RETRY_BASE_DELAY * (2 ** attempt) * (0.5 + random.random()))
+
+    @contextmanager
+    def transaction(self):
+        """Run the block in one write transaction (BEGIN IMMEDIATE ... COMMIT).
+
+        Nested calls join the enclosing transaction.
+        """
+        with self.connection() as conn:
+            if conn.in_transaction:
+                yield conn
+                return
+            start = time.perf_counter()
+            self._execute_with_retry(conn, 'BEGIN IMMEDIATE')
+            LOCK_WAIT_SECONDS.observe(time.perf_counter() - start)
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            self._execute_with_retry(conn, 'COMMIT')
+            TRANSACTION_SECONDS.observe(time.perf_counter() - start)
+            with self._lock:
+                self._stats['transactions'] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, idle=len(self._idle), pid=os.getpid())
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._stats['closed'] += len(idle)
+        for conn in idle:
+            conn.close()
+
+
+pool = ConnectionPool(DB_NAME)
+
+
+def configure(path: str):
+    """Point the module-level pool at another database file."""
+    global pool
+    pool.close_all()
+    pool = ConnectionPool(path)
+
+
+def connection():
+    return pool.connection()
+
+
+def transaction():
+    return pool.transaction()
+
+
+def pool_stats() -> dict:
+    return pool.stats()
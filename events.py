@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Server-Sent Events for logged-in clients: /api/events.
+
+    python events.py                    # listens on MYDHD_EVENTS_BIND
+
+A stream stays open for as long as the page does, so it must not occupy a
+WSGI worker thread. This is a separate asyncio server (one process, one
+thread) next to gunicorn; the reverse proxy sends /api/events (and only
+that path) here:
+
+    location = /api/events {
+        proxy_pass http://127.0.0.1:8081;
+        proxy_buffering off;
+        proxy_read_timeout 1h;
+    }
+
+Clients authenticate with their Flask session cookie (same secret as the
+app, see config.py). Events:
+
+    event: hello        {"version": N, "programme": etag}, once on connect
+    event: bookmarks    {"version": N}, when the user's bookmarks changed
+    event: programme    {"etag": etag}, when the programme file of the
+                        default conference changed (MYDHD_CONFERENCES)
+
+plus a comment line as heartbeat every MYDHD_EVENTS_HEARTBEAT seconds so
+proxies keep idle streams open.
+
+Bookmarks are written by the gunicorn workers, so changes are found by
+polling SQLite: PRAGMA data_version tells whether any other connection
+committed since the last poll, and only then are the bookmark versions of
+the connected users read (in batches). One poll serves every stream; the
+result is fanned out in-process by the Broker. Each stream keeps only the
+latest event of each kind, so a slow client never queues up memory.
+
+The programme file is the one the app serves at its unprefixed URLs: the
+first in MYDHD_CONFERENCES, found the same way registry.py does. It is
+checked like the app's watcher does (mtime and size first, settled for one
+more check, then the content hash), so the ETag announced is the one the
+app reloads to.
+
+Configuration (environment):
+    MYDHD_EVENTS_BIND       host:port (default 127.0.0.1:8081)
+    MYDHD_EVENTS_HEARTBEAT  seconds between heartbeats (default 25)
+    MYDHD_EVENTS_POLL_MS    database poll interval (default 1000)
+    MYDHD_EVENTS_PER_USER   open streams per user (default 4); more get 429
+    MYDHD_EVENTS_MAX        open streams in total (default 10000); more get 503
+
+/api/events/stats (stream and poll counters) is answered only to requests
+from this host that did not come through the proxy.
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import resource
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.cookies import SimpleCookie
+
+from flask import Flask
+from itsdangerous import BadSignature
+
+import config
+import db
+import registry
+from programme import content_etag
+
+EVENTS_BIND = os.environ.get('MYDHD_EVENTS_BIND', '127.0.0.1:8081')
+HEARTBEAT = float(os.environ.get('MYDHD_EVENTS_HEARTBEAT', '25'))
+POLL_INTERVAL = int(os.environ.get('MYDHD_EVENTS_POLL_MS', '1000')) / 1000
+MAX_STREAMS_PER_USER = int(os.environ.get('MYDHD_EVENTS_PER_USER', '4'))
+MAX_STREAMS = int(os.environ.get('MYDHD_EVENTS_MAX', '10000'))
+
+# Reconnect delay suggested to EventSource (ms)
+RETRY_MS = 5000
+
+# Seconds a client gets to send its request headers
+REQUEST_TIMEOUT = 10
+
+# The programme file is checked every this many polls
+PROGRAMME_CHECK_EVERY = 5
+
+# Usernames per version query
+POLL_BATCH = 500
+
+# Programme file of the default conference (the first in MYDHD_CONFERENCES,
+# see registry.py): the one the app serves at the URLs the frontend uses
+PROGRAMME_PATH = next(iter(registry.parse_conferences(os.environ.get('MYDHD_CONFERENCES')).values()))
+
+logger = logging.getLogger(__name__)
+
+
+class Stream:
+    """One open event stream: the latest pending event of each kind."""
+
+    def __init__(self, username):
+        self.username = username
+        self.pending = {}
+        self.wake = asyncio.Event()
+
+    def push(self, event, data):
+        self.pending[event] = data
+        self.wake.set()
+
+    def take(self):
+        pending, self.pending = self.pending, {}
+        self.wake.clear()
+        return pending
+
+
+class Broker:
+    """In-process pub/sub: streams by user, with connection limits."""
+
+    def __init__(self, per_user=MAX_STREAMS_PER_USER, total=MAX_STREAMS):
+        self.per_user = per_user
+        self.total = total
+        self.streams = {}   # username -> set of Stream
+        self.count = 0
+        self.stats = {'opened': 0, 'closed': 0, 'rejected': 0, 'published': 0}
+
+    def subscribe(self, username):
+        """A new Stream, or an HTTPStatus if a limit is reached."""
+        if self.count >= self.total:
+            self.stats['rejected'] += 1
+            return HTTPStatus.SERVICE_UNAVAILABLE
+        streams = self.streams.setdefault(username, set())
+        if len(streams) >= self.per_user:
+            self.stats['rejected'] += 1
+            return HTTPStatus.TOO_MANY_REQUESTS
+        stream = Stream(username)
+        streams.add(stream)
+        self.count += 1
+        self.stats['opened'] += 1
+        return stream
+
+    def unsubscribe(self, stream):
+        streams = self.streams.get(stream.username)
+        if streams is None or stream not in streams:
+            return
+        streams.discard(stream)
+        if not streams:
+            del self.streams[stream.username]
+        self.count -= 1
+        self.stats['closed'] += 1
+
+    def publish(self, username, event, data):
+        for stream in self.streams.get(username, ()):
+            stream.push(event, data)
+            self.stats['published'] += 1
+
+    def broadcast(self, event, data):
+        for username in self.streams:
+            self.publish(username, event, data)
+
+    def snapshot(self) -> dict:
+        return dict(self.stats, streams=self.count, users=len(self.streams))
+
+
+class ChangePoller:
+    """Finds bookmark version and programme changes and publishes them."""
+
+    def __init__(self, broker, programme_path=PROGRAMME_PATH, interval=POLL_INTERVAL):
+        self.broker = broker
+        self.programme_path = programme_path
+        self.interval = interval
+        self.versions = {}        # username -> last version published or sent
+        self.programme = None     # (fingerprint, etag)
+        self._pending = None      # changed fingerprint waiting to settle
+        # One thread and one connection: data_version is per connection
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='events-db')
+        self._conn = None
+        self._data_version = None
+        self.polls = 0
+        self.queries = 0
+
+    def _read_versions(self, usernames, force):
+        """{username: version} if the database changed since the last
+        unforced call, else None; `force` always reads and leaves the change
+        marker alone. Runs on the poller thread."""
+        if self._conn is None:
+            self._conn = db.pool.acquire()
+        if not force:
+            data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+            if data_version == self._data_version:
+                return None
+            self._data_version = data_version
+        result = {}
+        for i in range(0, len(usernames), POLL_BATCH):
+            batch = usernames[i:i + POLL_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            rows = self._conn.execute(
+                f'SELECT username, bookmark_version FROM users WHERE username IN ({placeholders})', batch
+            ).fetchall()
+            self.queries += 1
+            result.update((row['username'], row['bookmark_version']) for row in rows)
+        return result
+
+    def _programme_etag(self):
+        """(fingerprint, etag) of the programme file. As in the app's
+        registry, a changed file is only read once its mtime and size have
+        held for one more check, so clients are not sent to a programme the
+        app has not reloaded yet."""
+        fingerprint = registry.file_fingerprint(self.programme_path)
+        if fingerprint is None or (self.programme and self.programme[0] == fingerprint):
+            self._pending = None
+            return self.programme
+        if self.programme and self._pending != fingerprint:
+            self._pending = fingerprint
+            return self.programme
+        self._pending = None
+        with open(self.programme_path, 'rb') as f:
+            return fingerprint, content_etag(f.read())
+
+    async def run_in_thread(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def current_version(self, username):
+        versions = await self.run_in_thread(self._read_versions, [username], True)
+        return versions.get(username)
+
+    async def programme_etag(self):
+        self.programme = await self.run_in_thread(self._programme_etag)
+        return self.programme[1] if self.programme else None
+
+    async def poll_once(self, check_programme=False):
+        self.polls += 1
+        usernames = list(self.broker.streams)
+        if usernames:
+            versions = await self.run_in_thread(self._read_versions, usernames, False)
+            for username, version in (versions or {}).items():
+                if self.versions.get(username) != version:
+                    self.versions[username] = version
+                    self.broker.publish(username, 'bookmarks', {'version': version})
+        if check_programme:
+            before = self.programme
+            after = await self.run_in_thread(self._programme_etag)
+            self.programme = after
+            if before and after and before[1] != after[1]:
+                self.broker.broadcast('programme', {'etag': after[1]})
+        # Forget users without streams
+        for username in [u for u in self.versions if u not in self.broker.streams]:
+            del self.versions[username]
+
+    async def run(self):
+        while True:
+            try:
+                await self.poll_once(check_programme=self.polls % PROGRAMME_CHECK_EVERY == 0)
+            except Exception:
+                logger.exception('Event poll failed')
+            await asyncio.sleep(self.interval)
+
+
+def session_loader(secret_key):
+    """username from a Flask session cookie value, or None."""
+    app = Flask(__name__)
+    app.secret_key = secret_key
+    serializer = app.session_interface.get_signing_serializer(app)
+    max_age = int(app.permanent_session_lifetime.total_seconds())
+
+    def load(value):
+        try:
+            data = serializer.loads(value, max_age=max_age)
+        except BadSignature:
+            return None
+        username = data.get('username') if isinstance(data, dict) else None
+        return username if isinstance(username, str) else None
+
+    return load
+
+
+def format_event(event, data) -> bytes:
+    return f'event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'.encode('utf-8')
+
+
+class EventServer:
+    """The asyncio HTTP server behind /api/events."""
+
+    def __init__(self, secret_key, cookie_name='session', broker=None, poller=None, heartbeat=HEARTBEAT):
+        self.broker = broker or Broker()
+        self.poller = poller or ChangePoller(self.broker)
+        self.load_session = session_loader(secret_key)
+        self.cookie_name = cookie_name
+        self.heartbeat = heartbeat
+
+    async def respond(self, writer, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        writer.write(
+            f'HTTP/1.1 {status.value} {status.phrase}\r\n'
+            f'Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n'
+            f'Cache-Control: no-store\r\nConnection: close\r\n\r\n'.encode('latin-1') + payload
+        )
+        await writer.drain()
+
+    async def read_request(self, reader):
+        """(method, path, headers) of the request, or None."""
+        head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), REQUEST_TIMEOUT)
+        lines = head.decode('latin-1').split('\r\n')
+        parts = lines[0].split()
+        if len(parts) != 3:
+            return None
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(':')
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+        return parts[0], parts[1].split('?', 1)[0], headers
+
+    def username(self, headers):
+        cookie = SimpleCookie()
+        try:
+            cookie.load(headers.get('cookie', ''))
+        except Exception:
+            return None
+        morsel = cookie.get(self.cookie_name)
+        return self.load_session(morsel.value) if morsel else None
+
+    @staticmethod
+    def is_local(writer, headers) -> bool:
+        """Whether the request comes from this host and not via the proxy."""
+        if 'x-forwarded-for' in headers or 'forwarded' in headers:
+            return False
+        peer = writer.get_extra_info('peername')
+        try:
+            return bool(peer) and ipaddress.ip_address(peer[0]).is_loopback
+        except ValueError:
+            return False
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                request = await self.read_request(reader)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            if request is None:
+                await self.respond(writer, HTTPStatus.BAD_REQUEST, {'error': 'Ungültige Anfrage.'})
+                return
+            method, path, headers = request
+            if method != 'GET':
+                await self.respond(writer, HTTPStatus.METHOD_NOT_ALLOWED, {'error': 'Methode nicht erlaubt.'})
+            elif path == '/api/events':
+                await self.stream(reader, writer, headers)
+            elif path == '/api/events/stats' and self.is_local(writer, headers):
+                await self.respond(writer, HTTPStatus.OK, {
+                    **self.broker.snapshot(), 'polls': self.poller.polls, 'queries': self.poller.queries})
+            else:
+                await self.respond(writer, HTTPStatus.NOT_FOUND, {'error': 'Nicht gefunden.'})
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def stream(self, reader, writer, headers):
+        username = self.username(headers)
+        if username is None:
+            await self.respond(writer, HTTPStatus.UNAUTHORIZED, {'error': 'Nicht eingeloggt.'})
+            return
+        stream = self.broker.subscribe(username)
+        if isinstance(stream, HTTPStatus):
+            await self.respond(writer, stream, {'error': 'Zu viele offene Verbindungen.'})
+            return
+        try:
+            version = await self.poller.current_version(username)
+            if version is None:
+                await self.respond(writer, HTTPStatus.UNAUTHORIZED, {'error': 'Benutzer nicht gefunden.'})
+                return
+            self.poller.versions.setdefault(username, version)
+            writer.write(
+                b'HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n'
+                b'X-Accel-Buffering: no\r\nConnection: keep-alive\r\n\r\n'
+                + f'retry: {RETRY_MS}\n\n'.encode('ascii')
+                + format_event('hello', {'version': version, 'programme': await self.poller.programme_etag()})
+            )
+            await writer.drain()
+
+            # The client never sends anything after its request: EOF means it
+            # left, and anything else is not an EventSource, so both end the
+            # stream. One byte at most is read, so nothing piles up here.
+            gone = asyncio.ensure_future(reader.read(1))
+            while not gone.done():
+                woke = asyncio.ensure_future(stream.wake.wait())
+                await asyncio.wait((woke, gone), timeout=self.heartbeat, return_when=asyncio.FIRST_COMPLETED)
+                woke.cancel()
+                if gone.done():
+                    break
+                events = stream.take()
+                writer.write(b''.join(format_event(event, data) for event, data in events.items()) or b': ping\n\n')
+                await writer.drain()
+            gone.cancel()
+        finally:
+            self.broker.unsubscribe(stream)
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        poller = asyncio.ensure_future(self.poller.run())
+        logger.info('Event stream listening on %s:%d', host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            poller.cancel()
+
+
+def raise_fd_limit():
+    """Every stream is a socket: allow as many as the hard limit does."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = 65536 if hard == resource.RLIM_INFINITY else hard
+    if soft != resource.RLIM_INFINITY and soft < target:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve /api/events (Server-Sent Events).")
+    parser.add_argument('--bind', default=EVENTS_BIND, help="host:port (default: %(default)s)")
+    args = parser.parse_args(argv)
+    host, _sep, port = args.bind.rpartition(':')
+
+    logging.basicConfig(level=os.environ.get('MYDHD_LOG_LEVEL', 'INFO'))
+    raise_fd_limit()
+    settings = config.ProductionConfig
+    server = EventServer(config.secret_key(settings), cookie_name=Flask.default_config['SESSION_COOKIE_NAME'])
+    try:
+        asyncio.run(server.serve(host or '127.0.0.1', int(port)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
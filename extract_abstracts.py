@@ -7,171 +7,65 @@ then matches them to the corresponding sessions/presentations in the JSON
 program file.
 """
 
-import json
-import re
-import html
 from pathlib import Path
 
+import conftool
+from conftool import derive_session_id
+from title_matcher import TitleMatcher, normalize_title
+
 BASE_DIR = Path(__file__).parent / "static"
 HTML_PATH = BASE_DIR / "programm.html"
 JSON_PATH = BASE_DIR / "dhd2026_programm.json"
 
 
-def normalize_title(title: str) -> str:
-    """Normalize a title for comparison: decode HTML entities, normalize
-    whitespace, dashes, and quotes, then lowercase."""
-    t = html.unescape(title)
-    # Normalize various dash types to a simple hyphen
-    t = re.sub(r'[\u2013\u2014\u2012\u2015]', '-', t)  # en-dash, em-dash, etc.
-    t = t.replace('---', '-')
-    # Normalize various quote types
-    t = re.sub(r'[\u201c\u201d\u201e\u201f\u00ab\u00bb]', '"', t)
-    t = re.sub(r'[\u2018\u2019\u201a\u201b]', "'", t)
-    # Normalize whitespace
-    t = re.sub(r'\s+', ' ', t).strip()
-    # Lowercase for comparison
-    t = t.lower()
-    return t
-
-
-def titles_similar(a: str, b: str, threshold: float = 0.9) -> bool:
-    """Check if two normalized titles are similar enough using
-    difflib.SequenceMatcher."""
-    if a == b:
-        return True
-    if not a or not b:
-        return False
-    from difflib import SequenceMatcher
-    ratio = SequenceMatcher(None, a, b).ratio()
-    return ratio >= threshold
-
-
-def extract_sessions_from_html(html_content: str):
+def extract_sessions_from_html(source):
     """
-    Extract sessions from the HTML. Each session is in a <tbody id='session_XXX'>.
+    Extract sessions from the HTML (a path, open file or HTML string).
+    Each session is a <tbody id='session_XXX'>.
     Returns a list of dicts with:
       - session_label: the bold text identifying the session (e.g. "Workshop 1",
         "Mittwoch, 1:3: Mittwoch, 1:3 - Forschungsdatenstandards")
-      - session_id_normalized: the extracted session_id matching JSON format
+      - session_id: the extracted session_id matching JSON format
       - presentations: list of dicts with 'title' and 'abstract'
     """
-    sessions = []
-
-    # Split HTML by tbody boundaries
-    tbody_pattern = re.compile(r"<tbody\s+id='session_\d+'\s*>", re.IGNORECASE)
-    tbody_positions = [(m.start(), m.end()) for m in tbody_pattern.finditer(html_content)]
-
-    for i, (start, tag_end) in enumerate(tbody_positions):
-        # Get content until next tbody or end of file
-        if i + 1 < len(tbody_positions):
-            end = tbody_positions[i + 1][0]
-        else:
-            end = len(html_content)
+    return sessions_from_records(conftool.iter_records(source))
 
-        block = html_content[start:end]
 
-        # Extract the session label from bold text in <a> or <span> tags
-        # Pattern 1: <a ...><b>LABEL</b></a>
-        # Pattern 2: <span ...><b>LABEL</b></span>
-        label_match = re.search(r'<b>([^<]+)</b>', block)
-        if not label_match:
-            continue
-
-        session_label = html.unescape(label_match.group(1).strip())
-
-        # Skip date headers, pauses, organizational items
-        if session_label.startswith('Datum:'):
-            continue
-        if session_label in ('Kaffeepause', 'Mittagspause'):
-            continue
+def sessions_from_records(records):
+    """Collect abstract data from a stream of conftool records."""
+    sessions = []
+    current = None
 
-        # Derive the session_id that matches JSON format
-        session_id = derive_session_id(session_label)
+    for record in records:
+        if isinstance(record, conftool.Session):
+            current = None
+            session_label = record.label
+            if not session_label:
+                continue
 
-        # Extract presentations (title + abstract) from this block
-        presentations = extract_presentations_from_block(block)
+            # Skip date headers, pauses, organizational items
+            if session_label.startswith('Datum:'):
+                continue
+            if session_label in ('Kaffeepause', 'Mittagspause'):
+                continue
 
-        sessions.append({
-            'session_label': session_label,
-            'session_id': session_id,
-            'presentations': presentations,
-        })
+            current = {
+                'session_label': session_label,
+                'session_id': derive_session_id(session_label),
+                'presentations': [],
+            }
+            sessions.append(current)
+        elif isinstance(record, conftool.Paper):
+            if current is None or record.title is None:
+                continue
+            current['presentations'].append({
+                'title': record.title,
+                'abstract': record.abstract,
+            })
 
     return sessions
 
 
-def derive_session_id(label: str) -> str:
-    """
-    Convert HTML session label to JSON session_id format.
-
-    Examples:
-      "Workshop 1" -> "Workshop 1"
-      "Mittwoch, 1:3: Mittwoch, 1:3 – Forschungsdatenstandards" -> "Mittwoch 1:3"
-      "Donnerstag 1:1: Donnerstag 1:1 – Panel" -> "Donnerstag 1:1"
-      "Eröffnungskeynote: Eröffnungskeynote" -> "Eröffnungskeynote"
-      "Promovierende Digital History" -> "Promovierende Digital History"
-    """
-    # If label starts with "Workshop", return as-is
-    if label.startswith('Workshop'):
-        return label
-
-    # Pattern: "Day, N:M: ..." or "Day N:M: ..."
-    # e.g. "Mittwoch, 1:3: Mittwoch, 1:3 – Forschungsdatenstandards"
-    # We want "Mittwoch 1:3"
-    m = re.match(r'^(Mittwoch|Dienstag|Donnerstag|Freitag),?\s*(\d+(?::\d+)?)\s*:', label)
-    if m:
-        return f"{m.group(1)} {m.group(2)}"
-
-    # Pattern: "Something: Something" (e.g. "Eröffnungskeynote: Eröffnungskeynote")
-    # For these, extract the part before the colon
-    m = re.match(r'^([^:]+):', label)
-    if m:
-        return m.group(1).strip()
-
-    # Fallback: return the label as-is
-    return label
-
-
-def extract_presentations_from_block(block: str):
-    """
-    Extract all presentations from an HTML session block.
-    Each presentation has a paper_title and zero or more paper_abstract paragraphs.
-    """
-    presentations = []
-
-    # Find all paper divs - each starts with <div id='paperIDNNN'>
-    paper_splits = re.split(r"<div\s+id='paperID\d+'>", block)
-
-    for part in paper_splits[1:]:  # Skip the first chunk (before any paperID)
-        # Extract title
-        title_match = re.search(r'<p\s+class="paper_title">(.*?)</p>', part, re.DOTALL)
-        if not title_match:
-            continue
-        title = html.unescape(title_match.group(1).strip())
-        # Remove any remaining HTML tags from title
-        title = re.sub(r'<[^>]+>', '', title).strip()
-
-        # Extract all non-empty abstract paragraphs
-        abstract_parts = []
-        for abs_match in re.finditer(r'<p\s+class="paper_abstract">(.*?)</p>', part, re.DOTALL):
-            text = abs_match.group(1).strip()
-            if text:
-                # Decode HTML entities and remove tags
-                text = html.unescape(text)
-                text = re.sub(r'<[^>]+>', '', text).strip()
-                if text:
-                    abstract_parts.append(text)
-
-        abstract = '\n'.join(abstract_parts) if abstract_parts else ''
-
-        presentations.append({
-            'title': title,
-            'abstract': abstract,
-        })
-
-    return presentations
-
-
 def clean_json(json_data):
     """Remove any previously added abstracts and dynamically-added presentations
     arrays so the script is idempotent."""
@@ -183,10 +77,11 @@ def clean_json(json_data):
                     pres.pop('abstract', None)
 
 
-def match_and_update(json_data, html_sessions):
+def match_and_update(json_data, html_sessions, memo_store=None):
     """
     Match HTML sessions to JSON sessions and add abstracts.
-    Returns count of abstracts added.
+    `memo_store` optionally keeps fuzzy title matches across runs (see
+    TitleMatcher). Returns count of abstracts added.
     """
     # Clean first for idempotency
     clean_json(json_data)
@@ -197,18 +92,25 @@ def match_and_update(json_data, html_sessions):
 
     # Build a lookup: session_id -> html_session
     html_by_id = {}
+    html_by_norm_id = {}
     for hs in html_sessions:
         sid = hs['session_id']
         if sid:
             html_by_id[sid] = hs
+    for hid, hs in html_by_id.items():
+        html_by_norm_id.setdefault(normalize_title(hid), hs)
 
-    # Also build title-based lookup for presentations across all HTML sessions
-    # normalized_title -> abstract
-    all_html_presentations = {}
+    # Title index over presentations per HTML session and across all of them
+    session_matchers = {}
+    all_html_presentations = TitleMatcher(memo_store=memo_store)
     for hs in html_sessions:
         for pres in hs['presentations']:
-            norm = normalize_title(pres['title'])
-            all_html_presentations[norm] = pres['abstract']
+            all_html_presentations.add(pres['title'], pres['abstract'])
+
+    def report(match, title):
+        if not match.exact:
+            note = ' (ambiguous, next %.2f)' % match.runner_up if match.ambiguous else ''
+            print(f"  Fuzzy match {match.score:.2f}{note}: {title[:70]}")
 
     for day in json_data['days']:
         for session in day['sessions']:
@@ -219,10 +121,7 @@ def match_and_update(json_data, html_sessions):
 
             if html_session is None and json_sid:
                 # Try fuzzy match on session_id (e.g. with/without comma)
-                for hid, hs in html_by_id.items():
-                    if normalize_title(hid) == normalize_title(json_sid):
-                        html_session = hs
-                        break
+                html_session = html_by_norm_id.get(normalize_title(json_sid))
 
             if html_session is None:
                 # Try matching by session title for sessions without session_id
@@ -247,47 +146,32 @@ def match_and_update(json_data, html_sessions):
             html_presentations = html_session['presentations']
 
             if 'presentations' in session:
+                session_matcher = session_matchers.get(id(html_session))
+                if session_matcher is None:
+                    # Added in reverse so the first of duplicate titles wins
+                    session_matcher = TitleMatcher(
+                        ((hp['title'], hp['abstract']) for hp in reversed(html_presentations)),
+                        memo_store=memo_store,
+                    )
+                    session_matchers[id(html_session)] = session_matcher
+
                 # Session has a presentations array - match each presentation by title
                 for json_pres in session['presentations']:
-                    json_pres_title_norm = normalize_title(json_pres.get('title', ''))
-                    matched = False
+                    json_pres_title = json_pres.get('title', '')
 
-                    # Try to match within this HTML session's presentations
-                    for html_pres in html_presentations:
-                        html_pres_title_norm = normalize_title(html_pres['title'])
-                        if json_pres_title_norm == html_pres_title_norm:
-                            if html_pres['abstract']:
-                                json_pres['abstract'] = html_pres['abstract']
-                                abstracts_added += 1
-                            matched = True
-                            break
+                    # Match within this HTML session's presentations (exact, then fuzzy)
+                    match = session_matcher.match(json_pres_title)
+
+                    # Fallback: global title match (exact, then fuzzy)
+                    if match is None:
+                        match = all_html_presentations.match(json_pres_title)
+                    if match is None:
+                        continue
 
-                    # Fallback: fuzzy match within session
-                    if not matched:
-                        for html_pres in html_presentations:
-                            html_pres_title_norm = normalize_title(html_pres['title'])
-                            if titles_similar(json_pres_title_norm, html_pres_title_norm):
-                                if html_pres['abstract']:
-                                    json_pres['abstract'] = html_pres['abstract']
-                                    abstracts_added += 1
-                                matched = True
-                                break
-
-                    # Fallback: try global title match (exact then fuzzy)
-                    if not matched:
-                        if json_pres_title_norm in all_html_presentations:
-                            abstract = all_html_presentations[json_pres_title_norm]
-                            if abstract:
-                                json_pres['abstract'] = abstract
-                                abstracts_added += 1
-                                matched = True
-                        if not matched:
-                            for norm_t, abstract in all_html_presentations.items():
-                                if titles_similar(json_pres_title_norm, norm_t):
-                                    if abstract:
-                                        json_pres['abstract'] = abstract
-                                        abstracts_added += 1
-                                    break
+                    report(match, json_pres_title)
+                    if match.value:
+                        json_pres['abstract'] = match.value
+                        abstracts_added += 1
             else:
                 # Session without presentations array (Workshops, Panels, Keynotes)
                 # If there's exactly one presentation in HTML, add abstract to session
@@ -330,76 +214,9 @@ def match_and_update(json_data, html_sessions):
 
 
 def main():
-    print("Reading HTML file...")
-    html_content = HTML_PATH.read_text(encoding='utf-8')
-
-    print("Reading JSON file...")
-    with open(JSON_PATH, 'r', encoding='utf-8') as f:
-        json_data = json.load(f)
-
-    print("Extracting sessions from HTML...")
-    html_sessions = extract_sessions_from_html(html_content)
-
-    total_html_presentations = sum(len(s['presentations']) for s in html_sessions)
-    total_with_abstract = sum(
-        1 for s in html_sessions
-        for p in s['presentations']
-        if p['abstract']
-    )
-    print(f"  Found {len(html_sessions)} sessions in HTML")
-    print(f"  Found {total_html_presentations} presentations in HTML")
-    print(f"  Of which {total_with_abstract} have non-empty abstracts")
-
-    # Count JSON sessions/presentations before
-    json_sessions_count = 0
-    json_presentations_count = 0
-    for day in json_data['days']:
-        for session in day['sessions']:
-            json_sessions_count += 1
-            if 'presentations' in session:
-                json_presentations_count += len(session['presentations'])
-
-    print(f"\n  Found {json_sessions_count} sessions in JSON")
-    print(f"  Found {json_presentations_count} presentations in JSON (in sessions with presentations arrays)")
-
-    print("\nMatching and updating...")
-    abstracts_added, unmatched = match_and_update(json_data, html_sessions)
-
-    print(f"\n=== RESULTS ===")
-    print(f"  Abstracts added: {abstracts_added}")
-
-    if unmatched:
-        print(f"\n  Unmatched HTML sessions with abstracts ({len(unmatched)}):")
-        for label in unmatched:
-            print(f"    - {label}")
-
-    # Verify JSON is valid by re-serializing
-    print("\nWriting updated JSON...")
-    json_output = json.dumps(json_data, indent=2, ensure_ascii=False)
-    JSON_PATH.write_text(json_output, encoding='utf-8')
-    print(f"  Written {len(json_output)} bytes to {JSON_PATH}")
-
-    # Verify by re-reading
-    with open(JSON_PATH, 'r', encoding='utf-8') as f:
-        verify = json.load(f)
-
-    # Count abstracts in final JSON
-    session_abstracts = 0
-    presentation_abstracts = 0
-    for day in verify['days']:
-        for session in day['sessions']:
-            if 'abstract' in session:
-                session_abstracts += 1
-            if 'presentations' in session:
-                for pres in session['presentations']:
-                    if 'abstract' in pres:
-                        presentation_abstracts += 1
-
-    print(f"\n=== VERIFICATION ===")
-    print(f"  Session-level abstracts: {session_abstracts}")
-    print(f"  Presentation-level abstracts: {presentation_abstracts}")
-    print(f"  Total abstracts in JSON: {session_abstracts + presentation_abstracts}")
-    print("  JSON is valid: Yes")
+    # The build pipeline parses the HTML once and writes the JSON atomically
+    import build
+    build.run(stages=('abstracts',), html_path=HTML_PATH, json_path=JSON_PATH)
 
 
 if __name__ == '__main__':
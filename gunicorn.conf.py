@@ -0,0 +1,47 @@
+"""
+gunicorn settings for wsgi:app.
+
+    MYDHD_BIND      address to listen on (default 0.0.0.0:8080)
+    MYDHD_WORKERS   worker processes (default: one per CPU)
+    MYDHD_THREADS   threads per worker (default 4)
+
+Requests are mostly short and CPU-bound in Python (JSON, routing), so one
+process per core is what scales them; a few threads per worker cover the
+time spent waiting on SQLite and on the password hashing pool. Every worker
+has its own hashing pool, so MYDHD_HASH_WORKERS defaults to a share of the
+CPUs here that keeps all workers together at about half of them.
+
+The app is preloaded: the programme, indexes and abstract store are loaded
+in the master and shared copy-on-write with the workers. Per-process state
+(SQLite connections, the hashing pool, the audit writer, the programme
+watcher) is started lazily in each worker.
+"""
+
+import gc
+import os
+
+cpus = os.cpu_count() or 1
+
+bind = os.environ.get('MYDHD_BIND', '0.0.0.0:8080')
+workers = int(os.environ.get('MYDHD_WORKERS', cpus))
+threads = int(os.environ.get('MYDHD_THREADS', '4'))
+worker_class = 'gthread'
+preload_app = True
+timeout = 30
+graceful_timeout = 10
+
+os.environ.setdefault('MYDHD_HASH_WORKERS', str(max(1, cpus // (2 * workers))))
+
+
+def when_ready(server):
+    import db
+    # The master never serves requests: close the connections the schema
+    # migration left in the pool, and keep the loaded programme out of the
+    # collector so its pages stay shared with the workers
+    db.pool.close_all()
+    gc.freeze()
+
+
+def worker_exit(server, worker):
+    import audit
+    audit.writer.stop()
@@ -0,0 +1,140 @@
+"""
+Password hashing on a bounded worker pool.
+
+Hashing is deliberately CPU-expensive. Running it inline on request threads
+lets a login rush starve every other request, so hashes are computed on a
+small dedicated pool instead. hashlib's scrypt/pbkdf2 release the GIL, so
+threads are enough to use several cores while leaving the rest for serving.
+When too many hashes are already waiting, new ones are refused with
+HashQueueFull and the caller answers 503 + Retry-After.
+
+Configuration (environment):
+    MYDHD_HASH_METHOD   werkzeug method string, e.g. "scrypt:32768:8:1" or
+                        "pbkdf2:sha256:600000". Stored hashes made with a
+                        different method are upgraded on the next login.
+    MYDHD_HASH_WORKERS  concurrent hashes (default: half the CPUs)
+    MYDHD_HASH_QUEUE    hashes allowed to wait for a worker (default 32)
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+import metrics
+
+HASH_METHOD = os.environ.get('MYDHD_HASH_METHOD', 'scrypt:32768:8:1')
+HASH_WORKERS = int(os.environ.get('MYDHD_HASH_WORKERS', max(1, (os.cpu_count() or 2) // 2)))
+HASH_QUEUE_LIMIT = int(os.environ.get('MYDHD_HASH_QUEUE', '32'))
+
+# Seconds a client is asked to wait when the queue is full
+RETRY_AFTER = 2
+
+# Time a worker spends on one hash, without the wait for a free worker
+HASH_SECONDS = metrics.histogram(
+    'mydhd_password_hash_seconds', 'CPU time of one password hash or check on the hashing pool', ('operation',),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+
+
+class HashQueueFull(Exception):
+    """Raised when the hashing pool cannot accept more work."""
+
+
+class HashPool:
+    """Bounded thread pool for password hashing, with queue counters; hash
+    durations are in the HASH_SECONDS histogram."""
+
+    def __init__(self, workers: int = HASH_WORKERS, queue_limit: int = HASH_QUEUE_LIMIT):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._depth = 0
+        self._stats = {
+            'submitted': 0,
+            'rejected': 0,
+            'max_depth': 0,
+        }
+
+    def _get_executor(self):
+        # Worker threads do not survive fork(); start a fresh pool per process
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='pwhash')
+            self._pid = os.getpid()
+            self._depth = 0
+        return self._executor
+
+    def _done(self):
+        with self._lock:
+            self._depth -= 1
+
+    def run(self, fn, *args):
+        """Run fn(*args) on the pool and wait for the result."""
+        with self._lock:
+            executor = self._get_executor()
+            if self._depth >= self.workers + self.queue_limit:
+                self._stats['rejected'] += 1
+                raise HashQueueFull()
+            self._depth += 1
+            self._stats['submitted'] += 1
+            self._stats['max_depth'] = max(self._stats['max_depth'], self._depth)
+
+        def tracked():
+            try:
+                return fn(*args)
+            finally:
+                self._done()
+
+        try:
+            future = executor.submit(tracked)
+        except RuntimeError:
+            with self._lock:
+                self._depth -= 1
+            raise
+        return future.result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(
+                self._stats,
+                depth=self._depth,
+                workers=self.workers,
+                queue_limit=self.queue_limit,
+            )
+
+
+pool = HashPool()
+
+_method_prefix = None
+
+
+def method_prefix() -> str:
+    """The method string werkzeug writes for HASH_METHOD (defaults filled in)."""
+    global _method_prefix
+    if _method_prefix is None:
+        _method_prefix = generate_password_hash('', HASH_METHOD).split('$', 1)[0]
+    return _method_prefix
+
+
+def _timed(operation, fn, *args):
+    with HASH_SECONDS.time(operation):
+        return fn(*args)
+
+
+def hash_password(password: str) -> str:
+    return pool.run(_timed, 'hash', generate_password_hash, password, HASH_METHOD)
+
+
+def check_password(password: str, password_hash: str) -> bool:
+    return pool.run(_timed, 'check', check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """True if the stored hash was made with another method or cost."""
+    return password_hash.split('$', 1)[0] != method_prefix()
+
+
+def stats() -> dict:
+    return pool.stats()
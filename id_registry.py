@@ -0,0 +1,171 @@
+"""
+Stable compact ids for sessions and presentations.
+
+Bookmark ids used to be derived from session ids, or from day, time and
+title, plus the presentation's position (`Donnerstag 4::poster-29`). They
+were long and changed whenever a title, time or position was edited. The
+build now gives every session and presentation an integer "id" and keeps
+the assignment in static/id_registry.json:
+
+    {
+      "version": 1,
+      "next_id": 232,
+      "items": [{"id", "kind", "day", "time", "title", "session_id", "paper_id",
+                 "legacy": [old bookmark ids, ...]}, ...]
+    }
+
+On every build, items are matched to their registry entries by ConfTool
+paper id, then session id, then title (exact, preferring the same day and
+time, then fuzzy), so ids survive re-extraction and edits. New items get
+the next id, and ids of removed items are never handed out again. Each entry collects the legacy ids the
+item had over time; server.py uses them to translate bookmarks stored
+under the old scheme.
+"""
+
+import json
+from pathlib import Path
+
+import conftool
+from programme import legacy_id, legacy_presentation_id
+from title_matcher import TitleMatcher, normalize_title
+
+REGISTRY_VERSION = 1
+REGISTRY_PATH = Path(__file__).parent / "static" / "id_registry.json"
+
+
+def empty_registry() -> dict:
+    return {'version': REGISTRY_VERSION, 'next_id': 1, 'items': []}
+
+
+def load_registry(path: Path = REGISTRY_PATH) -> dict:
+    """The registry at `path`, or an empty one if there is none yet."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            registry = json.load(f)
+    except FileNotFoundError:
+        return empty_registry()
+    if registry.get('version') != REGISTRY_VERSION:
+        raise ValueError(f"Unsupported id registry version in {path}")
+    return registry
+
+
+def paper_ids_by_title(records) -> TitleMatcher:
+    """ConfTool paper ids of the parsed export, looked up by title."""
+    return TitleMatcher((r.title, r.paper_id) for r in records
+                        if isinstance(r, conftool.Paper) and r.title and r.paper_id)
+
+
+class _Assigner:
+    """Matches programme items to registry entries of one kind."""
+
+    def __init__(self, registry, kind):
+        self.registry = registry
+        self.kind = kind
+        self.entries = [e for e in registry['items'] if e['kind'] == kind]
+        self.by_paper = {e['paper_id']: e for e in self.entries if e.get('paper_id')}
+        self.by_session_id = {e['session_id']: e for e in self.entries if e.get('session_id')}
+        # Titles repeat ("Kaffeepause"), so exact matches keep every entry
+        self.by_title = {}
+        for entry in self.entries:
+            self.by_title.setdefault(normalize_title(entry.get('title') or ''), []).append(entry)
+        self.titles = TitleMatcher((e['title'], e) for e in reversed(self.entries) if e.get('title'))
+        self.legacy = {old for e in self.entries for old in e.get('legacy', ())}
+        self.claimed = set()
+
+    def _usable(self, entry, session_id, paper_id):
+        """Free, and no paper or session id that says it is another item."""
+        if entry is None or entry['id'] in self.claimed:
+            return False
+        if paper_id and entry.get('paper_id') and entry['paper_id'] != paper_id:
+            return False
+        return not (session_id and entry.get('session_id') and entry['session_id'] != session_id)
+
+    def _find(self, title, day, time, session_id, paper_id):
+        entry = self.by_paper.get(paper_id) if paper_id else None
+        if self._usable(entry, session_id, paper_id):
+            return entry
+        entry = self.by_session_id.get(session_id) if session_id else None
+        if self._usable(entry, session_id, paper_id):
+            return entry
+        same_title = [e for e in self.by_title.get(normalize_title(title), ())
+                      if self._usable(e, session_id, paper_id)]
+        if same_title:
+            # Prefer the entry from the same slot, then the same day
+            return max(same_title, key=lambda e: (e.get('day') == day and e.get('time') == time,
+                                                  e.get('day') == day))
+        match = self.titles.match(title) if title else None
+        if match is not None and self._usable(match.value, session_id, paper_id):
+            return match.value
+        return None
+
+    def assign(self, title, day, time, session_id=None, paper_id=None, legacy=None):
+        """Id for an item, creating a registry entry for a new one."""
+        entry = self._find(title, day, time, session_id, paper_id)
+        if entry is None:
+            entry = {'id': self.registry['next_id'], 'kind': self.kind, 'legacy': []}
+            self.registry['next_id'] += 1
+            self.registry['items'].append(entry)
+        entry.update({'day': day, 'time': time, 'title': title, 'session_id': session_id, 'paper_id': paper_id})
+        # A legacy id means the item that first had it: after a reorder
+        # `...::poster-0` is a different poster, but old bookmarks meant the first
+        if legacy and legacy not in self.legacy:
+            entry['legacy'].append(legacy)
+            self.legacy.add(legacy)
+        self.claimed.add(entry['id'])
+        return entry['id']
+
+
+def assign_ids(data: dict, registry: dict, papers: TitleMatcher = None) -> dict:
+    """Write an "id" into every session and presentation of `data`, reusing
+    registry entries and adding new ones. Returns counts of kept and new ids."""
+    papers = papers or TitleMatcher()
+    before = registry['next_id']
+    sessions = _Assigner(registry, 'session')
+    presentations = _Assigner(registry, 'presentation')
+
+    def paper_id(title):
+        match = papers.match(title) if title else None
+        return match.value if match else None
+
+    for day in data.get('days', []):
+        date = day['date']
+        for session in day['sessions']:
+            # Legacy ids are derived without the compact id
+            session.pop('id', None)
+            title = session.get('title') or ''
+            session_paper = None if session.get('presentations') else paper_id(title)
+            time = session.get('time')
+            session['id'] = sessions.assign(title, date, time, session.get('session_id') or None, session_paper,
+                                            legacy_id(session, date))
+            for index, pres in enumerate(session.get('presentations') or []):
+                pres_title = pres.get('title') or ''
+                pres['id'] = presentations.assign(pres_title, date, time, None, paper_id(pres_title),
+                                                  legacy_presentation_id(session, date, index))
+
+    total = len(sessions.claimed) + len(presentations.claimed)
+    new = registry['next_id'] - before
+    return {'items': total, 'kept': total - new, 'new': new}
+
+
+def legacy_map(registry: dict) -> dict:
+    """Legacy bookmark id -> compact id (as a string)."""
+    result = {}
+    for entry in registry['items']:
+        for old in entry.get('legacy', ()):
+            result.setdefault(old, str(entry['id']))
+    return result
+
+
+class IdTranslator:
+    """Translates bookmark ids from the legacy scheme to compact ids."""
+
+    def __init__(self, registry: dict):
+        self.legacy = legacy_map(registry)
+
+    @classmethod
+    def load(cls, path: Path = REGISTRY_PATH):
+        return cls(load_registry(path))
+
+    def translate(self, item_id: str) -> str:
+        """The compact id for a legacy id; other ids are returned unchanged."""
+        return self.legacy.get(item_id, item_id)
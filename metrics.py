@@ -0,0 +1,198 @@
+"""
+In-process metrics, exported in the Prometheus text format at /metrics.
+
+Counters and histograms are created once at import time and updated from
+request threads:
+
+    REQUESTS = metrics.counter('mydhd_http_requests_total', 'Requests', ('endpoint', 'status'))
+    REQUESTS.inc('/api/me', '200')
+
+    LATENCY = metrics.histogram('mydhd_http_request_seconds', 'Latency', ('endpoint',))
+    LATENCY.observe(0.004, '/api/me')
+
+Values that other modules already count (pool sizes, queue depths) are
+exported through collectors: callables returning (name, type, help,
+[(labels, value), ...]) tuples, read on every scrape.
+
+Every process exports its own values; with several worker processes each
+one has to be scraped (or the numbers read as per-worker samples).
+"""
+
+import threading
+import time
+
+# Upper bounds (seconds) of the default latency buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs += [f'{name}="{_escape(value)}"' for name, value in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    """A monotonically increasing value per label combination."""
+    type = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f'{self.name}{_labels(self.labels, labels)} {_number(value)}'
+
+
+class Histogram:
+    """Observations counted into cumulative buckets, plus their count and sum."""
+    type = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._values = {}   # labels -> [bucket counts..., count, sum]
+
+    def observe(self, value, *labels):
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+                    break
+            entry[-2] += 1
+            entry[-1] += value
+
+    def time(self, *labels):
+        """Context manager observing the duration of its block."""
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            values = sorted((labels, list(entry)) for labels, entry in self._values.items())
+        for labels, entry in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry):
+                cumulative += count
+                yield f'{self.name}_bucket{_labels(self.labels, labels, (("le", _number(float(bound))),))} {cumulative}'
+            yield f'{self.name}_bucket{_labels(self.labels, labels, (("le", "+Inf"),))} {entry[-2]}'
+            yield f'{self.name}_count{_labels(self.labels, labels)} {entry[-2]}'
+            yield f'{self.name}_sum{_labels(self.labels, labels)} {_number(entry[-1])}'
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'metric {metric.name} is already registered')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(metric.samples())
+        for collector in collectors:
+            for name, kind, help, samples in collector():
+                lines.append(f'# HELP {name} {help}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_labels((), (), sorted(labels.items()))} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def counter(name, help, labels=()) -> Counter:
+    return registry.register(Counter(name, help, labels))
+
+
+def histogram(name, help, labels=(), buckets=LATENCY_BUCKETS) -> Histogram:
+    return registry.register(Histogram(name, help, labels, buckets))
+
+
+def add_collector(collector):
+    registry.add_collector(collector)
+
+
+def render() -> str:
+    return registry.render()
+
+
+# Time spent in the database by the current request (see db.py)
+_request = threading.local()
+
+
+def start_request():
+    _request.db_seconds = 0.0
+    _request.db_queries = 0
+
+
+def add_db_time(seconds):
+    if getattr(_request, 'db_queries', None) is not None:
+        _request.db_seconds += seconds
+        _request.db_queries += 1
+
+
+def request_db_time():
+    """(seconds, queries) spent in SQLite since start_request() on this thread."""
+    return getattr(_request, 'db_seconds', 0.0), getattr(_request, 'db_queries', 0)
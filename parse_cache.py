@@ -0,0 +1,229 @@
+"""
+Sidecar cache for incremental re-extraction of the ConfTool export.
+
+ConfTool re-exports programm.html several times shortly before the
+conference, usually with only a handful of papers changed. The export is
+split into session and paper blocks (conftool.iter_blocks) and every
+block's records are cached together with a hash of its raw HTML; on the
+next build only blocks whose hash changed are parsed again. Fuzzy title
+matches are cached as well (see TitleMatcher's memo_store) and stay valid
+as long as the set of titles they were matched against is unchanged.
+
+Comparing the cached records with the new ones gives a readable list of
+what changed between two exports (moved room, new author, edited
+abstract, ...), which build.py prints.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict
+from pathlib import Path
+
+import build_assets
+import conftool
+
+CACHE_PATH = Path(__file__).parent / ".build_cache.json"
+
+# Bump when the cache layout changes; parser changes invalidate it on their own
+CACHE_VERSION = 1
+
+
+def parser_fingerprint() -> str:
+    """Changes whenever conftool.py does, so parser fixes reach cached blocks."""
+    return hashlib.sha1(Path(conftool.__file__).read_bytes()).hexdigest()[:16]
+
+
+def record_to_dict(record) -> dict:
+    data = asdict(record)
+    data['type'] = type(record).__name__
+    return data
+
+
+def record_from_dict(data: dict):
+    data = dict(data)
+    kind = data.pop('type')
+    if kind == 'Session':
+        if data['chair'] is not None:
+            data['chair'] = conftool.Chair(**data['chair'])
+        return conftool.Session(**data)
+    if data['authors'] is not None:
+        data['authors'] = [conftool.Author(**a) for a in data['authors']]
+    data['affiliations'] = [conftool.Affiliation(**a) for a in data['affiliations']]
+    return conftool.Paper(**data)
+
+
+class _MemoStore(dict):
+    """Match memo for this run; pulls entries from the previous run on use,
+    so fingerprints nobody asked for are dropped on save."""
+
+    def __init__(self, previous):
+        super().__init__()
+        self.previous = previous
+
+    def setdefault(self, key, default=None):
+        if key not in self and key in self.previous:
+            self[key] = self.previous[key]
+        return super().setdefault(key, default)
+
+
+class ParseCache:
+    """Per-block parse results and fuzzy matches, persisted as JSON."""
+
+    def __init__(self, path: Path = CACHE_PATH):
+        self.path = Path(path)
+        self.blocks = {}
+        previous_matches = {}
+        data = self._read()
+        if data is not None:
+            self.blocks = data.get('blocks', {})
+            previous_matches = data.get('matches', {})
+        self.matches = _MemoStore(previous_matches)
+
+    def _read(self):
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != CACHE_VERSION or data.get('parser') != parser_fingerprint():
+            return None
+        return data
+
+    @property
+    def empty(self) -> bool:
+        return not self.blocks
+
+    def parse(self, html_path: Path):
+        """Return (records, stats, changes) for the export at `html_path`.
+
+        Only blocks that are new or whose HTML changed are parsed; `changes`
+        describes the differences to the previously cached export.
+        """
+        html_content = Path(html_path).read_text(encoding='utf-8')
+        old_blocks = self.blocks
+        new_blocks = {}
+        records = []
+        stats = {'blocks': 0, 'parsed': 0}
+
+        for key, session_key, text in conftool.iter_blocks(html_content):
+            stats['blocks'] += 1
+            digest = hashlib.sha1(text.encode('utf-8')).hexdigest()
+            entry = old_blocks.get(key)
+            if entry is not None and entry['hash'] == digest:
+                block_records = [record_from_dict(d) for d in entry['records']]
+                for record in block_records:
+                    # The block is unchanged, but it may sit in another session now
+                    if isinstance(record, conftool.Paper):
+                        record.session_key = session_key
+            else:
+                block_records = conftool.parse_block(text, session_key)
+                stats['parsed'] += 1
+            new_blocks[key] = {
+                'hash': digest,
+                'records': [record_to_dict(r) for r in block_records],
+            }
+            records.extend(block_records)
+
+        changes = describe_changes(old_blocks, new_blocks) if old_blocks else []
+        self.blocks = new_blocks
+        return records, stats, changes
+
+    def save(self):
+        data = {
+            'version': CACHE_VERSION,
+            'parser': parser_fingerprint(),
+            'blocks': self.blocks,
+            'matches': dict(self.matches),
+        }
+        build_assets.write_atomic(self.path, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+
+def _short(text, limit=60):
+    text = text or ''
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+def _session_labels(blocks):
+    labels = {}
+    for entry in blocks.values():
+        for data in entry['records']:
+            if data['type'] == 'Session':
+                labels[data['key']] = data['label'] or data['key']
+    return labels
+
+
+def describe_changes(old_blocks: dict, new_blocks: dict):
+    """Human-readable differences between two exports' cached blocks."""
+    changes = []
+    old_labels = _session_labels(old_blocks)
+    new_labels = _session_labels(new_blocks)
+
+    for key, entry in new_blocks.items():
+        old = old_blocks.get(key)
+        if old is None:
+            for data in entry['records']:
+                what = _short(data['label'] if data['type'] == 'Session' else data['title'])
+                changes.append(f"{key}: new {data['type'].lower()} {what!r}")
+            continue
+        if old['hash'] == entry['hash'] and old['records'] == entry['records']:
+            continue
+        for before, after in zip(old['records'], entry['records']):
+            if after['type'] == 'Session':
+                changes.extend(_session_changes(key, before, after))
+            else:
+                changes.extend(_paper_changes(key, before, after, old_labels, new_labels))
+
+    for key, entry in old_blocks.items():
+        if key not in new_blocks:
+            for data in entry['records']:
+                what = _short(data['label'] if data['type'] == 'Session' else data['title'])
+                changes.append(f"{key}: removed {data['type'].lower()} {what!r}")
+    return changes
+
+
+def _session_changes(key, before, after):
+    name = _short(after['label'] or before['label'] or key, 40)
+    prefix = f"{key} {name!r}"
+    if before['label'] != after['label']:
+        yield f"{prefix}: renamed from {_short(before['label'], 40)!r}"
+    if before['location'] != after['location']:
+        yield f"{prefix}: moved room {before['location']!r} -> {after['location']!r}"
+    if before['time'] != after['time']:
+        yield f"{prefix}: time {before['time']!r} -> {after['time']!r}"
+    old_chair = (before['chair'] or {}).get('text')
+    new_chair = (after['chair'] or {}).get('text')
+    if old_chair != new_chair:
+        yield f"{prefix}: chair {old_chair!r} -> {new_chair!r}"
+
+
+def _paper_changes(key, before, after, old_labels, new_labels):
+    prefix = f"{key} {_short(after['title'] or before['title'], 50)!r}"
+    if before['session_key'] != after['session_key']:
+        old_session = old_labels.get(before['session_key'], before['session_key'])
+        new_session = new_labels.get(after['session_key'], after['session_key'])
+        yield f"{prefix}: moved from {_short(old_session, 40)!r} to {_short(new_session, 40)!r}"
+    if before['title'] != after['title']:
+        yield f"{prefix}: title edited (was {_short(before['title'], 50)!r})"
+
+    old_authors = [a['name'] for a in before['authors'] or []]
+    new_authors = [a['name'] for a in after['authors'] or []]
+    for name in new_authors:
+        if name not in old_authors:
+            yield f"{prefix}: new author {name}"
+    for name in old_authors:
+        if name not in new_authors:
+            yield f"{prefix}: author removed {name}"
+    if old_authors == new_authors and before['authors'] != after['authors']:
+        yield f"{prefix}: presenting authors or affiliation numbers changed"
+
+    if before['affiliations'] != after['affiliations']:
+        yield f"{prefix}: affiliations changed"
+
+    old_abstract = '\n'.join(before['abstract_paragraphs'])
+    new_abstract = '\n'.join(after['abstract_paragraphs'])
+    if old_abstract != new_abstract:
+        if not old_abstract:
+            yield f"{prefix}: abstract added ({len(new_abstract)} chars)"
+        elif not new_abstract:
+            yield f"{prefix}: abstract removed"
+        else:
+            yield f"{prefix}: abstract edited ({len(old_abstract)} -> {len(new_abstract)} chars)"
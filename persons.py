@@ -0,0 +1,186 @@
+"""
+Person index: every speaker, author and chair with the sessions they appear in.
+
+build.py writes the index to static/persons.json, pre-sorted by surname in
+German collation, with spelling variants merged ("Müller", "MUELLER" and
+"Mueller" are one person). server.py loads it into a prefix trie and
+answers /api/persons?q= type-ahead queries, so clients no longer build the
+index themselves.
+
+persons.json layout:
+
+    {
+      "version": 1,
+      "programme": "<etag of the programme JSON it was built from>",
+      "refs": [{"title", "day_label", "time", "session_id", "bookmark_id",
+                "type", ["pres_title", "pres_index", "item_id"]}, ...],
+      "persons": [[name, affiliation, [ref index, ...]], ...]
+    }
+
+A ref is shared by everyone on the same session or presentation, so each
+one is stored once.
+"""
+
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+from programme import generate_id, presentation_item_id
+
+INDEX_VERSION = 1
+
+# Session types whose presentations are listed individually
+PRESENTATION_TYPES = ('Poster Session', 'Vortragssession', 'Doctoral Consortium')
+
+# Letters NFKD does not decompose
+_EXTRA_LETTERS = str.maketrans({'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'đ': 'd', 'ł': 'l', 'ı': 'i'})
+
+
+def _strip_marks(text: str) -> str:
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).translate(_EXTRA_LETTERS)
+
+
+def fold(name: str) -> str:
+    """Merge key: case-insensitive, umlauts spelled out (ä -> ae, ß -> ss),
+    other accents dropped, punctuation and spacing normalized."""
+    t = unicodedata.normalize('NFC', name).casefold()
+    t = t.replace('ä', 'ae').replace('ö', 'oe').replace('ü', 'ue')
+    t = _strip_marks(t)
+    return re.sub(r'[\W_]+', ' ', t).strip()
+
+
+def collation_key(text: str) -> str:
+    """German dictionary order (DIN 5007-1): umlauts sort like their base letter."""
+    return _strip_marks(unicodedata.normalize('NFC', text).casefold())
+
+
+def sort_key(name: str):
+    """Surname first, as the person list is ordered. Names equal apart from
+    accents order the unaccented one first (like localeCompare 'de')."""
+    parts = name.split()
+    surname = parts[-1] if parts else ''
+    return collation_key(surname), surname.casefold(), collation_key(name), name
+
+
+def build_index(data: dict, programme_etag: str = '') -> dict:
+    """Build the persons.json structure from programme data."""
+    refs = []
+    ref_ids = {}
+    people = {}  # merge key -> {'names': {name: count}, 'affiliations': [...], 'refs': [...]}
+
+    def ref_id(ref):
+        key = (ref['day_label'], ref['time'], ref['title'], ref.get('pres_title') or '')
+        if key not in ref_ids:
+            ref_ids[key] = len(refs)
+            refs.append(ref)
+        return ref_ids[key]
+
+    def add_person(name, affiliation, ref):
+        if not name or not name.strip():
+            return
+        name = name.strip()
+        key = fold(name)
+        entry = people.setdefault(key, {'names': {}, 'affiliations': [], 'refs': []})
+        entry['names'][name] = entry['names'].get(name, 0) + 1
+        if affiliation and affiliation.strip() and affiliation.strip() not in entry['affiliations']:
+            entry['affiliations'].append(affiliation.strip())
+        rid = ref_id(ref)
+        if rid not in entry['refs']:
+            entry['refs'].append(rid)
+
+    for day in data.get('days', []):
+        for session in day['sessions']:
+            session_ref = {
+                'title': session.get('title'),
+                'day_label': day.get('day_label'),
+                'time': session.get('time'),
+                'session_id': session.get('session_id') or None,
+                'bookmark_id': generate_id(session, day['date']),
+                'type': session.get('type') or '',
+            }
+            for author in session.get('authors') or []:
+                add_person(author.get('name'), author.get('affiliation'), session_ref)
+            if session.get('chair'):
+                add_person(session['chair'], None, session_ref)
+            for index, pres in enumerate(session.get('presentations') or []):
+                ref = session_ref
+                if session_ref['type'] in PRESENTATION_TYPES and pres.get('title'):
+                    ref = dict(session_ref, pres_title=pres['title'], pres_index=index,
+                               item_id=presentation_item_id(session, day['date'], index))
+                if isinstance(pres.get('authors'), list):
+                    for author in pres['authors']:
+                        add_person(author, pres.get('affiliation'), ref)
+                elif pres.get('author'):
+                    add_person(pres['author'], pres.get('affiliation'), ref)
+
+    persons = []
+    for entry in people.values():
+        # The most frequent spelling wins; on a tie, the first one seen
+        name = max(entry['names'], key=lambda n: entry['names'][n])
+        persons.append([name, '; '.join(entry['affiliations']), entry['refs']])
+    persons.sort(key=lambda p: sort_key(p[0]))
+
+    return {'version': INDEX_VERSION, 'programme': programme_etag, 'refs': refs, 'persons': persons}
+
+
+class PrefixTrie:
+    """Maps word prefixes to the sorted ids of the entries containing them."""
+
+    def __init__(self):
+        self._root = ({}, [])
+
+    def add(self, word: str, entry_id: int):
+        """Ids must be added in increasing order."""
+        node = self._root
+        for char in word:
+            node = node[0].setdefault(char, ({}, []))
+            if not node[1] or node[1][-1] != entry_id:
+                node[1].append(entry_id)
+
+    def lookup(self, prefix: str):
+        node = self._root
+        for char in prefix:
+            node = node[0].get(char)
+            if node is None:
+                return []
+        return node[1]
+
+
+class PersonIndex:
+    """Loaded person index with prefix search over every name part."""
+
+    def __init__(self, data: dict):
+        self.programme_etag = data.get('programme', '')
+        self.refs = data['refs']
+        self.persons = data['persons']
+        self.trie = PrefixTrie()
+        for pos, (name, _affiliation, _refs) in enumerate(self.persons):
+            for word in set(fold(name).split()):
+                self.trie.add(word, pos)
+
+    @classmethod
+    def load(cls, path: Path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported person index version in {path}")
+        return cls(data)
+
+    def search(self, query: str):
+        """Positions of persons with a name part starting with every word of
+        the query, in index (surname) order. An empty query matches all."""
+        words = fold(query).split()
+        if not words:
+            return list(range(len(self.persons)))
+        matches = sorted((self.trie.lookup(word) for word in words), key=len)
+        result = matches[0]
+        for other in matches[1:]:
+            other = set(other)
+            result = [pos for pos in result if pos in other]
+        return result
+
+    def expand(self, pos: int) -> dict:
+        name, affiliation, refs = self.persons[pos]
+        return {'name': name, 'affiliation': affiliation, 'sessions': [self.refs[r] for r in refs]}
@@ -0,0 +1,223 @@
+"""
+In-memory model of the conference programme.
+
+The programme JSON is loaded once and indexed by day, time slot, session
+type, location and session_id, so the API can answer filtered queries
+without scanning (or shipping) the whole file.
+"""
+
+import hashlib
+import json
+import re
+
+# Time slots per day (keyed by date). Mirrors TIME_SLOTS in static/app.js.
+TIME_SLOTS = {
+    '2026-02-24': ['9:00–12:30', '9:00–17:30', '14:00–17:30', 'ab 18:00'],
+    '2026-02-25': ['9:00–10:30', '11:00–12:30', '12:30–14:00', '14:00–15:30', '16:00–18:00'],
+    '2026-02-26': ['9:00–10:30', '11:00–12:30', '12:30–14:00', '14:00–15:30', '16:00–17:30', 'ab 18:00'],
+    '2026-02-27': ['9:00–10:30', '11:00–12:30', 'ab 14:00'],
+}
+
+# Days where time filters should use exact match instead of overlap
+EXACT_MATCH_DAYS = {'2026-02-24'}
+
+
+def parse_time(value: str) -> int:
+    """Convert "H:MM" to minutes since midnight."""
+    h, m = value.strip().split(':')
+    return int(h) * 60 + int(m)
+
+
+def parse_range(value: str):
+    """Parse "14:00–18:00" (or a single "18:00") into (start, end) minutes."""
+    parts = re.split(r'\s*[–-]\s*', (value or '').strip())
+    start = parse_time(parts[0])
+    end = parse_time(parts[1]) if len(parts) == 2 and parts[1] else start
+    return start, end
+
+
+def normalize_slot(slot: str) -> str:
+    """Accept both hyphen and en-dash in slot labels."""
+    return re.sub(r'\s*-\s*', '–', slot.strip())
+
+
+def slot_matches(start: int, end: int, slot: str, exact: bool = False) -> bool:
+    """Same semantics as sessionMatchesTimeSlot() in static/app.js."""
+    if slot.startswith('ab '):
+        return start >= parse_time(slot[3:])
+    slot_start, slot_end = parse_range(slot)
+    if exact:
+        return start == slot_start and end == slot_end
+    return start < slot_end and end > slot_start
+
+
+def content_etag(raw: bytes) -> str:
+    """ETag of a programme file's contents."""
+    return hashlib.sha256(raw).hexdigest()[:20]
+
+
+# Session types whose presentations are bookmarked one by one
+TALK_TYPES = ('Vortragssession', 'Doctoral Consortium')
+POSTER_TYPES = ('Poster Session',)
+
+
+def legacy_id(session: dict, day_date: str) -> str:
+    """Bookmark id of a session before the build assigned compact ids,
+    derived from its session id or day, time and title."""
+    if session.get('session_id'):
+        return session['session_id']
+    slug = f"{day_date}-{session.get('time')}-{session.get('title')}"
+    return re.sub(r'\s+', '-', slug).lower()
+
+
+def legacy_presentation_id(session: dict, day_date: str, index: int) -> str:
+    """Item id of a presentation before compact ids (`<session>::talk-<n>`, ...)."""
+    base = legacy_id(session, day_date)
+    if session.get('type') in TALK_TYPES:
+        return f'{base}::talk-{index}'
+    if session.get('type') in POSTER_TYPES:
+        return f'{base}::poster-{index}'
+    return f'{base}::pres-{index}'
+
+
+def generate_id(session: dict, day_date: str) -> str:
+    """Bookmark id of a session, as generateId() in static/app.js builds it:
+    the compact id from the id registry, or the legacy id without one."""
+    if session.get('id') is not None:
+        return str(session['id'])
+    return legacy_id(session, day_date)
+
+
+def presentation_item_id(session: dict, day_date: str, index: int) -> str:
+    """Item id of a presentation (talk and poster bookmarks, abstracts), as
+    generateTalkId() / generatePosterId() in static/app.js build it."""
+    pres = (session.get('presentations') or [])[index]
+    if pres.get('id') is not None:
+        return str(pres['id'])
+    return legacy_presentation_id(session, day_date, index)
+
+
+class Programme:
+    """A loaded programme plus lookup indexes over its sessions.
+
+    Sessions are addressed by their position in ``self.sessions`` (a flat
+    list of ``(day, session)`` tuples in programme order); every index maps
+    a key to a sorted list of such positions.
+    """
+
+    def __init__(self, data: dict, etag: str):
+        self.data = data
+        self.etag = etag
+        self.sessions = []
+        self.times = []
+        self.by_day = {}
+        self.by_slot = {}
+        self.by_type = {}
+        self.by_location = {}
+        self.by_session_id = {}
+        self.items = {}   # bookmark/item id -> (position, presentation index or None)
+        self._build()
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        return cls(json.loads(raw), content_etag(raw))
+
+    def _build(self):
+        for day in self.data.get('days', []):
+            date = day['date']
+            for session in day['sessions']:
+                pos = len(self.sessions)
+                self.sessions.append((day, session))
+                self.items[generate_id(session, date)] = (pos, None)
+                for index in range(len(session.get('presentations') or [])):
+                    self.items[presentation_item_id(session, date, index)] = (pos, index)
+                try:
+                    start, end = parse_range(session.get('time', ''))
+                except ValueError:
+                    start = end = None
+                self.times.append((start, end))
+
+                self.by_day.setdefault(date, []).append(pos)
+                self.by_type.setdefault(session.get('type') or '', []).append(pos)
+                self.by_location.setdefault(session.get('location') or '', []).append(pos)
+                if session.get('session_id'):
+                    self.by_session_id[session['session_id']] = pos
+
+                if start is None:
+                    continue
+                exact = date in EXACT_MATCH_DAYS
+                for slot in TIME_SLOTS.get(date, []):
+                    if slot_matches(start, end, slot, exact):
+                        self.by_slot.setdefault((date, slot), []).append(pos)
+
+    def _slot_positions(self, slot, day=None):
+        """Positions matching a time slot, falling back to a scan of the
+        pre-parsed session times for slots that are not predefined."""
+        dates = [day] if day else list(self.by_day)
+        result = []
+        for date in dates:
+            indexed = self.by_slot.get((date, slot))
+            if indexed is not None:
+                result.extend(indexed)
+                continue
+            exact = date in EXACT_MATCH_DAYS
+            for pos in self.by_day.get(date, []):
+                start, end = self.times[pos]
+                if start is not None and slot_matches(start, end, slot, exact):
+                    result.append(pos)
+        return result
+
+    def query(self, day=None, slot=None, type=None, location=None):
+        """Return the sorted positions of sessions matching all given filters."""
+        candidates = []
+        if day:
+            candidates.append(self.by_day.get(day, []))
+        if type:
+            candidates.append(self.by_type.get(type, []))
+        if location:
+            candidates.append(self.by_location.get(location, []))
+        if slot:
+            try:
+                candidates.append(self._slot_positions(normalize_slot(slot), day))
+            except ValueError:
+                return []
+
+        if not candidates:
+            return list(range(len(self.sessions)))
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for other in candidates[1:]:
+            result.intersection_update(other)
+            if not result:
+                break
+        return sorted(result)
+
+    def item_info(self, item_id):
+        """Where a bookmark id points: its session (and presentation), or
+        None for ids that are not in this programme."""
+        entry = self.items.get(item_id)
+        if entry is None:
+            return None
+        pos, index = entry
+        day, session = self.sessions[pos]
+        pres = (session.get('presentations') or [])[index] if index is not None else None
+        return {
+            'date': day['date'],
+            'time': session.get('time'),
+            'location': session.get('location'),
+            'session': generate_id(session, day['date']),
+            'session_title': session.get('title'),
+            'title': pres.get('title') if pres is not None else session.get('title'),
+        }
+
+    def to_days(self, positions):
+        """Group session positions back into the programme's day structure."""
+        days = []
+        for pos in positions:
+            day, session = self.sessions[pos]
+            if not days or days[-1]['date'] != day['date']:
+                days.append({'date': day['date'], 'day_label': day.get('day_label'), 'sessions': []})
+            days[-1]['sessions'].append(session)
+        return days
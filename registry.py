@@ -0,0 +1,269 @@
+"""
+Programmes of one or more conferences, reloaded when their files change.
+
+Each conference is a programme JSON file under a slug:
+
+    MYDHD_CONFERENCES       slug=path pairs, comma-separated, e.g.
+                            dhd2026=static/dhd2026_programm.json,dhd2027=/srv/dhd2027/programm.json
+                            (default: the DHd 2026 programme); the first
+                            one is the default conference
+    MYDHD_RELOAD_INTERVAL   seconds between checks for changed files
+                            (default 2; 0 turns reloading off)
+
+A Conference bundles a Programme with every index derived from it (person
+index, day shards, abstract store, search and schedule index), loaded
+together from one version of the file. The build writes persons.json,
+days/ and abstracts.bin next to the programme JSON; where they are missing
+or belong to another version, they are built here.
+
+A watcher thread per process stats every file. A changed mtime or size is
+only acted on once it has stayed the same for one more check (so a file
+that is still being written is not read), and only a changed content hash
+leads to a reload. The new Conference is built completely off the request
+path; the registry then replaces its mapping in a single assignment.
+Requests keep the Conference they started with, so none fails or mixes two
+versions. A file that fails to load leaves the previous version in service.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+import abstract_store
+import metrics
+import persons
+import schedule
+import search
+import shards
+from programme import Programme, content_etag
+
+RELOAD_INTERVAL = float(os.environ.get('MYDHD_RELOAD_INTERVAL', '2'))
+
+SLUG_RE = re.compile(r'^[a-z0-9][a-z0-9-]{0,39}$')
+
+ROOT = Path(__file__).resolve().parent
+
+RELOADS = metrics.counter('mydhd_programme_reloads_total', 'Programme reloads by conference and result',
+                          ('conference', 'result'))
+
+# Used when MYDHD_CONFERENCES is not set
+DEFAULT_CONFERENCES = {'dhd2026': ROOT / 'static' / 'dhd2026_programm.json'}
+
+logger = logging.getLogger(__name__)
+
+
+def parse_conferences(value: str, default: dict = DEFAULT_CONFERENCES) -> dict:
+    """{slug: path} from a MYDHD_CONFERENCES value (`default` if empty);
+    relative paths are taken from the app directory."""
+    if not (value or '').strip():
+        return dict(default)
+    result = {}
+    for entry in value.split(','):
+        if not entry.strip():
+            continue
+        slug, sep, path = entry.partition('=')
+        slug, path = slug.strip(), path.strip()
+        if not sep or not path or not SLUG_RE.match(slug):
+            raise ValueError(f"Invalid MYDHD_CONFERENCES entry {entry.strip()!r} (expected slug=path)")
+        if slug in result:
+            raise ValueError(f"Conference {slug!r} is listed twice in MYDHD_CONFERENCES")
+        result[slug] = ROOT / path
+    return result
+
+
+def load_person_index(programme, directory: Path):
+    """The build's person index, or one built here if it is missing or was
+    built from another version of the programme."""
+    path = directory / 'persons.json'
+    try:
+        index = persons.PersonIndex.load(path)
+        if index.programme_etag == programme.etag:
+            return index
+        logger.warning('%s is stale, rebuilding the person index', path)
+    except (OSError, ValueError):
+        logger.warning('%s not found or unreadable, building the person index', path)
+    return persons.PersonIndex(persons.build_index(programme.data, programme.etag))
+
+
+def load_shards(programme, directory: Path):
+    """The build's day shards, or shards built here if they are missing or
+    were built from another version of the programme."""
+    path = directory / 'days'
+    try:
+        store = shards.ShardStore.load(path)
+        if store.programme_etag == programme.etag:
+            return store
+        logger.warning('%s is stale, rebuilding the day shards', path)
+    except (OSError, ValueError, KeyError):
+        logger.warning('%s not found or unreadable, building the day shards', path)
+    stripped, _abstracts = abstract_store.split_abstracts(programme.data)
+    return shards.ShardStore(shards.build_shards(stripped, programme.etag)[0])
+
+
+def load_abstracts(programme, directory: Path):
+    """The build's memory-mapped abstract store, or one built here if it is
+    missing or was built from another version of the programme."""
+    path = directory / abstract_store.DATA_NAME
+    try:
+        store = abstract_store.AbstractStore.load(directory)
+        if store.programme_etag == programme.etag:
+            return store
+        logger.warning('%s is stale, rebuilding the abstract store', path)
+    except (OSError, ValueError, KeyError):
+        logger.warning('%s not found or unreadable, building the abstract store', path)
+    _stripped, abstracts = abstract_store.split_abstracts(programme.data)
+    return abstract_store.AbstractStore(*abstract_store.build_store(abstracts, programme.etag))
+
+
+class Conference:
+    """A programme and everything derived from it, for one version of its file."""
+
+    def __init__(self, slug: str, path: Path):
+        start = time.perf_counter()
+        self.slug = slug
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            raw = f.read()
+        self.fingerprint = (stat.st_mtime_ns, stat.st_size)
+        directory = self.path.parent
+        self.programme = Programme(json.loads(raw), content_etag(raw))
+        self.person_index = load_person_index(self.programme, directory)
+        self.shard_store = load_shards(self.programme, directory)
+        self.abstracts = load_abstracts(self.programme, directory)
+        self.search_index = search.SearchIndex(self.programme)
+        self.schedule_index = schedule.ScheduleIndex(self.programme)
+        self.load_seconds = time.perf_counter() - start
+        self.loaded_at = time.time()
+
+        # Python objects only; abstracts.bin is a file mapping (page cache)
+        # and the search index measures itself
+        self.memory_bytes = self.search_index.memory_bytes + search.deep_sizeof(
+            tuple(vars(part) for part in (self.programme, self.person_index, self.shard_store,
+                                          self.schedule_index)))
+        logger.info('Loaded conference %s (%s): %d sessions in %.0f ms, ~%.1f MiB',
+                    slug, self.programme.etag, len(self.programme.sessions),
+                    self.load_seconds * 1000, self.memory_bytes / 2**20)
+
+    @property
+    def etag(self) -> str:
+        return self.programme.etag
+
+    def stats(self) -> dict:
+        return {
+            'name': (self.programme.data.get('conference') or {}).get('name'),
+            'etag': self.etag,
+            'sessions': len(self.programme.sessions),
+            'loaded_at': self.loaded_at,
+            'load_ms': round(self.load_seconds * 1000, 1),
+            'memory_bytes': self.memory_bytes,
+            'abstract_bytes': len(self.abstracts.buffer),
+        }
+
+
+def file_fingerprint(path: Path):
+    """(mtime, size) of a file, or None if it cannot be read right now."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ProgrammeRegistry:
+    """The loaded Conference of every slug; swapped whole on reload."""
+
+    def __init__(self, paths: dict, interval: float = RELOAD_INTERVAL):
+        if not paths:
+            raise ValueError('No conference configured')
+        self.default_slug = next(iter(paths))
+        self.interval = interval
+        self._conferences = {slug: Conference(slug, path) for slug, path in paths.items()}
+        self._seen = {}       # slug -> changed fingerprint waiting to settle
+        self._failed = {}     # slug -> fingerprint whose load failed
+        self._counts = {slug: {'reloads': 0, 'reload_failures': 0} for slug in paths}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_started(self):
+        # The watcher thread does not survive fork(); start one per process
+        if self.interval <= 0 or (self._thread is not None and self._pid == os.getpid()):
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='programme-watcher', daemon=True)
+                self._thread.start()
+
+    def get(self, slug: str = None):
+        """The current Conference of `slug` (default conference if None),
+        or None for an unknown slug."""
+        self._ensure_started()
+        return self._conferences.get(slug or self.default_slug)
+
+    def default(self):
+        return self.get(self.default_slug)
+
+    def __iter__(self):
+        self._ensure_started()
+        return iter(self._conferences.values())
+
+    def check(self):
+        """Reload every conference whose file has changed and settled."""
+        for slug, current in self._conferences.items():
+            fingerprint = file_fingerprint(current.path)
+            if fingerprint is None or fingerprint in (current.fingerprint, self._failed.get(slug)):
+                self._seen.pop(slug, None)
+                continue
+            if self._seen.get(slug) != fingerprint:
+                self._seen[slug] = fingerprint
+                continue
+            del self._seen[slug]
+            try:
+                etag = content_etag(current.path.read_bytes())
+            except OSError:
+                continue
+            if etag == current.etag:
+                # Touched, not changed
+                current.fingerprint = fingerprint
+                continue
+            self.reload(slug)
+
+    def reload(self, slug: str) -> bool:
+        """Load `slug` again and swap it in; on failure the loaded version
+        stays in service. Returns whether the swap happened."""
+        path = self._conferences[slug].path
+        try:
+            conference = Conference(slug, path)
+        except Exception:
+            logger.exception('Reloading conference %s from %s failed, keeping the loaded version', slug, path)
+            RELOADS.inc(slug, 'failed')
+            with self._lock:
+                self._failed[slug] = file_fingerprint(path)
+                self._counts[slug]['reload_failures'] += 1
+            return False
+        with self._lock:
+            self._conferences = {**self._conferences, slug: conference}
+            self._failed.pop(slug, None)
+            self._counts[slug]['reloads'] += 1
+        RELOADS.inc(slug, 'ok')
+        return True
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception:
+                logger.exception('Checking the programme files failed')
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {slug: dict(values) for slug, values in self._counts.items()}
+        return {slug: {**conference.stats(), **counts[slug], 'default': slug == self.default_slug}
+                for slug, conference in self._conferences.items()}
@@ -0,0 +1,173 @@
+"""
+Interval index over the session times: what is running now, what is next,
+and which bookmarked sessions overlap.
+
+Session times ("14:00–18:00", "18:00") are parsed once when the programme
+is loaded and turned into absolute intervals in the conference's time zone
+(Europe/Vienna). Per location, the start and end times split the timeline
+into segments; each segment stores the sessions running during it. So
+"what is running at t" is one binary search per location, and "what is
+next" is another, over the sorted start times.
+
+The answer to /api/now only changes at a session start or end, or at
+midnight. `segment(t)` numbers these spans of time, and server.py uses the
+number for the ETag and snapshot() memoizes the answer. Clients that poll every
+minute then mostly get a 304.
+"""
+
+import bisect
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from programme import generate_id, parse_range
+
+TIMEZONE = ZoneInfo('Europe/Vienna')
+
+# Assumed length of sessions given with a start time only ("18:00")
+OPEN_END = timedelta(minutes=90)
+
+
+def local_datetime(day: str, minutes: int, tz=TIMEZONE) -> datetime:
+    """`minutes` after midnight of the ISO date `day`, in `tz`."""
+    # Wall-clock arithmetic first; the zone then supplies the UTC offset
+    base = datetime.combine(date.fromisoformat(day), time(0))
+    return (base + timedelta(minutes=minutes)).replace(tzinfo=tz)
+
+
+class _Room:
+    """Sessions of one location as timeline segments plus sorted starts."""
+
+    def __init__(self, intervals):
+        # intervals: [(start, end, pos), ...] in epoch seconds
+        intervals = sorted(intervals)
+        self.starts = [start for start, _end, _pos in intervals]
+        self.order = [pos for _start, _end, pos in intervals]
+        self.points = sorted({t for start, end, _pos in intervals for t in (start, end)})
+        # running[i]: sessions running in [points[i], points[i + 1])
+        self.running = []
+        for left in self.points[:-1]:
+            self.running.append(tuple(pos for start, end, pos in intervals if start <= left < end))
+
+    def running_at(self, t):
+        i = bisect.bisect_right(self.points, t) - 1
+        if i < 0 or i >= len(self.running):
+            return ()
+        return self.running[i]
+
+    def next_after(self, t):
+        """Position of the first session starting after t, or None."""
+        j = bisect.bisect_right(self.starts, t)
+        return self.order[j] if j < len(self.order) else None
+
+
+class ScheduleIndex:
+    """Absolute session intervals of a Programme, indexed per location."""
+
+    def __init__(self, programme, tz=TIMEZONE):
+        self.programme = programme
+        self.tz = tz
+        self.intervals = {}   # position -> (start, end) epoch seconds
+        rooms = {}
+        boundaries = set()
+        for pos, (day, session) in enumerate(programme.sessions):
+            date_str = day['date']
+            try:
+                start_min, end_min = parse_range(session.get('time', ''))
+            except ValueError:
+                continue
+            start_dt = local_datetime(date_str, start_min, tz)
+            if end_min > start_min:
+                end_dt = local_datetime(date_str, end_min, tz)
+            elif end_min < start_min:
+                end_dt = local_datetime(date_str, end_min + 24 * 60, tz)
+            else:
+                end_dt = start_dt + OPEN_END
+            start, end = int(start_dt.timestamp()), int(end_dt.timestamp())
+            self.intervals[pos] = (start, end)
+            rooms.setdefault(session.get('location') or '', []).append((start, end, pos))
+            boundaries.update((start, end))
+            for midnight in (0, 24 * 60):
+                boundaries.add(int(local_datetime(date_str, midnight, tz).timestamp()))
+        self.rooms = {name: _Room(intervals) for name, intervals in sorted(rooms.items())}
+        self.boundaries = sorted(boundaries)
+        self._snapshots = {}
+
+    def local(self, t: float) -> datetime:
+        return datetime.fromtimestamp(t, self.tz)
+
+    def segment(self, t: float) -> int:
+        """Number of the span between two boundaries that t falls in; now()
+        returns the same result for every t with the same number."""
+        return bisect.bisect_right(self.boundaries, t)
+
+    def summary(self, pos: int) -> dict:
+        day, session = self.programme.sessions[pos]
+        start, end = self.intervals[pos]
+        return {
+            'id': generate_id(session, day['date']),
+            'title': session.get('title'),
+            'type': session.get('type'),
+            'location': session.get('location'),
+            'date': day['date'],
+            'time': session.get('time'),
+            'start': self.local(start).isoformat(),
+            'end': self.local(end).isoformat(),
+        }
+
+    def now(self, t: float) -> list:
+        """[{location, running: [...], next: {...} | None}] for every
+        location with a session running at t or starting later that day."""
+        today = self.local(t).date().isoformat()
+        result = []
+        for name, room in self.rooms.items():
+            running = [self.summary(pos) for pos in room.running_at(t)]
+            upcoming = room.next_after(t)
+            if upcoming is not None and self.programme.sessions[upcoming][0]['date'] != today:
+                upcoming = None
+            if running or upcoming is not None:
+                result.append({
+                    'location': name or None,
+                    'running': running,
+                    'next': self.summary(upcoming) if upcoming is not None else None,
+                })
+        return result
+
+    def snapshot(self, t: float):
+        """(segment, {valid_from, valid_until, locations}) for t; computed
+        once per segment. valid_until is when the answer changes next."""
+        segment = self.segment(t)
+        snapshot = self._snapshots.get(segment)
+        if snapshot is None:
+            bounds = self.boundaries
+            snapshot = self._snapshots[segment] = {
+                'valid_from': self.local(bounds[segment - 1]).isoformat() if segment > 0 else None,
+                'valid_until': self.local(bounds[segment]).isoformat() if segment < len(bounds) else None,
+                'locations': self.now(t),
+            }
+        return segment, snapshot
+
+    def conflicts(self, item_ids) -> list:
+        """Overlapping pairs among the sessions of the given bookmark ids
+        (talk and poster ids count as their session), earliest first:
+        [{sessions: [a, b], items: [[ids of a], [ids of b]], overlap_minutes}]."""
+        by_pos = {}
+        for item_id in item_ids:
+            pos, _index = self.programme.items.get(str(item_id), (None, None))
+            if pos is not None and pos in self.intervals:
+                by_pos.setdefault(pos, []).append(str(item_id))
+        order = sorted(by_pos, key=lambda pos: self.intervals[pos])
+
+        result = []
+        active = []
+        for pos in order:
+            start, end = self.intervals[pos]
+            active = [other for other in active if self.intervals[other][1] > start]
+            for other in active:
+                overlap = min(end, self.intervals[other][1]) - start
+                result.append({
+                    'sessions': [self.summary(other), self.summary(pos)],
+                    'items': [by_pos[other], by_pos[pos]],
+                    'overlap_minutes': overlap // 60,
+                })
+            active.append(pos)
+        return result
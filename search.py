@@ -0,0 +1,307 @@
+"""
+Full-text search over the programme.
+
+server.py builds a SearchIndex from the loaded Programme at startup. Every
+session and every presentation is one document; its title, authors,
+affiliations and abstract are tokenized, stemmed for German (CISTEM) and
+put into an inverted index. Queries are ranked with BM25, where matches in
+titles and author names count more than matches in abstracts.
+
+Results carry the ids the client already uses for deep links and
+bookmarks (bookmark id, `session-<id>` / `pres-<id>-<n>` anchors and
+talk/poster item ids) plus snippets in which
+the matched words are wrapped in <mark>.
+"""
+
+import heapq
+import html
+import logging
+import math
+import re
+import threading
+import sys
+import time
+from collections import deque
+from functools import lru_cache
+
+from programme import POSTER_TYPES, TALK_TYPES, generate_id, presentation_item_id
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Field -> weight of a term occurrence
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'authors': 2.0,
+    'affiliation': 1.0,
+    'abstract': 1.0,
+}
+
+SNIPPET_CHARS = 200
+MAX_RESULTS = 50
+
+# Query latencies kept for the percentiles in stats()
+LATENCY_WINDOW = 1000
+
+# Log latency percentiles after this many queries
+LOG_EVERY = 1000
+
+STOPWORDS = frozenset('''
+    aber als am an auch auf aus bei bis das dass dem den der des die doch ein eine einem
+    einen einer eines es für im in ist mit nach nicht noch oder sich sie sind so um
+    und uns vom von vor war was wie wir zu zum zur über
+    a an and are as at be by for from in is it of on or that the to with
+'''.split())
+
+WORD_RE = re.compile(r'\w+')
+
+
+_GE_PREFIX = re.compile(r'^ge(.{4,})')
+_DOUBLE = re.compile(r'(.)\1')
+_DOUBLE_MARK = re.compile(r'(.)\*')
+_SUFFIX_EM_ER = re.compile(r'e[mr]$')
+_SUFFIX_ND = re.compile(r'nd$')
+_SUFFIX_T = re.compile(r't$')
+_SUFFIX_ESN = re.compile(r'[esn]$')
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """CISTEM stemmer (Weissweiler & Fraser, 2017) for a casefolded word."""
+    word = word.replace('ü', 'u').replace('ö', 'o').replace('ä', 'a').replace('ß', 'ss')
+    word = _GE_PREFIX.sub(r'\1', word)
+    word = word.replace('sch', '$').replace('ei', '%').replace('ie', '&')
+    word = _DOUBLE.sub(r'\1*', word)
+    while len(word) > 3:
+        if len(word) > 5:
+            word, n = _SUFFIX_EM_ER.subn('', word)
+            if n:
+                continue
+            word, n = _SUFFIX_ND.subn('', word)
+            if n:
+                continue
+        word, n = _SUFFIX_T.subn('', word)
+        if n:
+            continue
+        word, n = _SUFFIX_ESN.subn('', word)
+        if not n:
+            break
+    word = _DOUBLE_MARK.sub(r'\1\1', word)
+    return word.replace('&', 'ie').replace('%', 'ei').replace('$', 'sch')
+
+
+def terms(text: str):
+    """Stemmed index terms of `text`, stopwords dropped."""
+    result = []
+    for word in WORD_RE.findall((text or '').casefold()):
+        if len(word) > 1 and word not in STOPWORDS:
+            result.append(stem(word))
+    return result
+
+
+def highlight(text: str, query_terms, limit: int = None) -> str:
+    """HTML-escaped `text` with words matching `query_terms` in <mark>.
+    With `limit`, a window of about that many characters around the first
+    match is returned instead of the whole text."""
+    text = text or ''
+    matches = [m for m in WORD_RE.finditer(text) if stem(m.group().casefold()) in query_terms]
+    start, end = 0, len(text)
+    if limit is not None and len(text) > limit:
+        first = matches[0].start() if matches else 0
+        start = max(0, first - limit // 4)
+        end = min(len(text), start + limit)
+        # Do not cut words in half
+        if start > 0:
+            space = text.find(' ', start)
+            start = space + 1 if 0 <= space < first else start
+        if end < len(text):
+            space = text.rfind(' ', start, end)
+            end = space if space > start else end
+    parts = ['…' if start > 0 else '']
+    pos = start
+    for m in matches:
+        if m.start() < start or m.end() > end:
+            continue
+        parts.append(html.escape(text[pos:m.start()]))
+        parts.append(f'<mark>{html.escape(m.group())}</mark>')
+        pos = m.end()
+    parts.append(html.escape(text[pos:end]))
+    if end < len(text):
+        parts.append('…')
+    return ''.join(parts)
+
+
+def deep_sizeof(obj) -> int:
+    """Approximate memory held by nested dicts/lists/tuples/sets, counting
+    shared objects (interned strings, stems) once."""
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return total
+
+
+class SearchIndex:
+    """BM25 inverted index over the sessions and presentations of a Programme."""
+
+    def __init__(self, programme):
+        self.docs = []          # doc id -> metadata and field texts
+        self.lengths = []       # doc id -> weighted length
+        self.postings = {}      # term -> [(doc id, weighted tf), ...]
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self.queries = 0
+
+        start = time.perf_counter()
+        self._build(programme)
+        self.build_seconds = time.perf_counter() - start
+        self.memory_bytes = deep_sizeof((self.docs, self.lengths, self.postings))
+
+        total = sum(self.lengths)
+        self.avg_length = total / len(self.lengths) if self.lengths else 0.0
+        logger.info(
+            'Search index: %d documents, %d terms, built in %.1f ms, ~%.1f MiB',
+            len(self.docs), len(self.postings), self.build_seconds * 1000, self.memory_bytes / 2**20,
+        )
+
+    def _add(self, meta, fields):
+        doc_id = len(self.docs)
+        weighted = {}
+        length = 0.0
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for term in terms(text):
+                weighted[term] = weighted.get(term, 0.0) + weight
+                length += weight
+        if not weighted:
+            return
+        meta['fields'] = fields
+        self.docs.append(meta)
+        self.lengths.append(length)
+        for term, tf in weighted.items():
+            self.postings.setdefault(term, []).append((doc_id, tf))
+
+    def _build(self, programme):
+        for day, session in programme.sessions:
+            bookmark_id = generate_id(session, day['date'])
+            session_type = session.get('type') or ''
+            base = {
+                'day': day['date'],
+                'day_label': day.get('day_label'),
+                'time': session.get('time'),
+                'location': session.get('location'),
+                'type': session_type,
+                'session_id': session.get('session_id') or None,
+                'session_title': session.get('title'),
+                'bookmark_id': bookmark_id,
+            }
+            people = [a.get('name', '') for a in session.get('authors') or []]
+            if session.get('chair'):
+                people.append(session['chair'])
+            self._add(dict(base, kind='session', pres_index=None, item_id=bookmark_id,
+                           anchor=f'session-{bookmark_id}', authors=people), {
+                'title': session.get('title') or '',
+                'authors': ', '.join(people),
+                'affiliation': ', '.join(a.get('affiliation') or '' for a in session.get('authors') or []),
+                'abstract': session.get('abstract') or '',
+            })
+
+            for index, pres in enumerate(session.get('presentations') or []):
+                authors = pres.get('authors') if isinstance(pres.get('authors'), list) else (
+                    [pres['author']] if pres.get('author') else [])
+                if session_type in TALK_TYPES:
+                    kind, item_id = 'talk', presentation_item_id(session, day['date'], index)
+                elif session_type in POSTER_TYPES:
+                    kind, item_id = 'poster', presentation_item_id(session, day['date'], index)
+                else:
+                    kind, item_id = 'presentation', bookmark_id
+                anchor = f'pres-{bookmark_id}-{index}' if pres.get('abstract') else f'session-{bookmark_id}'
+                self._add(dict(base, kind=kind, pres_index=index, item_id=item_id,
+                               anchor=anchor, authors=authors), {
+                    'title': pres.get('title') or '',
+                    'authors': ', '.join(authors),
+                    'affiliation': pres.get('affiliation') or '',
+                    'abstract': pres.get('abstract') or '',
+                })
+
+    def search(self, query: str, limit: int = 20):
+        """Return (total hits, [result dicts]) for the best `limit` matches."""
+        start = time.perf_counter()
+        query_terms = set(terms(query))
+        scores = {}
+        n = len(self.docs)
+        for term in query_terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings:
+                norm = K1 * (1 - B + B * self.lengths[doc_id] / self.avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(max(1, min(limit, MAX_RESULTS)), scores.items(), key=lambda item: item[1])
+        results = [self._result(doc_id, score, query_terms) for doc_id, score in best]
+        self._record(time.perf_counter() - start)
+        return len(scores), results
+
+    def _result(self, doc_id, score, query_terms):
+        meta = self.docs[doc_id]
+        fields = meta['fields']
+        result = {key: value for key, value in meta.items() if key != 'fields'}
+        result['score'] = round(score, 3)
+        result['title'] = highlight(fields['title'], query_terms)
+        # Snippet from the abstract, or failing that the field that matched
+        snippet = ''
+        for field in ('abstract', 'affiliation', 'authors'):
+            text = fields[field]
+            if text and any(stem(w.casefold()) in query_terms for w in WORD_RE.findall(text)):
+                snippet = highlight(text, query_terms, SNIPPET_CHARS)
+                break
+        if not snippet and fields['abstract']:
+            snippet = highlight(fields['abstract'], query_terms, SNIPPET_CHARS)
+        result['snippet'] = snippet
+        return result
+
+    def _record(self, elapsed):
+        with self._lock:
+            self._latencies.append(elapsed)
+            self.queries += 1
+            log_now = self.queries % LOG_EVERY == 0
+        if log_now:
+            stats = self.stats()
+            logger.info('Search latency over the last %d queries: p50 %.2f ms, p99 %.2f ms',
+                        stats['latency_window'], stats['latency_p50_ms'], stats['latency_p99_ms'])
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            queries = self.queries
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(math.ceil(p * len(latencies))) - 1)] * 1000
+
+        return {
+            'documents': len(self.docs),
+            'terms': len(self.postings),
+            'build_ms': round(self.build_seconds * 1000, 1),
+            'memory_bytes': self.memory_bytes,
+            'queries': queries,
+            'latency_window': len(latencies),
+            'latency_p50_ms': round(percentile(0.50), 3),
+            'latency_p99_ms': round(percentile(0.99), 3),
+        }
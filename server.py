@@ -1,27 +1,83 @@
 import sqlite3
+import csv
+import io
 import json
+import logging
 import os
-import secrets
+import hashlib
+import hmac
+import ipaddress
+import time
 from datetime import datetime, timezone
-from flask import Flask, request, jsonify, send_from_directory, session
-from werkzeug.security import generate_password_hash, check_password_hash
+import click
+from flask import Blueprint, Flask, current_app, request, jsonify, session, g, stream_with_context
 
-app = Flask(__name__, static_folder='static', static_url_path='')
-app.secret_key = os.environ.get('FLASK_SECRET_KEY', secrets.token_hex(32))
+import assets
+import audit
+import bookmarks
+import config
+import db
+import hashing
+import id_registry
+import metrics
+import registry
+import schedule
+
+# Everything below is loaded once at import time, i.e. before gunicorn forks
+# its workers when the app is preloaded (see wsgi.py and gunicorn.conf.py).
+# The routes live on a blueprint; create_app() builds the Flask app.
+bp = Blueprint('mydhd', __name__, cli_group=None)
+# The programme routes again under /c/<slug>/ for every configured conference
+conference_bp = Blueprint('conference', __name__, url_prefix='/c/<conference>')
+logging.basicConfig(level=os.environ.get('MYDHD_LOG_LEVEL', 'INFO'))
+logger = logging.getLogger(__name__)
 
 # Only serve files from an explicit static directory
 STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
 
-# Database setup
-DB_NAME = 'conference.db'
+# Compact item ids and the legacy ids they replace, written by build.py
+ID_REGISTRY_PATH = os.path.join(STATIC_DIR, 'id_registry.json')
+
+# Longest /api/persons query that is looked up
+MAX_PERSON_QUERY = 100
+
+# Longest /api/search query and default number of results
+MAX_SEARCH_QUERY = 200
+DEFAULT_SEARCH_LIMIT = 20
+
+# Hashed, precompressed build output of build_assets.py (optional)
+asset_manifest = assets.AssetManifest(os.path.join(STATIC_DIR, 'dist'))
+
+# Upper bound for operations in one /api/bookmarks/delta request (and for
+# the ids in one /api/save_program)
+MAX_DELTA_OPS = 1000
+
+# Default number of items in /api/stats/popular
+DEFAULT_POPULAR_LIMIT = 50
+
+# Columns of /api/stats/popular.csv
+POPULAR_CSV_COLUMNS = ('kind', 'id', 'count', 'date', 'time', 'location', 'session', 'session_title', 'title')
 
-def get_db():
-    conn = sqlite3.connect(DB_NAME)
-    conn.row_factory = sqlite3.Row
-    return conn
+# Spreadsheets read cells starting with these as formulas
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
 
+# Requests slower than this are logged with their SQLite time (0: off)
+SLOW_REQUEST_MS = float(os.environ.get('MYDHD_SLOW_REQUEST_MS', '0'))
+
+# Request metrics, exported at /metrics. Endpoints are labelled by their URL
+# rule (/days/<name>), never by the concrete path.
+REQUESTS = metrics.counter('mydhd_http_requests_total', 'Requests by endpoint, method and status',
+                           ('endpoint', 'method', 'status'))
+REQUEST_SECONDS = metrics.histogram('mydhd_http_request_seconds', 'Request latency by endpoint',
+                                    ('endpoint', 'method'))
+RESPONSE_BYTES = metrics.counter('mydhd_http_response_bytes_total', 'Response body bytes sent (after compression)',
+                                 ('endpoint',))
+LOGIN_REQUIRED = metrics.counter('mydhd_login_required_total', 'Requests refused by require_login (401)',
+                                 ('endpoint',))
+
+# Database setup (see db.py for the connection pool and pragmas)
 def init_db():
-    with get_db() as conn:
+    with db.transaction() as conn:
         conn.execute('''
             CREATE TABLE IF NOT EXISTS users (
                 username TEXT PRIMARY KEY,
@@ -49,15 +105,56 @@ def init_db():
                 FOREIGN KEY (username) REFERENCES users(username)
             )
         ''')
-        conn.commit()
+        bookmarks.init_schema(conn)
 
 init_db()
 
-def hash_password(password):
-    return generate_password_hash(password)
+# Programmes by conference slug (MYDHD_CONFERENCES), each with its indexes;
+# the first is the default, served at the unprefixed URLs. Reloaded in the
+# background when a file changes (see registry.py).
+conferences = registry.ProgrammeRegistry(
+    registry.parse_conferences(os.environ.get('MYDHD_CONFERENCES')))
+
+def load_id_translator():
+    """Legacy -> compact bookmark ids; stored bookmarks are migrated once."""
+    try:
+        translator = id_registry.IdTranslator.load(ID_REGISTRY_PATH)
+    except ValueError:
+        logger.warning('%s is unreadable, bookmark ids are not translated', ID_REGISTRY_PATH)
+        translator = id_registry.IdTranslator(id_registry.empty_registry())
+    with db.transaction() as conn:
+        rewritten = bookmarks.translate_ids(conn, translator.legacy)
+    if rewritten:
+        logger.warning('Migrated %d stored bookmarks to compact ids', rewritten)
+    return translator
+
+id_translator = load_id_translator()
+
+def translate_ids(ids):
+    return [id_translator.translate(i) if isinstance(i, str) else i for i in ids]
+
+def conference():
+    """The Conference of this request: the /c/<slug>/ one, else the default.
+    Taken once per request, so a reload never shows a request two versions."""
+    if 'conference' not in g:
+        g.conference = conferences.default()
+    return g.conference
 
-def check_password(password, password_hash):
-    return check_password_hash(password_hash, password)
+@conference_bp.url_value_preprocessor
+def pick_conference(endpoint, values):
+    g.conference = conferences.get(values.pop('conference'))
+
+@conference_bp.before_request
+def require_conference():
+    if g.conference is None:
+        return jsonify({'error': 'Unbekannte Konferenz.'}), 404
+
+def server_busy():
+    """503 response used when the password hashing queue is full."""
+    resp = jsonify({'error': 'Server ausgelastet, bitte gleich erneut versuchen.'})
+    resp.status_code = 503
+    resp.headers['Retry-After'] = str(hashing.RETRY_AFTER)
+    return resp
 
 def require_login(f):
     """Decorator to require a valid session for API endpoints."""
@@ -65,23 +162,393 @@ def require_login(f):
     @wraps(f)
     def decorated(*args, **kwargs):
         if 'username' not in session:
+            LOGIN_REQUIRED.inc(request.url_rule.rule)
             return jsonify({'error': 'Nicht eingeloggt.'}), 401
         return f(*args, **kwargs)
     return decorated
 
-@app.route('/')
+def require_organizer(f):
+    """Decorator for endpoints only the MYDHD_ORGANIZERS may use."""
+    from functools import wraps
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if 'username' not in session:
+            LOGIN_REQUIRED.inc(request.url_rule.rule)
+            return jsonify({'error': 'Nicht eingeloggt.'}), 401
+        if session['username'] not in current_app.config['ORGANIZERS']:
+            return jsonify({'error': 'Keine Berechtigung.'}), 403
+        return f(*args, **kwargs)
+    return decorated
+
+def is_internal_request() -> bool:
+    """A request with the MYDHD_METRICS_TOKEN, or one from this host that
+    did not come through a proxy."""
+    token = current_app.config.get('METRICS_TOKEN')
+    auth = request.headers.get('Authorization', '')
+    if token and auth.startswith('Bearer ') and hmac.compare_digest(auth[7:].encode(), token.encode()):
+        return True
+    if 'X-Forwarded-For' in request.headers or 'Forwarded' in request.headers:
+        return False
+    try:
+        return ipaddress.ip_address(request.remote_addr or '').is_loopback
+    except ValueError:
+        return False
+
+def require_internal(f):
+    """Decorator for monitoring endpoints (see is_internal_request)."""
+    from functools import wraps
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not is_internal_request():
+            return jsonify({'error': 'Keine Berechtigung.'}), 403
+        return f(*args, **kwargs)
+    return decorated
+
+def not_modified(etag):
+    resp = current_app.response_class(status=304)
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp
+
+def bookmark_etag(username, version):
+    """ETag of /api/me: changes whenever the user's bookmark version does."""
+    user_key = hashlib.sha1(username.encode('utf-8')).hexdigest()[:10]
+    return f"bm-{user_key}-{version}"
+
+def parse_instant(value):
+    """Epoch seconds of an ISO 8601 time (Vienna time if it has no offset)
+    or of plain epoch seconds; now if empty, None if invalid."""
+    if not value:
+        return time.time()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        at = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=schedule.TIMEZONE)
+    return at.timestamp()
+
+def bookmark_payload(lists, version):
+    """Bookmark fields shared by /api/login and /api/me."""
+    return {
+        'saved_sessions': lists['session'],
+        'saved_posters': lists['poster'],
+        'saved_talks': lists['talk'],
+        'bookmark_version': version,
+    }
+
+def collect_stats():
+    """Counters the other modules keep themselves, for /metrics."""
+    pool = db.pool_stats()
+    hashes = hashing.stats()
+    audits = audit.stats()
+    loaded = conferences.stats()
+    caches = {conf.slug: conf.abstracts.stats() for conf in conferences}
+    return [
+        ('mydhd_db_connections', 'gauge', 'Pooled SQLite connections',
+         [({'state': 'in_use'}, pool['in_use']), ({'state': 'idle'}, pool['idle'])]),
+        ('mydhd_db_busy_retries_total', 'counter', 'Write transactions retried because the database was busy',
+         [({}, pool['busy_retries'])]),
+        ('mydhd_db_busy_failures_total', 'counter', 'Write transactions that failed because the database was busy',
+         [({}, pool['busy_failures'])]),
+        ('mydhd_password_hash_queue_depth', 'gauge', 'Password hashes running or waiting',
+         [({}, hashes['depth'])]),
+        ('mydhd_password_hash_rejected_total', 'counter', 'Password hashes refused with 503 (queue full)',
+         [({}, hashes['rejected'])]),
+        ('mydhd_audit_pending', 'gauge', 'Login audit rows not yet written', [({}, audits['pending'])]),
+        ('mydhd_audit_dropped_total', 'counter', 'Login audit rows dropped', [({}, audits['dropped'])]),
+        ('mydhd_abstract_cache_requests_total', 'counter', 'Abstract lookups by conference and cache result',
+         [({'conference': slug, 'result': result}, cache[key]) for slug, cache in caches.items()
+          for result, key in (('hit', 'hits'), ('miss', 'misses'))]),
+        ('mydhd_programme_memory_bytes', 'gauge', 'Approximate memory held by a loaded programme and its indexes',
+         [({'conference': slug}, info['memory_bytes']) for slug, info in loaded.items()]),
+        ('mydhd_programme_load_seconds', 'gauge', 'Time the last (re)load of a programme took',
+         [({'conference': slug}, info['load_ms'] / 1000) for slug, info in loaded.items()]),
+    ]
+
+metrics.add_collector(collect_stats)
+
+@bp.before_app_request
+def start_timer():
+    g.request_start = time.perf_counter()
+    metrics.start_request()
+
+# Registered before compress() so that it runs after it and sees the final body
+@bp.after_app_request
+def record_request(response):
+    start = g.get('request_start')
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    REQUESTS.inc(endpoint, request.method, str(response.status_code))
+    REQUEST_SECONDS.observe(elapsed, endpoint, request.method)
+    RESPONSE_BYTES.inc(endpoint, amount=response.content_length or 0)
+    if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+        db_seconds, queries = metrics.request_db_time()
+        logger.warning('Slow request: %s %s -> %d in %.1f ms (%d queries, %.1f ms in SQLite)',
+                       request.method, request.full_path.rstrip('?'), response.status_code,
+                       elapsed * 1000, queries, db_seconds * 1000)
+    return response
+
+@bp.after_app_request
+def compress(response):
+    return assets.compress_response(response)
+
+@bp.route('/')
 def root():
-    return send_from_directory(STATIC_DIR, 'index.html')
+    return assets.send_asset(asset_manifest, STATIC_DIR, 'index.html')
 
-@app.route('/Lageplan.pdf')
+@bp.route('/Lageplan.pdf')
 def lageplan():
-    return send_from_directory(os.path.dirname(os.path.abspath(__file__)), 'Lageplan.pdf')
+    return assets.send_asset(asset_manifest, os.path.dirname(os.path.abspath(__file__)), 'Lageplan.pdf')
+
+@bp.route('/days/<name>')
+@conference_bp.route('/days/<name>')
+def day_shard(name):
+    """A day of the programme or the shard manifest, precompressed, with a
+    strong ETag per content hash and encoding."""
+    shard = conference().shard_store.get(name)
+    if shard is None:
+        return jsonify({'error': 'Nicht gefunden.'}), 404
+    encoding = assets.accepted_encoding(tuple(e for e in ('br', 'gzip') if e in shard.variants)) or 'identity'
+    etag = shard.etag(encoding)
 
-@app.route('/<path:path>')
+    if request.if_none_match.contains(etag):
+        resp = current_app.response_class(status=304)
+    else:
+        resp = current_app.response_class(shard.variants[encoding], mimetype='application/json')
+        if encoding != 'identity':
+            resp.headers['Content-Encoding'] = encoding
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    resp.vary.add('Accept-Encoding')
+    return resp
+
+@bp.route('/<path:path>')
 def send_static(path):
-    return send_from_directory(STATIC_DIR, path)
+    return assets.send_asset(asset_manifest, STATIC_DIR, path)
+
+@bp.route('/api/program')
+@conference_bp.route('/api/program')
+def program():
+    """Return only the sessions matching the day/slot/type/location filters."""
+    programme = conference().programme
+    filters = {key: (request.args.get(key) or '').strip() or None
+               for key in ('day', 'slot', 'type', 'location')}
+    query_key = json.dumps(filters, sort_keys=True).encode('utf-8')
+    etag = f"{programme.etag}-{hashlib.sha1(query_key).hexdigest()[:12]}"
+
+    if request.if_none_match.contains_weak(etag):
+        resp = current_app.response_class(status=304)
+    else:
+        positions = programme.query(**filters)
+        resp = jsonify({
+            'conference': programme.data.get('conference'),
+            'days': programme.to_days(positions),
+            'count': len(positions),
+        })
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+@bp.route('/api/persons')
+@conference_bp.route('/api/persons')
+def person_search():
+    """Type-ahead over speakers, authors and chairs: every word of `q` must
+    start a part of the name. Without `q` all persons are listed."""
+    conf = conference()
+    query = (request.args.get('q') or '').strip()[:MAX_PERSON_QUERY]
+    limit = request.args.get('limit', 0, type=int)
+    etag = f"{conf.etag}-p-{hashlib.sha1(f'{query}|{limit}'.encode('utf-8')).hexdigest()[:12]}"
+
+    if request.if_none_match.contains_weak(etag):
+        resp = current_app.response_class(status=304)
+    else:
+        positions = conf.person_index.search(query)
+        count = len(positions)
+        if limit > 0:
+            positions = positions[:limit]
+        resp = jsonify({
+            'query': query,
+            'count': count,
+            'persons': [conf.person_index.expand(pos) for pos in positions],
+        })
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+def abstract_response(key, load):
+    """JSON from load() (None: 404), revalidated per programme version."""
+    etag = f"{conference().etag}-a-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}"
+    if request.if_none_match.contains_weak(etag):
+        resp = current_app.response_class(status=304)
+    else:
+        data = load()
+        if data is None:
+            return jsonify({'error': 'Kein Abstract gefunden.'}), 404
+        resp = jsonify(data)
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+@bp.route('/api/abstract/<path:item_id>')
+@conference_bp.route('/api/abstract/<path:item_id>')
+def abstract(item_id):
+    """One abstract by item id (session bookmark id, `<id>::talk-<n>`, ...)."""
+    abstracts = conference().abstracts
+
+    def load():
+        text = abstracts.get(item_id)
+        return None if text is None else {'id': item_id, 'abstract': text}
+    return abstract_response(f'item|{item_id}', load)
+
+@bp.route('/api/abstracts/<path:bookmark_id>')
+@conference_bp.route('/api/abstracts/<path:bookmark_id>')
+def session_abstracts(bookmark_id):
+    """All abstracts of a session (its own and its presentations'), by item id."""
+    abstracts = conference().abstracts
+
+    def load():
+        texts = abstracts.session(bookmark_id)
+        return None if texts is None else {'session': bookmark_id, 'abstracts': texts}
+    return abstract_response(f'session|{bookmark_id}', load)
+
+@bp.route('/api/search')
+@conference_bp.route('/api/search')
+def full_text_search():
+    """Full-text search over sessions and presentations, best matches first.
+    Results link to the session (bookmark id) and presentation they are in."""
+    conf = conference()
+    query = (request.args.get('q') or '').strip()[:MAX_SEARCH_QUERY]
+    limit = request.args.get('limit', DEFAULT_SEARCH_LIMIT, type=int)
+    etag = f"{conf.etag}-s-{hashlib.sha1(f'{query}|{limit}'.encode('utf-8')).hexdigest()[:12]}"
+
+    if request.if_none_match.contains_weak(etag):
+        resp = current_app.response_class(status=304)
+    else:
+        count, results = conf.search_index.search(query, limit) if query else (0, [])
+        resp = jsonify({'query': query, 'count': count, 'results': results})
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+@bp.route('/api/now')
+@conference_bp.route('/api/now')
+def now_next():
+    """Sessions running at `at` (default: now) and the next one per room
+    that day. The answer only changes at session starts and ends, so the
+    ETag stays the same until `valid_until`."""
+    at = parse_instant((request.args.get('at') or '').strip())
+    if at is None:
+        return jsonify({'error': 'Ungültige Zeitangabe.'}), 400
+    conf = conference()
+    segment, snapshot = conf.schedule_index.snapshot(at)
+    etag = f"{conf.etag}-n-{segment}"
+
+    if request.if_none_match.contains_weak(etag):
+        resp = current_app.response_class(status=304)
+    else:
+        resp = jsonify(snapshot)
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+@bp.route('/api/conferences')
+def conference_list():
+    """The configured conferences; their programmes are under /c/<slug>/."""
+    return jsonify({'conferences': [
+        {'slug': conf.slug, 'name': (conf.programme.data.get('conference') or {}).get('name'),
+         'etag': conf.etag, 'default': conf.slug == conferences.default_slug}
+        for conf in conferences
+    ]}), 200
+
+@bp.route('/api/stats')
+@require_internal
+def stats():
+    """Internal counters for monitoring. `search` and `abstracts` are those
+    of the default conference; `conferences` has size and reload figures."""
+    conf = conference()
+    return jsonify({'db': db.pool_stats(), 'hashing': hashing.stats(), 'audit': audit.stats(),
+                    'search': conf.search_index.stats(), 'abstracts': conf.abstracts.stats(),
+                    'conferences': conferences.stats()}), 200
+
+@bp.route('/metrics')
+@require_internal
+def metrics_export():
+    """All metrics in the Prometheus text format."""
+    return current_app.response_class(metrics.render(), content_type=metrics.CONTENT_TYPE)
 
-@app.route('/api/register', methods=['POST'])
+def popular_items(conn, day=None):
+    """Bookmark counts with what each item is, most bookmarked first;
+    only items of `day` if given. Ids the programme does not know are
+    left out. Bookmarks are kept for the default conference only."""
+    programme = conference().programme
+    for kind, item_id, count in bookmarks.iter_counts(conn):
+        info = programme.item_info(item_id)
+        if info is None or (day and info['date'] != day):
+            continue
+        yield {'kind': kind, 'id': item_id, 'count': count, **info}
+
+def csv_safe(row: dict) -> dict:
+    """`row` with text that a spreadsheet would run as a formula quoted."""
+    return {key: f"'{value}" if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES) else value
+            for key, value in row.items()}
+
+@bp.route('/api/stats/popular')
+@require_organizer
+def popular():
+    """Most bookmarked sessions, talks and posters (for room planning)."""
+    day = (request.args.get('day') or '').strip() or None
+    if day and day not in conference().programme.by_day:
+        return jsonify({'error': 'Unbekannter Tag.'}), 400
+    limit = request.args.get('limit', DEFAULT_POPULAR_LIMIT, type=int)
+    items = []
+    with db.connection() as conn:
+        for item in popular_items(conn, day):
+            items.append(item)
+            if 0 < limit <= len(items):
+                break
+    return jsonify({'day': day, 'count': len(items), 'items': items}), 200
+
+@bp.route('/api/stats/popular.csv')
+@require_organizer
+def popular_csv():
+    """All bookmark counts as CSV, written while the rows are read."""
+    day = (request.args.get('day') or '').strip() or None
+    if day and day not in conference().programme.by_day:
+        return jsonify({'error': 'Unbekannter Tag.'}), 400
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, POPULAR_CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        with db.connection() as conn:
+            for item in popular_items(conn, day):
+                writer.writerow(csv_safe(item))
+                if buffer.tell() > 16384:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+        yield buffer.getvalue()
+
+    resp = current_app.response_class(stream_with_context(generate()), mimetype='text/csv')
+    resp.headers['Content-Disposition'] = f'attachment; filename="popular-{day or "all"}.csv"'
+    resp.headers['Cache-Control'] = 'no-store'
+    return resp
+
+@bp.cli.command('backfill-bookmark-counts')
+def backfill_bookmark_counts():
+    """Rebuild the bookmark popularity counters from the stored bookmarks."""
+    with db.transaction() as conn:
+        items = bookmarks.recount(conn)
+    click.echo(f'Counted bookmarks for {items} items.')
+
+@bp.route('/api/register', methods=['POST'])
 def register():
     data = request.json
     username = (data.get('username') or '').strip()
@@ -96,18 +563,20 @@ def register():
     if len(password) < 8:
         return jsonify({'error': 'Passwort muss mindestens 8 Zeichen lang sein.'}), 400
 
-    pwd_hash = hash_password(password)
+    try:
+        pwd_hash = hashing.hash_password(password)
+    except hashing.HashQueueFull:
+        return server_busy()
 
     now = datetime.now(timezone.utc).isoformat()
     try:
-        with get_db() as conn:
+        with db.transaction() as conn:
             conn.execute('INSERT INTO users (username, password_hash, created_at) VALUES (?, ?, ?)', (username, pwd_hash, now))
-            conn.commit()
         return jsonify({'message': 'Registrierung erfolgreich.'}), 201
     except sqlite3.IntegrityError:
         return jsonify({'error': 'Benutzername bereits vergeben.'}), 409
 
-@app.route('/api/login', methods=['POST'])
+@bp.route('/api/login', methods=['POST'])
 def login():
     data = request.json
     username = (data.get('username') or '').strip()
@@ -116,68 +585,190 @@ def login():
     if not username or not password:
         return jsonify({'error': 'Benutzername und Passwort erforderlich.'}), 400
 
-    with get_db() as conn:
-        row = conn.execute('SELECT password_hash, saved_sessions, saved_posters, saved_talks FROM users WHERE username = ?', (username,)).fetchone()
+    with db.connection() as conn:
+        row = conn.execute('SELECT password_hash FROM users WHERE username = ?', (username,)).fetchone()
+
+    try:
+        valid = row is not None and hashing.check_password(password, row['password_hash'])
+    except hashing.HashQueueFull:
+        return server_busy()
+
+    # Upgrade hashes made with an older method or cost while we know the
+    # password; best effort, a full queue just leaves it for the next login
+    new_hash = None
+    if valid and hashing.needs_rehash(row['password_hash']):
+        try:
+            new_hash = hashing.hash_password(password)
+        except hashing.HashQueueFull:
+            new_hash = None
 
-    if row and check_password(password, row['password_hash']):
+    if valid:
         session['username'] = username
         now = datetime.now(timezone.utc).isoformat()
-        with get_db() as conn:
-            conn.execute('UPDATE users SET last_login_at = ? WHERE username = ?', (now, username))
-            conn.execute('INSERT INTO login_history (username, login_at) VALUES (?, ?)', (username, now))
-            conn.commit()
+        # last_login_at / login_history are written in batches off the request path
+        audit.record_login(username, now)
+        if new_hash:
+            with db.transaction() as conn:
+                conn.execute('UPDATE users SET password_hash = ? WHERE username = ?', (new_hash, username))
+        with db.connection() as conn:
+            lists = bookmarks.load(conn, username)
+            version = bookmarks.get_version(conn, username)
+        bookmarks.remember_version(username, version)
         return jsonify({
             'message': 'Login erfolgreich.',
-            'saved_sessions': json.loads(row['saved_sessions']),
-            'saved_posters': json.loads(row['saved_posters'] or '[]'),
-            'saved_talks': json.loads(row['saved_talks'] or '[]'),
+            **bookmark_payload(lists, version),
         }), 200
     else:
         return jsonify({'error': 'Ungültige Anmeldedaten.'}), 401
 
-@app.route('/api/logout', methods=['POST'])
+@bp.route('/api/logout', methods=['POST'])
 def logout():
     session.pop('username', None)
     return jsonify({'message': 'Logout erfolgreich.'}), 200
 
-@app.route('/api/me')
+@bp.route('/api/me')
 @require_login
 def me():
     username = session['username']
-    with get_db() as conn:
-        row = conn.execute('SELECT saved_sessions, saved_posters, saved_talks FROM users WHERE username = ?', (username,)).fetchone()
-    if not row:
-        session.pop('username', None)
-        return jsonify({'error': 'Benutzer nicht gefunden.'}), 401
-    return jsonify({
+
+    # Fast path: unchanged bookmark version, answered from the in-process cache
+    version = bookmarks.cached_version(username)
+    if version is not None and request.if_none_match.contains_weak(bookmark_etag(username, version)):
+        return not_modified(bookmark_etag(username, version))
+
+    with db.connection() as conn:
+        version = bookmarks.get_version(conn, username)
+        if version is None:
+            session.pop('username', None)
+            return jsonify({'error': 'Benutzer nicht gefunden.'}), 401
+        bookmarks.remember_version(username, version)
+        etag = bookmark_etag(username, version)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+        lists = bookmarks.load(conn, username)
+
+    resp = jsonify({
         'username': username,
-        'saved_sessions': json.loads(row['saved_sessions']),
-        'saved_posters': json.loads(row['saved_posters'] or '[]'),
-        'saved_talks': json.loads(row['saved_talks'] or '[]'),
-    }), 200
+        **bookmark_payload(lists, version),
+    })
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp
+
+def conflicts_etag(username, version):
+    return f"{bookmark_etag(username, version)}-c-{conference().etag[:8]}"
 
-@app.route('/api/save_program', methods=['POST'])
+@bp.route('/api/my/conflicts')
+@require_login
+def my_conflicts():
+    """Bookmarked sessions, talks and posters whose sessions overlap in time."""
+    username = session['username']
+
+    version = bookmarks.cached_version(username)
+    if version is not None and request.if_none_match.contains_weak(conflicts_etag(username, version)):
+        return not_modified(conflicts_etag(username, version))
+
+    with db.connection() as conn:
+        version = bookmarks.get_version(conn, username)
+        if version is None:
+            session.pop('username', None)
+            return jsonify({'error': 'Benutzer nicht gefunden.'}), 401
+        bookmarks.remember_version(username, version)
+        etag = conflicts_etag(username, version)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+        lists = bookmarks.load(conn, username)
+
+    conflicts = conference().schedule_index.conflicts(lists['session'] + lists['talk'] + lists['poster'])
+    resp = jsonify({'count': len(conflicts), 'conflicts': conflicts, 'bookmark_version': version})
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp
+
+@bp.route('/api/save_program', methods=['POST'])
 @require_login
 def save_program():
-    data = request.json
-    sessions_list = data.get('sessions')
-    posters_list = data.get('posters', [])
-    talks_list = data.get('talks', [])
+    data = request.get_json(silent=True) or {}
+    # Same id rules as /api/bookmarks/delta
+    sessions_list = bookmarks.validate_ids(data.get('sessions'))
+    posters_list = bookmarks.validate_ids(data.get('posters', []))
+    talks_list = bookmarks.validate_ids(data.get('talks', []))
+
+    if sessions_list is None or posters_list is None or talks_list is None:
+        return jsonify({'error': 'Ungültige Daten.'}), 400
+    if len(sessions_list) + len(posters_list) + len(talks_list) > MAX_DELTA_OPS:
+        return jsonify({'error': 'Zu viele Änderungen auf einmal.'}), 413
 
-    if sessions_list is None or not isinstance(sessions_list, list):
+    username = session['username']
+    now = datetime.now(timezone.utc).isoformat()
+
+    # Only the difference to the stored set is written
+    with db.transaction() as conn:
+        version, _applied = bookmarks.replace_all(conn, username, {
+            'session': translate_ids(sessions_list),
+            'poster': translate_ids(posters_list),
+            'talk': translate_ids(talks_list),
+        }, now)
+    bookmarks.remember_version(username, version)
+
+    return jsonify({'message': 'Programm gespeichert.', 'bookmark_version': version}), 200
+
+@bp.route('/api/ids/translate', methods=['POST'])
+def translate_legacy_ids():
+    """Compact ids for legacy bookmark ids (locally stored bookmarks, old
+    share links). Only ids that change are returned."""
+    data = request.get_json(silent=True) or {}
+    ids = data.get('ids')
+    if not isinstance(ids, list) or not all(isinstance(i, str) for i in ids):
         return jsonify({'error': 'Ungültige Daten.'}), 400
+    if len(ids) > MAX_DELTA_OPS:
+        return jsonify({'error': 'Zu viele Änderungen auf einmal.'}), 413
+    translated = {}
+    for item_id in ids:
+        new_id = id_translator.translate(item_id)
+        if new_id != item_id:
+            translated[item_id] = new_id
+    return jsonify({'ids': translated}), 200
+
+@bp.route('/api/bookmarks/delta', methods=['POST'])
+@require_login
+def bookmarks_delta():
+    """Apply add/remove operations and return the server-side changes since
+    the client's version (see bookmarks.sync_delta)."""
+    data = request.get_json(silent=True) or {}
+    base_version = data.get('version', 0)
+    ops = bookmarks.validate_ops(data.get('ops', []))
+
+    if not isinstance(base_version, int) or base_version < 0 or ops is None:
+        return jsonify({'error': 'Ungültige Daten.'}), 400
+    if len(ops) > MAX_DELTA_OPS:
+        return jsonify({'error': 'Zu viele Änderungen auf einmal.'}), 413
+    # Clients that have not migrated yet may still send legacy ids
+    ops = [(action, kind, id_translator.translate(item_id)) for action, kind, item_id in ops]
 
     username = session['username']
+    now = datetime.now(timezone.utc).isoformat()
+
+    with db.transaction() as conn:
+        version, changes, conflicts = bookmarks.sync_delta(conn, username, base_version, ops, now)
+    if version is None:
+        session.pop('username', None)
+        return jsonify({'error': 'Benutzer nicht gefunden.'}), 401
+    bookmarks.remember_version(username, version)
 
-    with get_db() as conn:
-        conn.execute(
-            'UPDATE users SET saved_sessions = ?, saved_posters = ?, saved_talks = ? WHERE username = ?',
-            (json.dumps(sessions_list), json.dumps(posters_list), json.dumps(talks_list), username)
-        )
-        conn.commit()
+    return jsonify({'version': version, 'changes': changes, 'conflicts': conflicts}), 200
 
-    return jsonify({'message': 'Programm gespeichert.'}), 200
+def create_app(config_object=config.Config, **overrides) -> Flask:
+    """The WSGI app. The programme, indexes and database schema are module
+    state, loaded once on import; apps created here share them."""
+    app = Flask(__name__, static_folder=None)
+    app.config.from_object(config_object)
+    app.config.update(overrides)
+    app.secret_key = config.secret_key(app.config)
+    app.register_blueprint(bp)
+    app.register_blueprint(conference_bp)
+    return app
 
 if __name__ == '__main__':
     print("Starting Flask server on http://localhost:8080")
-    app.run(host='0.0.0.0', port=8080, debug=True)
+    create_app(config.DevelopmentConfig).run(host='0.0.0.0', port=8080)
@@ -0,0 +1,146 @@
+"""
+Per-day shards of the programme.
+
+build.py splits dhd2026_programm.json into one file per conference day
+plus a small manifest, all under static/days/:
+
+    manifest.json
+        {
+          "version": 1,
+          "programme": "<etag of the programme JSON it was built from>",
+          "conference": {...},
+          "days": [{"date", "day_label", "file", "hash", "size", "sessions",
+                    "compact": {"file", "hash", "size"}}, ...]
+        }
+    2026-02-23.json, ...
+        one entry of the programme's "days" list, with abstracts moved
+        to the abstract store (see abstract_store.py)
+    2026-02-23.compact.json, ...
+        the same day in the string-interned column format of
+        compact_format.py
+
+A client reads the manifest, fetches today's shard first and the other
+days after the first render. server.py keeps the files in memory and
+serves them with strong ETags (the content hash from the manifest) and
+precompressed variants, so revalidating an unchanged day is a 304.
+"""
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+
+import compact_format
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+SHARD_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def encode(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def build_shards(data: dict, programme_etag: str = ''):
+    """Return ({file name: bytes}, manifest) for programme data. The
+    manifest is included in the files under MANIFEST_NAME."""
+    files = {}
+    entries = []
+    for day in data.get('days', []):
+        name = f"{day['date']}.json"
+        output = encode(day)
+        files[name] = output
+        compact_name = f"{day['date']}.compact.json"
+        compact = compact_format.dumps(day)
+        files[compact_name] = compact
+        entries.append({
+            'date': day['date'],
+            'day_label': day.get('day_label'),
+            'file': name,
+            'hash': content_hash(output),
+            'size': len(output),
+            'sessions': len(day.get('sessions', [])),
+            'compact': {'file': compact_name, 'hash': content_hash(compact), 'size': len(compact)},
+        })
+    manifest = {
+        'version': SHARD_VERSION,
+        'programme': programme_etag,
+        'conference': data.get('conference'),
+        'days': entries,
+    }
+    files[MANIFEST_NAME] = encode(manifest)
+    return files, manifest
+
+
+def write_shards(files: dict, out_dir: Path, write) -> int:
+    """Write changed shard files with `write(path, bytes)` (an atomic
+    writer), manifest last, and delete shards of days that no longer
+    exist. Returns the number of files written."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for name in sorted(files, key=lambda n: n == MANIFEST_NAME):
+        path = out_dir / name
+        if not (path.exists() and path.read_bytes() == files[name]):
+            write(path, files[name])
+            written += 1
+    for path in out_dir.glob('*.json'):
+        if path.name not in files:
+            path.unlink()
+    return written
+
+
+class Shard:
+    """One served file with its precompressed variants."""
+
+    def __init__(self, data: bytes):
+        self.hash = content_hash(data)
+        self.variants = {'identity': data}
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(gz) < len(data):
+            self.variants['gzip'] = gz
+        if brotli is not None:
+            br = brotli.compress(data, quality=11)
+            if len(br) < len(data):
+                self.variants['br'] = br
+
+    def etag(self, encoding: str) -> str:
+        """Strong ETag; each encoding is a different representation."""
+        return self.hash if encoding == 'identity' else f'{self.hash}-{encoding}'
+
+
+class ShardStore:
+    """Manifest and day shards held in memory for serving."""
+
+    def __init__(self, files: dict):
+        self.manifest = json.loads(files[MANIFEST_NAME])
+        if self.manifest.get('version') != SHARD_VERSION:
+            raise ValueError('Unsupported shard manifest version')
+        self.programme_etag = self.manifest.get('programme', '')
+        self.shards = {name: Shard(data) for name, data in files.items()}
+
+    @classmethod
+    def load(cls, directory: Path):
+        """Load the shards listed in the manifest under `directory`."""
+        directory = Path(directory)
+        manifest = (directory / MANIFEST_NAME).read_bytes()
+        files = {MANIFEST_NAME: manifest}
+        for entry in json.loads(manifest)['days']:
+            for listed in (entry, entry.get('compact')):
+                if listed is None:
+                    continue
+                data = (directory / listed['file']).read_bytes()
+                if content_hash(data) != listed['hash']:
+                    raise ValueError(f"{listed['file']} does not match the manifest")
+                files[listed['file']] = data
+        return cls(files)
+
+    def get(self, name: str):
+        return self.shards.get(name)
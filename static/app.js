@@ -5,10 +5,31 @@ document.addEventListener('DOMContentLoaded', () => {
     updateAuthUI();
 });
 
+// Re-check bookmarks when the app returns to the foreground. /api/me is
+// revalidated with its ETag, so this costs a 304 while nothing changed.
+document.addEventListener('visibilitychange', async () => {
+    if (document.visibilityState !== 'visible' || !currentUser) return;
+    try {
+        const resp = await fetch('/api/me');
+        if (!resp.ok) return;
+        const meData = await resp.json();
+        if (meData.bookmark_version !== bookmarkVersion) {
+            syncProgram();
+        }
+    } catch (e) {
+        // Offline — try again next time
+    }
+});
+
 let conferenceData = null;
 let savedSessionIds = new Set(JSON.parse(localStorage.getItem('dhd2026_saved_sessions')) || []);
 let savedPosterIds = new Set(JSON.parse(localStorage.getItem('dhd2026_saved_posters')) || []);
 let savedTalkIds = new Set(JSON.parse(localStorage.getItem('dhd2026_saved_talks')) || []);
+// Delta sync state: last server bookmark version seen, and local changes not yet uploaded
+let bookmarkVersion = parseInt(localStorage.getItem('dhd2026_bookmark_version'), 10) || 0;
+let pendingBookmarkOps = JSON.parse(localStorage.getItem('dhd2026_pending_ops')) || [];
+let syncInFlight = false;
+let syncAgain = false;
 let currentTab = 'all'; // 'all' or 'my'
 let currentDay = null; // null means show all days, or index into conferenceData.days
 let currentTimeSlot = null; // null means show all time slots, or a time slot string like "9:00-12:30"
@@ -30,15 +51,78 @@ function escapeHtml(str) {
     return div.innerHTML;
 }
 
-async function fetchData() {
+// --- Programme loading ---
+
+// build.py writes the programme as one shard per day plus a manifest
+// (/days/manifest.json: conference, days: [{date, day_label, file, hash, size}]).
+// Today's shard (or the first day's) is fetched before the first render and
+// the other days afterwards; the server answers revalidations with 304.
+
+async function fetchShard(entry) {
+    const resp = await fetch(`/days/${entry.file}`);
+    if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+    return resp.json();
+}
+
+function localDateString(date) {
+    const month = String(date.getMonth() + 1).padStart(2, '0');
+    const day = String(date.getDate()).padStart(2, '0');
+    return `${date.getFullYear()}-${month}-${day}`;
+}
+
+// Sets conferenceData to a programme with at least the first day to show
+// loaded; resolves to a promise for the remaining days.
+async function loadProgramme() {
+    let manifest = null;
     try {
+        const resp = await fetch('/days/manifest.json');
+        if (resp.ok) manifest = await resp.json();
+    } catch (e) {
+        // Fall back to the full programme below
+    }
+    if (!manifest) {
         const response = await fetch('dhd2026_programm.json');
-        const data = await response.json();
-        conferenceData = data;
+        conferenceData = await response.json();
+        return Promise.resolve();
+    }
+
+    const entries = manifest.days;
+    const data = {
+        conference: manifest.conference,
+        days: entries.map(entry => ({ date: entry.date, day_label: entry.day_label, sessions: [] })),
+    };
+    const first = Math.max(0, entries.findIndex(entry => entry.date === localDateString(new Date())));
+    data.days[first] = await fetchShard(entries[first]);
+    conferenceData = data;
+
+    return Promise.all(entries.map((entry, idx) => {
+        if (idx === first) return null;
+        return fetchShard(entry)
+            .then(day => { data.days[idx] = day; })
+            .catch(error => console.error(`Error loading ${entry.file}:`, error));
+    }));
+}
+
+// Re-render without moving the session card at the top of the screen,
+// e.g. when earlier days arrive above it.
+function renderKeepingPosition() {
+    const cards = document.querySelectorAll('.session-card');
+    const anchor = Array.from(cards).find(card => card.getBoundingClientRect().bottom > 0);
+    const top = anchor ? anchor.getBoundingClientRect().top : null;
+    render();
+    const again = anchor && document.getElementById(anchor.id);
+    if (again) window.scrollBy(0, again.getBoundingClientRect().top - top);
+}
+
+async function fetchData() {
+    try {
+        const remainingDays = await loadProgramme();
         buildDayFilterBar();
         buildTimeFilterBar();
-        buildPersonIndex();
         render();
+        await remainingDays;
+        renderKeepingPosition();
+        if (await migrateLegacyIds()) renderKeepingPosition();
 
         // Validate server session if user was previously logged in
         const storedUser = localStorage.getItem('dhd2026_user');
@@ -49,11 +133,10 @@ async function fetchData() {
                     const meData = await meResp.json();
                     currentUser = meData.username;
                     // Merge server bookmarks with local bookmarks
-                    if (meData.saved_sessions && meData.saved_sessions.length > 0) {
-                        mergeBookmarks(meData.saved_sessions, meData.saved_posters, meData.saved_talks);
-                    }
+                    mergeBookmarks(meData.saved_sessions, meData.saved_posters, meData.saved_talks, meData.bookmark_version);
                     updateAuthUI();
                     render();
+                    openEventStream();
                 } else {
                     // Session expired or invalid — clean up
                     localStorage.removeItem('dhd2026_user');
@@ -143,7 +226,7 @@ async function handleAuth(event) {
 
             // Merge server bookmarks with local bookmarks (union of both)
             if (data.saved_sessions && Array.isArray(data.saved_sessions)) {
-                mergeBookmarks(data.saved_sessions, data.saved_posters, data.saved_talks);
+                mergeBookmarks(data.saved_sessions, data.saved_posters, data.saved_talks, data.bookmark_version);
             } else {
                 await syncProgram();
             }
@@ -151,6 +234,7 @@ async function handleAuth(event) {
             closeAuthModal();
             updateAuthUI();
             render();
+            openEventStream();
         }
     } catch (err) {
         errorMsg.textContent = err.message;
@@ -165,7 +249,11 @@ async function logout() {
         // Logout from UI regardless
     }
     currentUser = null;
+    closeEventStream();
     localStorage.removeItem('dhd2026_user');
+    setBookmarkVersion(0);
+    pendingBookmarkOps = [];
+    localStorage.removeItem('dhd2026_pending_ops');
     updateAuthUI();
     render();
 }
@@ -190,45 +278,192 @@ function updateAuthUI() {
     }
 }
 
+// --- Bookmark sync ---
+// Only individual add/remove operations are uploaded (/api/bookmarks/delta);
+// the server answers with the changes other devices made since our version.
+
+function bookmarkSet(kind) {
+    if (kind === 'poster') return savedPosterIds;
+    if (kind === 'talk') return savedTalkIds;
+    return savedSessionIds;
+}
+
+function saveBookmarkSets() {
+    localStorage.setItem('dhd2026_saved_sessions', JSON.stringify([...savedSessionIds]));
+    localStorage.setItem('dhd2026_saved_posters', JSON.stringify([...savedPosterIds]));
+    localStorage.setItem('dhd2026_saved_talks', JSON.stringify([...savedTalkIds]));
+}
+
+function setBookmarkVersion(version) {
+    bookmarkVersion = version || 0;
+    localStorage.setItem('dhd2026_bookmark_version', String(bookmarkVersion));
+}
+
+// Bookmarks stored before the build assigned compact ids (all digits) still
+// carry legacy ids; the server knows which compact id each one became.
+async function translateLegacyIds(ids) {
+    try {
+        const resp = await fetch('/api/ids/translate', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ ids })
+        });
+        if (!resp.ok) return {};
+        return (await resp.json()).ids || {};
+    } catch (e) {
+        return {};
+    }
+}
+
+async function migrateLegacyIds() {
+    const isLegacy = id => !/^\d+$/.test(id);
+    const legacy = new Set();
+    for (const kind of ['session', 'poster', 'talk']) {
+        for (const id of bookmarkSet(kind)) if (isLegacy(id)) legacy.add(id);
+    }
+    for (const op of pendingBookmarkOps) if (isLegacy(op.id)) legacy.add(op.id);
+    if (legacy.size === 0) return false;
+
+    const translated = await translateLegacyIds([...legacy]);
+    if (Object.keys(translated).length === 0) return false;
+    for (const kind of ['session', 'poster', 'talk']) {
+        const set = bookmarkSet(kind);
+        for (const id of [...set]) {
+            if (translated[id]) {
+                set.delete(id);
+                set.add(translated[id]);
+            }
+        }
+    }
+    pendingBookmarkOps = pendingBookmarkOps.map(op => translated[op.id] ? { ...op, id: translated[op.id] } : op);
+    localStorage.setItem('dhd2026_pending_ops', JSON.stringify(pendingBookmarkOps));
+    saveBookmarkSets();
+    return true;
+}
+
+function queueBookmarkOp(kind, id, added) {
+    // Only the latest operation per item matters
+    pendingBookmarkOps = pendingBookmarkOps.filter(op => !(op.kind === kind && op.id === id));
+    pendingBookmarkOps.push({ op: added ? 'add' : 'remove', kind, id });
+    localStorage.setItem('dhd2026_pending_ops', JSON.stringify(pendingBookmarkOps));
+}
+
+function applyServerChanges(changes) {
+    // Items with a newer local operation still queued keep the local state
+    const pending = new Set(pendingBookmarkOps.map(op => `${op.kind}\n${op.id}`));
+    let changed = false;
+    for (const change of changes || []) {
+        if (pending.has(`${change.kind}\n${change.id}`)) continue;
+        const set = bookmarkSet(change.kind);
+        if (change.op === 'add' && !set.has(change.id)) {
+            set.add(change.id);
+            changed = true;
+        } else if (change.op === 'remove' && set.has(change.id)) {
+            set.delete(change.id);
+            changed = true;
+        }
+    }
+    if (changed) {
+        saveBookmarkSets();
+        render();
+    }
+}
+
 async function syncProgram() {
     if (!currentUser) return;
+    if (syncInFlight) {
+        syncAgain = true;
+        return;
+    }
+    syncInFlight = true;
+    const sent = pendingBookmarkOps.slice();
     try {
-        const resp = await fetch('/api/save_program', {
+        const resp = await fetch('/api/bookmarks/delta', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                sessions: [...savedSessionIds],
-                posters: [...savedPosterIds],
-                talks: [...savedTalkIds]
-            })
+            body: JSON.stringify({ version: bookmarkVersion, ops: sent })
         });
         if (!resp.ok) {
             showSyncError();
+            return;
         }
+        const data = await resp.json();
+        // Drop what the server has seen; keep operations queued in the meantime
+        pendingBookmarkOps = pendingBookmarkOps.filter(op => !sent.includes(op));
+        localStorage.setItem('dhd2026_pending_ops', JSON.stringify(pendingBookmarkOps));
+        applyServerChanges(data.changes);
+        setBookmarkVersion(data.version);
     } catch (e) {
         console.error("Sync failed", e);
         showSyncError();
+    } finally {
+        syncInFlight = false;
+        if (syncAgain) {
+            syncAgain = false;
+            syncProgram();
+        }
     }
 }
 
-function mergeBookmarks(serverSessions, serverPosters, serverTalks) {
-    for (const id of serverSessions) {
-        savedSessionIds.add(id);
+// --- Push updates (/api/events, Server-Sent Events) ---
+
+// The server announces new bookmark versions (changes made on another
+// device) and programme updates. Without the stream (not deployed, or an
+// old browser) the visibilitychange check above still catches up.
+let eventSource = null;
+
+function openEventStream() {
+    if (!currentUser || eventSource || typeof EventSource === 'undefined') return;
+    eventSource = new EventSource('/api/events');
+    eventSource.addEventListener('bookmarks', event => {
+        const data = JSON.parse(event.data);
+        if (data.version !== bookmarkVersion) syncProgram();
+    });
+    eventSource.addEventListener('programme', () => refreshProgramme());
+    eventSource.addEventListener('error', () => {
+        // The browser reconnects by itself unless the server refused the stream
+        if (eventSource && eventSource.readyState === EventSource.CLOSED) eventSource = null;
+    });
+}
+
+function closeEventStream() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
     }
-    localStorage.setItem('dhd2026_saved_sessions', JSON.stringify([...savedSessionIds]));
-    if (serverPosters) {
-        for (const id of serverPosters) {
-            savedPosterIds.add(id);
-        }
-        localStorage.setItem('dhd2026_saved_posters', JSON.stringify([...savedPosterIds]));
+}
+
+async function refreshProgramme() {
+    try {
+        const remainingDays = await loadProgramme();
+        await remainingDays;
+        buildDayFilterBar();
+        buildTimeFilterBar();
+        renderKeepingPosition();
+    } catch (error) {
+        console.error('Error reloading programme:', error);
     }
-    if (serverTalks) {
-        for (const id of serverTalks) {
-            savedTalkIds.add(id);
+}
+
+function mergeBookmarks(serverSessions, serverPosters, serverTalks, serverVersion) {
+    const server = { session: serverSessions || [], poster: serverPosters || [], talk: serverTalks || [] };
+    const pending = new Set(pendingBookmarkOps.map(op => `${op.kind}\n${op.id}`));
+    for (const kind of Object.keys(server)) {
+        const local = bookmarkSet(kind);
+        const remote = new Set(server[kind]);
+        // Local-only bookmarks are uploaded as individual additions
+        for (const id of local) {
+            if (!remote.has(id)) queueBookmarkOp(kind, id, true);
+        }
+        for (const id of remote) {
+            if (!pending.has(`${kind}\n${id}`)) local.add(id);
         }
-        localStorage.setItem('dhd2026_saved_talks', JSON.stringify([...savedTalkIds]));
     }
-    syncProgram();
+    saveBookmarkSets();
+    setBookmarkVersion(serverVersion);
+    if (pendingBookmarkOps.length > 0) {
+        syncProgram();
+    }
 }
 
 function showSyncError() {
@@ -400,12 +635,23 @@ function parseTime(str) {
 // Days where time filters should use exact match instead of overlap
 const EXACT_MATCH_DAYS = new Set(['2026-02-24']);
 
-function sessionMatchesTimeSlot(session, slot, dayDate) {
-    if (!slot) return true;
+// Parsed session times, computed once per session object (and time string)
+const sessionTimeCache = new WeakMap();
+
+function sessionTimeRange(session) {
     const sessionTime = session.time || '';
+    const cached = sessionTimeCache.get(session);
+    if (cached && cached.time === sessionTime) return cached;
     const parts = sessionTime.split('\u2013');
-    const sessionStart = parseTime(parts[0].trim());
-    const sessionEnd = parts.length === 2 ? parseTime(parts[1].trim()) : sessionStart;
+    const start = parseTime(parts[0].trim());
+    const range = { time: sessionTime, start, end: parts.length === 2 ? parseTime(parts[1].trim()) : start };
+    sessionTimeCache.set(session, range);
+    return range;
+}
+
+function sessionMatchesTimeSlot(session, slot, dayDate) {
+    if (!slot) return true;
+    const { start: sessionStart, end: sessionEnd } = sessionTimeRange(session);
 
     if (slot.startsWith('ab ')) {
         const slotStart = parseTime(slot.substring(3));
@@ -427,29 +673,130 @@ function sessionMatchesTimeSlot(session, slot, dayDate) {
 }
 
 function hasAbstract(session) {
-    if (session.abstract) return true;
+    if (sessionHasOwnAbstract(session)) return true;
     if (session.presentations) {
-        return session.presentations.some(p => p.abstract);
+        return session.presentations.some(presHasAbstract);
     }
     return false;
 }
 
+// Compact ids come from the build (see id_registry.py); the rest is the
+// legacy scheme for programme data without them
 function generateId(session, dayDate) {
+    if (session.id != null) return String(session.id);
     if (session.session_id) return session.session_id;
     const slug = `${dayDate}-${session.time}-${session.title}`.replace(/\s+/g, '-').toLowerCase();
     return slug;
 }
 
 function generatePosterId(session, dayDate, presIndex) {
+    const pres = (session.presentations || [])[presIndex];
+    if (pres && pres.id != null) return String(pres.id);
     const base = generateId(session, dayDate);
     return `${base}::poster-${presIndex}`;
 }
 
 function generateTalkId(session, dayDate, presIndex) {
+    const pres = (session.presentations || [])[presIndex];
+    if (pres && pres.id != null) return String(pres.id);
     const base = generateId(session, dayDate);
     return `${base}::talk-${presIndex}`;
 }
 
+function findSession(bookmarkId) {
+    for (const day of conferenceData.days) {
+        const session = day.sessions.find(s => generateId(s, day.date) === bookmarkId);
+        if (session) return { session, day };
+    }
+    return null;
+}
+
+// --- Abstracts ---
+
+// Day shards only flag abstracts (has_abstract); the texts of a session are
+// fetched together from /api/abstracts/<bookmark id> when a card is
+// expanded. Item ids: the session's bookmark id for its own abstract, the
+// talk/poster id for presentations.
+const abstractRequests = new Map(); // session bookmark id -> promise of {item id: text}
+
+function sessionHasOwnAbstract(session) {
+    return Boolean(session.abstract || session.has_abstract);
+}
+
+function presHasAbstract(pres) {
+    return Boolean(pres.abstract || pres.has_abstract);
+}
+
+function presAbstractId(session, dayDate, presIndex) {
+    if (session.type === 'Vortragssession' || session.type === 'Doctoral Consortium') {
+        return generateTalkId(session, dayDate, presIndex);
+    }
+    if (session.type === 'Poster Session') return generatePosterId(session, dayDate, presIndex);
+    const pres = (session.presentations || [])[presIndex];
+    if (pres && pres.id != null) return String(pres.id);
+    return `${generateId(session, dayDate)}::pres-${presIndex}`;
+}
+
+// Paragraph for an abstract; a placeholder until loadAbstracts() fills it in
+function abstractParagraph(text, abstractId) {
+    const p = document.createElement('p');
+    if (text) {
+        p.textContent = text;
+    } else {
+        p.className = 'abstract-loading';
+        p.dataset.abstractId = abstractId;
+        p.textContent = 'Abstract wird geladen …';
+    }
+    return p;
+}
+
+function requestAbstracts(session, dayDate) {
+    const bookmarkId = generateId(session, dayDate);
+    if (!abstractRequests.has(bookmarkId)) {
+        const request = fetch(`/api/abstracts/${encodeURIComponent(bookmarkId)}`)
+            .then(resp => {
+                if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+                return resp.json();
+            })
+            .then(data => {
+                const texts = data.abstracts;
+                // Keep the texts, so later renders show them right away
+                if (texts[bookmarkId]) session.abstract = texts[bookmarkId];
+                (session.presentations || []).forEach((pres, idx) => {
+                    const text = texts[presAbstractId(session, dayDate, idx)];
+                    if (text) pres.abstract = text;
+                });
+                return texts;
+            })
+            .catch(error => {
+                abstractRequests.delete(bookmarkId); // retry on the next expand
+                throw error;
+            });
+        abstractRequests.set(bookmarkId, request);
+    }
+    return abstractRequests.get(bookmarkId);
+}
+
+async function loadAbstracts(session, dayDate) {
+    const bookmarkId = generateId(session, dayDate);
+    const placeholders = () => Array.from(document.querySelectorAll('.abstract-loading')).filter(p =>
+        p.dataset.abstractId === bookmarkId || p.dataset.abstractId.startsWith(`${bookmarkId}::`));
+    if (placeholders().length === 0) return;
+    try {
+        const texts = await requestAbstracts(session, dayDate);
+        placeholders().forEach(p => {
+            const text = texts[p.dataset.abstractId];
+            if (!text) return;
+            p.textContent = text;
+            p.classList.remove('abstract-loading');
+            delete p.dataset.abstractId;
+        });
+    } catch (error) {
+        console.error('Error loading abstracts:', error);
+        placeholders().forEach(p => { p.textContent = 'Abstract konnte nicht geladen werden.'; });
+    }
+}
+
 function togglePosterBookmark(id) {
     if (savedPosterIds.has(id)) {
         savedPosterIds.delete(id);
@@ -459,6 +806,7 @@ function togglePosterBookmark(id) {
     localStorage.setItem('dhd2026_saved_posters', JSON.stringify([...savedPosterIds]));
 
     if (currentUser) {
+        queueBookmarkOp('poster', id, savedPosterIds.has(id));
         syncProgram();
     }
 
@@ -488,6 +836,7 @@ function toggleTalkBookmark(id) {
     localStorage.setItem('dhd2026_saved_talks', JSON.stringify([...savedTalkIds]));
 
     if (currentUser) {
+        queueBookmarkOp('talk', id, savedTalkIds.has(id));
         syncProgram();
     }
 
@@ -517,6 +866,7 @@ function toggleBookmark(id) {
     localStorage.setItem('dhd2026_saved_sessions', JSON.stringify([...savedSessionIds]));
 
     if (currentUser) {
+        queueBookmarkOp('session', id, savedSessionIds.has(id));
         syncProgram();
     }
 
@@ -628,14 +978,12 @@ function renderSessionCard(session, day, sid) {
     if (sessionHasAbstract) {
         const abstractSection = document.createElement('div');
         abstractSection.className = 'session-abstract hidden';
-        if (session.abstract) {
-            const p = document.createElement('p');
-            p.textContent = session.abstract;
-            abstractSection.appendChild(p);
+        if (sessionHasOwnAbstract(session)) {
+            abstractSection.appendChild(abstractParagraph(session.abstract, sid));
         }
         if (session.presentations) {
-            session.presentations.forEach(pres => {
-                if (!pres.abstract) return;
+            session.presentations.forEach((pres, presIdx) => {
+                if (!presHasAbstract(pres)) return;
                 const presBlock = document.createElement('div');
                 presBlock.className = 'presentation-abstract';
                 const presTitle = document.createElement('div');
@@ -659,15 +1007,14 @@ function renderSessionCard(session, day, sid) {
                     });
                     presBlock.appendChild(presAuthors);
                 }
-                const presAbstract = document.createElement('p');
-                presAbstract.textContent = pres.abstract;
-                presBlock.appendChild(presAbstract);
+                presBlock.appendChild(abstractParagraph(pres.abstract, presAbstractId(session, day.date, presIdx)));
                 abstractSection.appendChild(presBlock);
             });
         }
         card.appendChild(abstractSection);
         titleDiv.addEventListener('click', () => {
             abstractSection.classList.toggle('hidden');
+            if (!abstractSection.classList.contains('hidden')) loadAbstracts(session, day.date);
             const icon = titleDiv.querySelector('.expand-icon');
             icon.textContent = abstractSection.classList.contains('hidden') ? 'expand_more' : 'expand_less';
         });
@@ -690,8 +1037,8 @@ function renderSessionCard(session, day, sid) {
 }
 
 // Render an individual talk/poster card for "Mein Programm"
-function renderPresentationCard(item) {
-    const { type, session, pres, bookmarkId } = item;
+function renderPresentationCard(item, day) {
+    const { type, session, pres, presIdx, bookmarkId } = item;
     const card = document.createElement('div');
     card.className = 'session-card';
     card.dataset.type = type === 'poster' ? 'Poster Session' : session.type;
@@ -717,7 +1064,7 @@ function renderPresentationCard(item) {
     const titleDiv = document.createElement('div');
     titleDiv.className = 'session-title';
     titleDiv.textContent = pres.title;
-    if (pres.abstract) {
+    if (presHasAbstract(pres)) {
         titleDiv.classList.add('clickable');
         const expandIcon = document.createElement('span');
         expandIcon.className = 'material-icons expand-icon';
@@ -756,15 +1103,14 @@ function renderPresentationCard(item) {
         card.appendChild(locDiv);
     }
 
-    if (pres.abstract) {
+    if (presHasAbstract(pres)) {
         const abstractDiv = document.createElement('div');
         abstractDiv.className = 'session-abstract hidden';
-        const p = document.createElement('p');
-        p.textContent = pres.abstract;
-        abstractDiv.appendChild(p);
+        abstractDiv.appendChild(abstractParagraph(pres.abstract, bookmarkId));
         card.appendChild(abstractDiv);
         titleDiv.addEventListener('click', () => {
             abstractDiv.classList.toggle('hidden');
+            if (!abstractDiv.classList.contains('hidden')) loadAbstracts(session, day.date);
             const icon = titleDiv.querySelector('.expand-icon');
             icon.textContent = abstractDiv.classList.contains('hidden') ? 'expand_more' : 'expand_less';
         });
@@ -772,8 +1118,7 @@ function renderPresentationCard(item) {
 
     const actions = document.createElement('div');
     actions.className = 'card-actions';
-    const presAnchorMatch = bookmarkId.match(/^(.+)::(talk|poster)-(\d+)$/);
-    const presAnchor = presAnchorMatch ? `pres-${presAnchorMatch[1]}-${presAnchorMatch[3]}` : null;
+    const presAnchor = `pres-${generateId(session, day.date)}-${presIdx}`;
     actions.appendChild(createShareButton(pres.title, session.time, session.location, presAnchor));
     const bookmarkBtn = document.createElement('button');
     bookmarkBtn.className = 'btn-bookmark active';
@@ -809,14 +1154,14 @@ function render() {
 
             day.sessions.forEach(session => {
                 if (currentTimeSlot && !sessionMatchesTimeSlot(session, currentTimeSlot, day.date)) return;
-                const sessionStart = session.time ? parseTime(session.time.split('\u2013')[0].trim()) : 0;
+                const sessionStart = session.time ? sessionTimeRange(session).start : 0;
 
                 if ((session.type === 'Vortragssession' || session.type === 'Doctoral Consortium') && session.presentations) {
                     // Individual talk bookmarks
                     session.presentations.forEach((pres, presIdx) => {
                         const talkId = generateTalkId(session, day.date, presIdx);
                         if (savedTalkIds.has(talkId)) {
-                            items.push({ type: 'talk', session, pres, bookmarkId: talkId, sortTime: sessionStart });
+                            items.push({ type: 'talk', session, pres, presIdx, bookmarkId: talkId, sortTime: sessionStart });
                         }
                     });
                 } else if (session.type === 'Poster Session' && session.presentations) {
@@ -824,7 +1169,7 @@ function render() {
                     session.presentations.forEach((pres, presIdx) => {
                         const posterId = generatePosterId(session, day.date, presIdx);
                         if (savedPosterIds.has(posterId)) {
-                            items.push({ type: 'poster', session, pres, bookmarkId: posterId, sortTime: sessionStart });
+                            items.push({ type: 'poster', session, pres, presIdx, bookmarkId: posterId, sortTime: sessionStart });
                         }
                     });
                 } else {
@@ -857,7 +1202,7 @@ function render() {
                 if (item.type === 'session') {
                     sessionList.appendChild(renderSessionCard(item.session, day, item.bookmarkId));
                 } else {
-                    sessionList.appendChild(renderPresentationCard(item));
+                    sessionList.appendChild(renderPresentationCard(item, day));
                 }
             });
 
@@ -1000,16 +1345,14 @@ function render() {
                 const abstractSection = document.createElement('div');
                 abstractSection.className = 'session-abstract hidden';
 
-                if (session.abstract) {
-                    const p = document.createElement('p');
-                    p.textContent = session.abstract;
-                    abstractSection.appendChild(p);
+                if (sessionHasOwnAbstract(session)) {
+                    abstractSection.appendChild(abstractParagraph(session.abstract, sid));
                 }
 
                 const isPosterSession = session.type === 'Poster Session';
                 if (session.presentations) {
                     session.presentations.forEach((pres, presIdx) => {
-                        if (!pres.abstract) return;
+                        if (!presHasAbstract(pres)) return;
                         const presBlock = document.createElement('div');
                         presBlock.className = 'presentation-abstract';
                         presBlock.id = `pres-${sid}-${presIdx}`;
@@ -1078,9 +1421,7 @@ function render() {
                             presBlock.appendChild(presAuthors);
                         }
 
-                        const presAbstract = document.createElement('p');
-                        presAbstract.textContent = pres.abstract;
-                        presBlock.appendChild(presAbstract);
+                        presBlock.appendChild(abstractParagraph(pres.abstract, presAbstractId(session, day.date, presIdx)));
 
                         abstractSection.appendChild(presBlock);
                     });
@@ -1090,6 +1431,7 @@ function render() {
 
                 titleDiv.addEventListener('click', () => {
                     abstractSection.classList.toggle('hidden');
+                    if (!abstractSection.classList.contains('hidden')) loadAbstracts(session, day.date);
                     const icon = titleDiv.querySelector('.expand-icon');
                     icon.textContent = abstractSection.classList.contains('hidden') ? 'expand_more' : 'expand_less';
                 });
@@ -1165,16 +1507,31 @@ function navigateToHash() {
         hash = window.location.hash.slice(1);
     }
     if (!hash) return;
+    let bookmarkId = null;
+    let presIndex = null;
     if (hash.startsWith('session-')) {
-        navigateToSession(hash.slice('session-'.length), null, true);
+        bookmarkId = hash.slice('session-'.length);
     } else if (hash.startsWith('pres-')) {
         const m = hash.match(/^pres-(.+)-(\d+)$/);
-        if (m) navigateToSession(m[1], parseInt(m[2], 10), true);
+        if (m) {
+            bookmarkId = m[1];
+            presIndex = parseInt(m[2], 10);
+        }
+    }
+    if (!bookmarkId) return;
+    if (findSession(bookmarkId)) {
+        navigateToSession(bookmarkId, presIndex, true);
+        return;
     }
+    // Links shared before compact ids carry the legacy session id
+    translateLegacyIds([bookmarkId]).then(translated => {
+        if (translated[bookmarkId]) navigateToSession(translated[bookmarkId], presIndex, true);
+    });
 }
 
 function navigateToSession(bookmarkId, presIndex, instant) {
     closePersonModal();
+    closeSearchModal();
     // Switch to Übersicht tab
     currentTab = 'all';
     document.querySelectorAll('.main-nav .nav-btn').forEach(btn => btn.classList.remove('active'));
@@ -1197,6 +1554,8 @@ function navigateToSession(bookmarkId, presIndex, instant) {
             const icon = sessionEl.querySelector('.expand-icon');
             if (icon) icon.textContent = 'expand_less';
         }
+        const found = findSession(bookmarkId);
+        if (abstractSection && found) loadAbstracts(found.session, found.day.date);
 
         if (presIndex != null) {
             // Scroll to the specific presentation
@@ -1215,15 +1574,11 @@ function navigateToSession(bookmarkId, presIndex, instant) {
     }, 100);
 }
 
-function openPersonIndexFor(name) {
-    if (personIndex.length === 0) {
-        buildPersonIndex();
-    }
+async function openPersonIndexFor(name) {
     const searchInput = document.getElementById('person-search');
     searchInput.value = name;
-    const filtered = personIndex.filter(p => p.name.toLowerCase().includes(name.toLowerCase()));
-    renderPersonList(filtered);
     document.getElementById('person-modal').classList.remove('hidden');
+    await searchPersons(name);
     // Auto-expand the first matching person
     setTimeout(() => {
         const firstHeader = document.querySelector('#person-list .person-item .person-header');
@@ -1314,101 +1669,53 @@ function closeInfoModal() {
 
 // --- Person Index ---
 
-let personIndex = []; // sorted array of { name, affiliation, sessions: [{title, day_label, time, session_id}] }
-
-function buildPersonIndex() {
-    if (!conferenceData) return;
-    const personMap = new Map(); // key: normalized name, value: { name, affiliations: Set, sessions: [] }
-
-    function addPerson(name, affiliation, sessionRef) {
-        if (!name || !name.trim()) return;
-        name = name.trim();
-        const key = name.toLowerCase();
-        if (!personMap.has(key)) {
-            personMap.set(key, { name, affiliations: new Set(), sessions: [] });
-        }
-        const entry = personMap.get(key);
-        if (affiliation && affiliation.trim()) {
-            entry.affiliations.add(affiliation.trim());
-        }
-        // Avoid duplicate session references
-        const refKey = `${sessionRef.day_label}|${sessionRef.time}|${sessionRef.title}|${sessionRef.pres_title || ''}`;
-        if (!entry.sessions.some(s => `${s.day_label}|${s.time}|${s.title}|${s.pres_title || ''}` === refKey)) {
-            entry.sessions.push(sessionRef);
-        }
+// The index is built by build.py and searched server-side (/api/persons):
+// { name, affiliation, sessions: [{title, day_label, time, session_id, bookmark_id, type, pres_title?, pres_index?}] }
+const PERSON_CACHE_SIZE = 50;
+const personCache = new Map(); // query -> persons, most recent last
+let personSearchController = null;
+
+async function fetchPersons(query) {
+    // Only the latest keystroke matters, also when it is answered from the
+    // cache: an older response must not overwrite its list
+    if (personSearchController) personSearchController.abort();
+    personSearchController = null;
+    const key = query.toLowerCase();
+    if (personCache.has(key)) {
+        const cached = personCache.get(key);
+        personCache.delete(key);
+        personCache.set(key, cached);
+        return cached;
     }
+    personSearchController = new AbortController();
+    const resp = await fetch(`/api/persons?q=${encodeURIComponent(query)}`, { signal: personSearchController.signal });
+    if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+    const data = await resp.json();
+    personCache.set(key, data.persons);
+    if (personCache.size > PERSON_CACHE_SIZE) {
+        personCache.delete(personCache.keys().next().value);
+    }
+    return data.persons;
+}
 
-    conferenceData.days.forEach(day => {
-        day.sessions.forEach(session => {
-            const bookmarkId = generateId(session, day.date);
-            const sessionRef = {
-                title: session.title,
-                day_label: day.day_label,
-                time: session.time,
-                session_id: session.session_id || null,
-                bookmark_id: bookmarkId,
-                type: session.type || ''
-            };
-
-            // Session-level authors
-            if (session.authors) {
-                session.authors.forEach(a => {
-                    addPerson(a.name, a.affiliation, sessionRef);
-                });
-            }
-
-            // Chair
-            if (session.chair) {
-                addPerson(session.chair, null, sessionRef);
-            }
-
-            // Presentation-level authors
-            if (session.presentations) {
-                session.presentations.forEach((pres, presIdx) => {
-                    // For Poster Sessions and Vortragssessions, use individual presentation title
-                    let presRef = sessionRef;
-                    if ((session.type === 'Poster Session' || session.type === 'Vortragssession' || session.type === 'Doctoral Consortium') && pres.title) {
-                        presRef = {
-                            ...sessionRef,
-                            pres_title: pres.title,
-                            pres_index: presIdx
-                        };
-                    }
-                    if (pres.authors && Array.isArray(pres.authors)) {
-                        pres.authors.forEach(authorName => {
-                            addPerson(authorName, pres.affiliation || null, presRef);
-                        });
-                    } else if (pres.author) {
-                        addPerson(pres.author, pres.affiliation || null, presRef);
-                    }
-                });
-            }
-        });
-    });
-
-    personIndex = Array.from(personMap.values())
-        .map(p => ({
-            name: p.name,
-            affiliation: Array.from(p.affiliations).join('; '),
-            sessions: p.sessions
-        }))
-        .sort((a, b) => {
-            const surnameA = a.name.split(/\s+/).pop();
-            const surnameB = b.name.split(/\s+/).pop();
-            return surnameA.localeCompare(surnameB, 'de') || a.name.localeCompare(b.name, 'de');
-        });
+async function searchPersons(query) {
+    try {
+        renderPersonList(await fetchPersons(query));
+    } catch (e) {
+        if (e.name === 'AbortError') return;
+        console.error('Person search failed:', e);
+        document.getElementById('person-list').innerHTML = '';
+        document.getElementById('person-count').textContent = 'Personenverzeichnis konnte nicht geladen werden.';
+    }
 }
 
 function showPersonIndex() {
     toggleMenu();
-    if (personIndex.length === 0) {
-        buildPersonIndex();
-    }
     const searchInput = document.getElementById('person-search');
     searchInput.value = '';
-    renderPersonList(personIndex);
     document.getElementById('person-modal').classList.remove('hidden');
     searchInput.focus();
+    searchPersons('');
 }
 
 function closePersonModal() {
@@ -1416,13 +1723,7 @@ function closePersonModal() {
 }
 
 function filterPersons() {
-    const query = document.getElementById('person-search').value.trim().toLowerCase();
-    if (!query) {
-        renderPersonList(personIndex);
-        return;
-    }
-    const filtered = personIndex.filter(p => p.name.toLowerCase().includes(query));
-    renderPersonList(filtered);
+    searchPersons(document.getElementById('person-search').value.trim());
 }
 
 function renderPersonList(persons) {
@@ -1487,12 +1788,12 @@ function renderPersonList(persons) {
             // Determine bookmark type and state
             let isSaved, toggleFn, checkFn;
             if ((ref.type === 'Vortragssession' || ref.type === 'Doctoral Consortium') && ref.pres_index != null) {
-                const talkId = `${ref.bookmark_id}::talk-${ref.pres_index}`;
+                const talkId = ref.item_id || `${ref.bookmark_id}::talk-${ref.pres_index}`;
                 isSaved = savedTalkIds.has(talkId);
                 toggleFn = () => toggleTalkBookmark(talkId);
                 checkFn = () => savedTalkIds.has(talkId);
             } else if (ref.type === 'Poster Session' && ref.pres_index != null) {
-                const posterId = `${ref.bookmark_id}::poster-${ref.pres_index}`;
+                const posterId = ref.item_id || `${ref.bookmark_id}::poster-${ref.pres_index}`;
                 isSaved = savedPosterIds.has(posterId);
                 toggleFn = () => togglePosterBookmark(posterId);
                 checkFn = () => savedPosterIds.has(posterId);
@@ -1534,12 +1835,145 @@ function renderPersonList(persons) {
     });
 }
 
+// --- Full-Text Search ---
+
+// Ranked server-side (/api/search); titles and snippets arrive as escaped
+// HTML with the matched words in <mark>. Results: { kind, title, snippet,
+// session_title, day_label, time, location, bookmark_id, pres_index, item_id, authors }
+const SEARCH_DELAY_MS = 200;
+let searchTimer = null;
+let searchController = null;
+
+async function runSearch(query) {
+    const countEl = document.getElementById('search-count');
+    const container = document.getElementById('search-list');
+    if (!query) {
+        countEl.textContent = '';
+        container.innerHTML = '';
+        return;
+    }
+    // Only the latest keystroke matters
+    if (searchController) searchController.abort();
+    searchController = new AbortController();
+    try {
+        const resp = await fetch(`/api/search?q=${encodeURIComponent(query)}`, { signal: searchController.signal });
+        if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
+        const data = await resp.json();
+        renderSearchResults(data.results, data.count);
+    } catch (e) {
+        if (e.name === 'AbortError') return;
+        console.error('Search failed:', e);
+        container.innerHTML = '';
+        countEl.textContent = 'Suche fehlgeschlagen.';
+    }
+}
+
+function showSearch() {
+    toggleMenu();
+    const searchInput = document.getElementById('search-input');
+    searchInput.value = '';
+    document.getElementById('search-count').textContent = '';
+    document.getElementById('search-list').innerHTML = '';
+    document.getElementById('search-modal').classList.remove('hidden');
+    searchInput.focus();
+}
+
+function closeSearchModal() {
+    document.getElementById('search-modal').classList.add('hidden');
+}
+
+function filterSearch() {
+    clearTimeout(searchTimer);
+    const query = document.getElementById('search-input').value.trim();
+    searchTimer = setTimeout(() => runSearch(query), SEARCH_DELAY_MS);
+}
+
+function searchResultBookmark(result) {
+    if (result.kind === 'talk') {
+        return { saved: () => savedTalkIds.has(result.item_id), toggle: () => toggleTalkBookmark(result.item_id) };
+    }
+    if (result.kind === 'poster') {
+        return { saved: () => savedPosterIds.has(result.item_id), toggle: () => togglePosterBookmark(result.item_id) };
+    }
+    return { saved: () => savedSessionIds.has(result.bookmark_id), toggle: () => toggleBookmark(result.bookmark_id) };
+}
+
+function renderSearchResults(results, count) {
+    const container = document.getElementById('search-list');
+    const countEl = document.getElementById('search-count');
+    container.innerHTML = '';
+    countEl.textContent = count > results.length
+        ? `${count} Treffer, die besten ${results.length} werden angezeigt`
+        : `${count} Treffer`;
+
+    results.forEach(result => {
+        const refEl = document.createElement('div');
+        refEl.className = 'person-session-ref search-result';
+
+        const refInfo = document.createElement('div');
+        refInfo.className = 'person-session-info clickable-session-ref';
+
+        const refTime = document.createElement('span');
+        refTime.className = 'person-session-time';
+        const dayShort = (result.day_label || '').split(',')[0];
+        refTime.textContent = `${dayShort}, ${result.time}` + (result.location ? ` · ${result.location}` : '');
+        refInfo.appendChild(refTime);
+
+        const refTitle = document.createElement('span');
+        refTitle.className = 'person-session-title';
+        const prefix = result.kind === 'poster' ? 'Poster: ' : result.kind === 'talk' ? 'Vortrag: ' : '';
+        refTitle.innerHTML = escapeHtml(prefix) + result.title;
+        refInfo.appendChild(refTitle);
+
+        if (result.pres_index != null) {
+            const sessionEl = document.createElement('span');
+            sessionEl.className = 'search-result-session';
+            sessionEl.textContent = result.session_title;
+            refInfo.appendChild(sessionEl);
+        }
+
+        if (result.snippet) {
+            const snippetEl = document.createElement('span');
+            snippetEl.className = 'search-result-snippet';
+            snippetEl.innerHTML = result.snippet;
+            refInfo.appendChild(snippetEl);
+        }
+
+        refInfo.addEventListener('click', () => {
+            navigateToSession(result.bookmark_id, result.pres_index);
+        });
+        refEl.appendChild(refInfo);
+
+        const bookmark = searchResultBookmark(result);
+        const bmBtn = document.createElement('button');
+        const bmIcon = document.createElement('span');
+        bmIcon.className = 'material-icons';
+        bmBtn.appendChild(bmIcon);
+        const updateButton = () => {
+            const saved = bookmark.saved();
+            bmBtn.className = `person-session-bookmark${saved ? ' active' : ''}`;
+            bmBtn.title = saved ? 'Aus Mein Programm entfernen' : 'Zu Mein Programm hinzufügen';
+            bmIcon.textContent = saved ? 'bookmark' : 'bookmark_border';
+        };
+        updateButton();
+        bmBtn.addEventListener('click', (e) => {
+            e.stopPropagation();
+            bookmark.toggle();
+            updateButton();
+        });
+        refEl.appendChild(bmBtn);
+
+        container.appendChild(refEl);
+    });
+}
+
 // Close modals when clicking outside
 window.addEventListener('click', function(event) {
     const mapModal = document.getElementById('map-modal');
     const authModal = document.getElementById('auth-modal');
     const infoModal = document.getElementById('info-modal');
     const personModal = document.getElementById('person-modal');
+    const searchModal = document.getElementById('search-modal');
     if (event.target === mapModal) {
         mapModal.classList.add('hidden');
     }
@@ -1552,4 +1986,7 @@ window.addEventListener('click', function(event) {
     if (event.target === personModal) {
         closePersonModal();
     }
+    if (event.target === searchModal) {
+        closeSearchModal();
+    }
 });
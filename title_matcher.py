@@ -0,0 +1,212 @@
+"""
+Indexed fuzzy matching of presentation titles.
+
+The extraction scripts used to compare every JSON title against every HTML
+title with difflib.SequenceMatcher, re-normalizing both strings each time.
+TitleMatcher normalizes each title once and keeps a character-trigram
+inverted index; a lookup ranks entries by shared trigrams and only runs
+the exact SequenceMatcher ratio on the best few candidates.
+
+    matcher = TitleMatcher((title, value) for ...)
+    m = matcher.match(json_title)
+    if m:
+        m.value, m.score, m.ambiguous
+
+Fuzzy results can be memoized across runs by passing a `memo_store` dict;
+they are keyed by a fingerprint of the indexed titles, so any title change
+invalidates them.
+"""
+
+import hashlib
+import html
+import re
+from collections import Counter
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Tuple
+
+DEFAULT_THRESHOLD = 0.9
+
+# Entries scored with SequenceMatcher per lookup
+MAX_CANDIDATES = 5
+
+# A second candidate within this distance of the best one makes a match ambiguous
+AMBIGUITY_MARGIN = 0.02
+
+# Share of a title's trigrams (the rarest ones, at most MAX_PROBE) looked
+# up in the index. A title at ratio >= 0.9 keeps most trigrams, so it still
+# shares some of the rare ones; skipping common trigrams keeps lookups cheap.
+PROBE_FRACTION = 0.5
+MAX_PROBE = 16
+
+# Candidates sharing fewer trigrams than this (Dice coefficient) are not
+# scored; titles at ratio >= 0.9 stay far above it
+MIN_DICE = 0.5
+
+
+@lru_cache(maxsize=8192)
+def normalize_title(title: str) -> str:
+    """Normalize a title for comparison: decode HTML entities, normalize
+    whitespace, dashes, and quotes, then lowercase."""
+    t = html.unescape(title)
+    # Normalize various dash types to a simple hyphen
+    t = re.sub(r'[\u2013\u2014\u2012\u2015]', '-', t)  # en-dash, em-dash, etc.
+    t = t.replace('---', '-')
+    # Normalize various quote types
+    t = re.sub(r'[\u201c\u201d\u201e\u201f\u00ab\u00bb]', '"', t)
+    t = re.sub(r'[\u2018\u2019\u201a\u201b]', "'", t)
+    # Normalize whitespace
+    t = re.sub(r'\s+', ' ', t).strip()
+    # Lowercase for comparison
+    t = t.lower()
+    return t
+
+
+def trigrams(text: str) -> frozenset:
+    padded = f'  {text} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+@dataclass
+class Match:
+    title: str             # normalized title of the matched entry
+    value: Any
+    score: float           # 1.0 for an exact (normalized) match
+    ambiguous: bool = False
+    runner_up: Optional[float] = None  # score of the next best candidate
+
+    @property
+    def exact(self) -> bool:
+        return self.score == 1.0
+
+
+class TitleMatcher:
+    """Maps titles to values; looks up exact normalized matches first, then
+    the most similar indexed title scoring at least `threshold`."""
+
+    def __init__(self, items: Iterable[Tuple[str, Any]] = (), threshold: float = DEFAULT_THRESHOLD,
+                 max_candidates: int = MAX_CANDIDATES, memo_store: Optional[dict] = None):
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        # Fuzzy results can be kept across runs: memo_store maps a
+        # fingerprint of the indexed titles to {query: [title, score, runner_up]}
+        self._memo_store = memo_store
+        self._memo = None
+        self._titles = []          # entry -> normalized title
+        self._values = []
+        self._grams = []           # entry -> trigram set
+        self._exact = {}           # normalized title -> entry
+        self._postings = {}        # trigram -> [entry, ...]
+        for title, value in items:
+            self.add(title, value)
+
+    def __len__(self):
+        return len(self._titles)
+
+    def add(self, title: str, value: Any):
+        """Index a title. A title that normalizes like an earlier one
+        replaces its value (last one wins, like a dict)."""
+        norm = normalize_title(title)
+        entry = self._exact.get(norm)
+        if entry is not None:
+            self._values[entry] = value
+            return
+        self._memo = None
+        entry = len(self._titles)
+        grams = trigrams(norm)
+        self._titles.append(norm)
+        self._values.append(value)
+        self._grams.append(grams)
+        self._exact[norm] = entry
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(entry)
+
+    def fingerprint(self) -> str:
+        """Digest of the indexed titles and settings that fuzzy results depend on."""
+        digest = hashlib.sha1(f'{self.threshold}:{self.max_candidates}'.encode())
+        for title in sorted(self._titles):
+            digest.update(title.encode('utf-8') + b'\0')
+        return digest.hexdigest()[:16]
+
+    def _memo_get(self, norm):
+        if self._memo_store is None:
+            return False, None
+        if self._memo is None:
+            self._memo = self._memo_store.setdefault(self.fingerprint(), {})
+        if norm not in self._memo:
+            return False, None
+        title, score, runner_up = self._memo[norm]
+        if title is None:
+            return True, None
+        return True, self._make_match(self._exact[title], score, runner_up)
+
+    def _memo_put(self, norm, match):
+        if self._memo is not None:
+            self._memo[norm] = [match.title, match.score, match.runner_up] if match else [None, 0.0, None]
+
+    def _make_match(self, entry, score, runner_up):
+        return Match(
+            self._titles[entry],
+            self._values[entry],
+            score,
+            ambiguous=runner_up is not None and score - runner_up <= AMBIGUITY_MARGIN,
+            runner_up=runner_up,
+        )
+
+    def _candidates(self, norm):
+        grams = trigrams(norm)
+        postings = self._postings
+        known = sorted((g for g in grams if g in postings), key=lambda g: len(postings[g]))
+        if not known:
+            return []
+        probe = known[:max(1, min(MAX_PROBE, int(len(known) * PROBE_FRACTION)))]
+        hits = Counter()
+        for gram in probe:
+            hits.update(postings[gram])
+
+        # Rank the best-probed entries by trigram Dice coefficient
+        size = len(grams)
+        ranked = []
+        for entry, _ in hits.most_common(self.max_candidates * 4):
+            other = self._grams[entry]
+            dice = 2 * len(grams & other) / (size + len(other))
+            if dice >= MIN_DICE:
+                ranked.append((dice, entry))
+        ranked.sort(reverse=True)
+        return [entry for _, entry in ranked[:self.max_candidates]]
+
+    def match(self, title: str) -> Optional[Match]:
+        norm = normalize_title(title)
+        if not norm:
+            return None
+        entry = self._exact.get(norm)
+        if entry is not None:
+            return Match(norm, self._values[entry], 1.0)
+        cached, match = self._memo_get(norm)
+        if cached:
+            return match
+        match = self._fuzzy_match(norm)
+        self._memo_put(norm, match)
+        return match
+
+    def _fuzzy_match(self, norm):
+        scored = []
+        for entry in self._candidates(norm):
+            other = self._titles[entry]
+            # ratio() can never exceed this length bound
+            if 2 * min(len(norm), len(other)) / (len(norm) + len(other)) < self.threshold:
+                continue
+            matcher = SequenceMatcher(None, norm, other)
+            if matcher.quick_ratio() < self.threshold:
+                continue
+            score = matcher.ratio()
+            if score >= self.threshold:
+                scored.append((score, entry))
+        if not scored:
+            return None
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        best_score, best = scored[0]
+        runner_up = scored[1][0] if len(scored) > 1 else None
+        return self._make_match(best, best_score, runner_up)
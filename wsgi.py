@@ -0,0 +1,14 @@
+"""
+Production entry point:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Importing this module loads the programme, builds the indexes and migrates
+the database schema (see server.py); with `preload_app` that happens once in
+the gunicorn master, before the workers are forked.
+"""
+
+import config
+import server
+
+app = server.create_app(config.ProductionConfig)